@@ -12,6 +12,7 @@ class Config:
     # Redis (Cache de dados rápidos)
     REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+    PAYLOAD_CODEC = os.getenv("PAYLOAD_CODEC", "orjson")  # json | orjson | msgpack
     
     # --- INTELIGÊNCIA ARTIFICIAL ---
     # Anthropic API Key (Claude 3.5 Sonnet)
@@ -1,7 +1,7 @@
 import logging
-import json
 import redis
 from config import Config
+from codec import Codec
 
 logger = logging.getLogger("AIAnalyst.Notifier")
 
@@ -11,12 +11,12 @@ class Notifier:
         self.email_recipients = Config.EMAIL_RECIPIENTS
         
         # Connect to Redis
+        self.codec = Codec()
         try:
             self.redis_client = redis.Redis(
                 host=Config.REDIS_HOST,
                 port=Config.REDIS_PORT,
-                db=0,
-                decode_responses=True
+                db=0
             )
         except Exception as e:
             logger.error(f"❌ Failed to connect to Redis: {e}")
@@ -101,7 +101,7 @@ class Notifier:
                 from datetime import datetime
                 analysis["timestamp"] = datetime.now().strftime("%H:%M")
                 
-                self.redis_client.set("ai_analyst_report", json.dumps(analysis))
+                self.redis_client.set("ai_analyst_report", self.codec.encode(analysis))
                 logger.info("💾 Relatório salvo no Redis (key: ai_analyst_report)")
             except Exception as e:
                 logger.error(f"❌ Erro ao salvar no Redis: {e}")
@@ -1,8 +1,9 @@
 import redis.asyncio as redis
-import json
 import logging
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from src.config import REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_TTL
+from src.utils.codec import Codec
+from src.utils.exceptions import CacheError
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,7 @@ class RedisManager:
         self.db = db
         self.password = password
         self.ttl = ttl
+        self.codec = Codec()
         self.redis = None
     
     async def connect(self):
@@ -23,7 +25,7 @@ class RedisManager:
                 port=self.port,
                 db=self.db,
                 password=self.password,
-                decode_responses=True
+                decode_responses=False  # Valores são bytes do codec
             )
             await self.redis.ping()
             logger.info(f"✅ Conectado ao Redis em {self.host}:{self.port}")
@@ -31,7 +33,7 @@ class RedisManager:
             logger.error(f"❌ Erro ao conectar Redis em {self.host}:{self.port}: {e}")
             self.redis = None # Garante que o objeto redis é None em caso de falha
     
-    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+    async def set(self, key: str, value: Union[str, bytes], ttl: Optional[int] = None):
         """Salva valor em cache"""
         if not self.redis:
             logger.warning("⚠️ Redis não conectado. Não foi possível salvar em cache.")
@@ -42,7 +44,7 @@ class RedisManager:
         except Exception as e:
             logger.error(f"❌ Erro ao set cache para {key}: {e}")
     
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[bytes]:
         """Recupera valor do cache"""
         if not self.redis:
             logger.warning("⚠️ Redis não conectado. Não foi possível recuperar do cache.")
@@ -55,6 +57,34 @@ class RedisManager:
             logger.error(f"❌ Erro ao get cache para {key}: {e}")
             return None
     
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Recupera várias chaves numa única ida ao Redis"""
+        if not self.redis or not keys:
+            return [None] * len(keys)
+        try:
+            return await self.redis.mget(keys)
+        except Exception as e:
+            logger.error(f"❌ Erro ao mget cache para {keys}: {e}")
+            return [None] * len(keys)
+    
+    async def xread(self, stream: str, last_id: str, block_ms: int, count: int = 100) -> List[Tuple[bytes, Dict[bytes, bytes]]]:
+        """
+        Lê entradas do stream após `last_id`, bloqueando até `block_ms`.
+        Erros propagam (o chamador decide cair para polling).
+        """
+        if not self.redis:
+            raise CacheError("Redis não conectado")
+        result = await self.redis.xread({stream: last_id}, count=count, block=block_ms)
+        return result[0][1] if result else []
+    
+    async def set_data(self, key: str, data: Any, ttl: Optional[int] = None):
+        """Serializa (codec configurado) e salva em cache"""
+        await self.set(key, self.codec.encode(data), ttl)
+    
+    async def get_data(self, key: str) -> Any:
+        """Recupera e desserializa (formato detectado pelo codec)"""
+        return self.codec.decode(await self.get(key))
+    
     async def disconnect(self):
         """Desconecta do Redis"""
         if self.redis:
@@ -15,6 +15,7 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
 REDIS_TTL = int(os.getenv("REDIS_TTL", 300))  # 5 minutos
+PAYLOAD_CODEC = os.getenv("PAYLOAD_CODEC", "orjson")  # json | orjson | msgpack (leitura detecta o formato)
 
 # Scraping
 SCRAPING_DELAY_MIN = float(os.getenv("SCRAPING_DELAY_MIN", 0.5))
@@ -29,6 +30,15 @@ MT5_DI_SYMBOL = os.getenv("MT5_DI_SYMBOL", "WINZ25") # Símbolo para o DI
 
 # WebSocket
 WS_UPDATE_INTERVAL = float(os.getenv("WS_UPDATE_INTERVAL", 5.0))  # 5 segundos
+# Push: broadcast a cada entrada do stream do bridge (o polling por WS_UPDATE_INTERVAL fica de fallback)
+WS_PUSH_ENABLED = os.getenv("WS_PUSH_ENABLED", "true").lower() == "true"
+MARKET_DATA_STREAM = os.getenv("MARKET_DATA_STREAM", "market_data:stream")
+
+# Snapshot History (Parquet por dia com cada market_data recebido)
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "true").lower() == "true"
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(os.getcwd(), "data", "snapshots"))
+SNAPSHOT_FLUSH_SECONDS = float(os.getenv("SNAPSHOT_FLUSH_SECONDS", 60))
+SNAPSHOT_RETENTION_DAYS = int(os.getenv("SNAPSHOT_RETENTION_DAYS", 30))
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
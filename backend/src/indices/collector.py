@@ -1,11 +1,12 @@
 import asyncio
 import logging
-import json
 from src.cache.redis_manager import RedisManager
+from src.snapshots.store import SnapshotStore
+from src.config import MARKET_DATA_STREAM
 from src.indices.models import (
     DashboardData, IndicesGlobais, Commodities, IBOVTop10, Taxas, 
     MarketBreadth, BasisData, IndiceData, CalendarEvent, SentimentComparison,
-    VolatilityRegime, QuantDashboardData
+    VolatilityRegime, QuantDashboardData, ScrapeFreshness
 )
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional
@@ -13,8 +14,10 @@ from typing import Dict, Any, Optional
 logger = logging.getLogger(__name__)
 
 class IndicesCollector:
-    def __init__(self, redis_manager: RedisManager):
+    def __init__(self, redis_manager: RedisManager, snapshot_store: Optional[SnapshotStore] = None):
         self.redis = redis_manager
+        self.snapshots = snapshot_store
+        self.flush_task: Optional[asyncio.Task] = None
         
         # Mapeamento para organizar os dados do Redis (macro) nas categorias certas
         self.indices_map = ["SP500", "NASDAQ", "DXY", "DOW_JONES", "DAX40", "US10Y", "EWZ", "PBR", "VALE_ADR"]
@@ -23,6 +26,13 @@ class IndicesCollector:
         
         # State for Signal History
         self.signal_history = []
+        
+        # Seções do market_data já lidas: nome -> (versão, dados)
+        self.market_sections = {}
+        
+        # Push do bridge (market_data:stream): última entrada lida e seu manifest
+        self.stream_id = "$"
+        self.pushed_manifest = None
 
     def _calculate_spx_signal(self, sp500_data: IndiceData) -> str:
         if not sp500_data or sp500_data.var_pct is None:
@@ -41,6 +51,112 @@ class IndicesCollector:
             if len(self.signal_history) > 5:
                 self.signal_history.pop(0)
 
+    @staticmethod
+    def _freshness(freshness: Optional[Dict[str, Any]], timestamp: Optional[str]):
+        """Freshness dos valores raspados, com a idade contra o timestamp da publicação."""
+        if not freshness:
+            return None
+        published = datetime.fromisoformat(timestamp) if timestamp else None
+        result = {}
+        for cache, items in freshness.items():
+            result[cache] = {}
+            for name, info in items.items():
+                age = None
+                if published and info.get("fetched_at"):
+                    age = round((published - datetime.fromisoformat(info["fetched_at"])).total_seconds(), 1)
+                result[cache][name] = ScrapeFreshness(**info, age_s=age)
+        return result
+
+    async def wait_for_update(self, timeout: float) -> bool:
+        """
+        Bloqueia no stream do bridge até a próxima publicação (XREAD BLOCK).
+        
+        As seções que vieram nas entradas vão direto para o cache local, e o
+        manifest da última entrada é usado pelo próximo `collect_all` sem
+        nova leitura do Redis.
+        
+        Returns:
+            True se chegou publicação nova, False se deu timeout
+        
+        Raises:
+            Erros do Redis (o broadcaster cai para polling)
+        """
+        entries = await self.redis.xread(MARKET_DATA_STREAM, self.stream_id, int(timeout * 1000))
+        if not entries:
+            return False
+        
+        # Entradas em ordem: cada uma vira um snapshot no histórico
+        for entry_id, fields in entries:
+            manifest = self.redis.codec.decode(fields[b"manifest"])
+            versions = manifest.get("sections", {})
+            for field, raw in fields.items():
+                if field.startswith(b"section:"):
+                    name = field[len(b"section:"):].decode()
+                    if name in versions:
+                        self.market_sections[name] = (versions[name]["version"], self.redis.codec.decode(raw))
+            self._record_manifest(manifest)
+        
+        self.stream_id = entry_id
+        self.pushed_manifest = manifest
+        return True
+
+    def _record_manifest(self, manifest: Dict[str, Any]):
+        """Guarda o snapshot descrito pelo manifest se o cache local está nessas versões."""
+        if self.snapshots is None:
+            return
+        sections = manifest.get("sections", {})
+        if any(self.market_sections.get(name, (None,))[0] != info.get("version") for name, info in sections.items()):
+            return  # Entradas perdidas: o próximo _read_market_data completa e grava
+        data = {name: self.market_sections[name][1] for name in sections}
+        self._record(manifest.get("timestamp"), data)
+
+    def _record(self, timestamp: Optional[str], data: Dict[str, Any]):
+        """Acrescenta o snapshot ao histórico (flush em thread quando o buffer enche)."""
+        if self.snapshots is None or not timestamp:
+            return
+        try:
+            if self.snapshots.append(datetime.fromisoformat(timestamp), data):
+                if self.flush_task is None or self.flush_task.done():
+                    self.flush_task = asyncio.create_task(asyncio.to_thread(self.snapshots.flush))
+        except Exception as e:
+            logger.error(f"❌ Erro ao gravar snapshot: {e}")
+
+    async def _read_market_data(self) -> Optional[Dict[str, Any]]:
+        """
+        Lê o market_data publicado pelo bridge.
+        
+        Lê o manifest (market_data:manifest, ou o recebido pelo stream) e
+        busca num único MGET só as seções cuja versão mudou desde a última
+        leitura; as demais vêm do cache local. Sem manifest, cai no JSON
+        agregado (market_data).
+        """
+        manifest, self.pushed_manifest = self.pushed_manifest, None
+        if manifest is None:
+            manifest = await self.redis.get_data("market_data:manifest")
+        if not manifest:
+            data = await self.redis.get_data("market_data")
+            if data:
+                self._record(data.get("timestamp"), data)
+            return data
+        
+        sections = manifest.get("sections", {})
+        stale = [
+            name for name, info in sections.items()
+            if self.market_sections.get(name, (None,))[0] != info.get("version")
+        ]
+        if stale:
+            values = await self.redis.mget([f"market_data:{name}" for name in stale])
+            for name, raw in zip(stale, values):
+                if raw is not None:
+                    self.market_sections[name] = (sections[name]["version"], self.redis.codec.decode(raw))
+        
+        self._record_manifest(manifest)
+        
+        data = {name: self.market_sections[name][1] for name in sections if name in self.market_sections}
+        data["changed"] = manifest.get("changed", [])
+        data["timestamp"] = manifest.get("timestamp")
+        return data
+
     async def collect_all(self) -> DashboardData:
         """
         Coleta dados agregados do Redis (enviados pelo bridge.py).
@@ -52,13 +168,14 @@ class IndicesCollector:
         breadth_data = None
         basis_value = None
         sentiment_comparison = None
+        freshness_data = None
+        data = None
         
         try:
-            # Lê o JSON agregado do Redis
-            raw_data = await self.redis.get("market_data")
+            # Lê as seções do market_data (ou o JSON agregado legado)
+            data = await self._read_market_data()
             
-            if raw_data:
-                data = json.loads(raw_data)
+            if data:
                 macro = data.get("macro", {})
                 mt5 = data.get("mt5", {})
                 
@@ -110,6 +227,9 @@ class IndicesCollector:
                     else:
                         basis_value = BasisData(value=float(data["basis"]), interpretation="LEGACY")
 
+                # Idade/origem dos valores raspados (macro/tv)
+                freshness_data = self._freshness(data.get("freshness"), data.get("timestamp"))
+
                 # Volatility Regime
                 volatility_data = None
                 if "volatility" in data and data["volatility"]:
@@ -159,17 +279,14 @@ class IndicesCollector:
         # 6. AI Analysis Report
         ai_analysis = None
         try:
-            raw_ai = await self.redis.get("ai_analyst_report")
-            if raw_ai:
-                ai_analysis = json.loads(raw_ai)
+            ai_analysis = await self.redis.get_data("ai_analyst_report")
         except Exception as e:
             logger.error(f"❌ Erro ao buscar AI report: {e}")
 
         # Extract WIN/WDO snapshots from MT5 data if available
         win_snapshot = None
         wdo_snapshot = None
-        if raw_data:
-            data = json.loads(raw_data)
+        if data:
             mt5 = data.get("mt5", {})
             # Try standard keys
             if "WIN$N" in mt5: win_snapshot = IndiceData(**mt5["WIN$N"])
@@ -194,11 +311,12 @@ class IndicesCollector:
             ai_analysis=ai_analysis,
             win=win_snapshot,
             wdo=wdo_snapshot,
+            freshness=freshness_data,
             timestamp=datetime.now(timezone(timedelta(hours=-3))).isoformat(),
             formatted_time=datetime.now(timezone(timedelta(hours=-3))).strftime("%H:%M:%S")
         )
         
         # Salva em cache para API
-        await self.redis.set("dashboard_data", dashboard_data.model_dump_json(), ttl=self.redis.ttl)
+        await self.redis.set_data("dashboard_data", dashboard_data.model_dump(mode="json"), ttl=self.redis.ttl)
         
         return dashboard_data
@@ -88,12 +88,27 @@ class VolatilityRegime(BaseModel):
     ratio: float
     atr5: float
     atr20: float
+    atr5_sma: Optional[float] = None   # ATR por média simples (mesmas barras do Wilder)
+    atr20_sma: Optional[float] = None
+    bar_time: Optional[int] = None     # Abertura da última barra usada (epoch, horário do servidor)
     implication: str
+    intraday: Optional[Dict[str, Optional[Dict[str, Any]]]] = None # Key: Timeframe (H1/M5)
 
 class QuantDashboardData(BaseModel):
     flows: Dict[str, Dict[str, int]] # Key: Asset (WIN/WDO), Value: Flow Dict
     score: Dict[str, Dict[str, Any]] # Key: Asset (WIN/WDO), Value: Score Dict
 
+class ScrapeFreshness(BaseModel):
+    fetched_at: Optional[str] = None  # Última coleta com sucesso (relógio do bridge)
+    age_s: Optional[float] = None     # Idade do valor no momento da publicação
+    source: Optional[str] = None
+    stale: bool = False               # Última tentativa falhou: valor servido do cache
+    error: Optional[str] = None
+    failures: int = 0
+    breaker: str = "closed"           # closed | open | half_open
+    retry_at: Optional[str] = None
+    market: Optional[str] = None      # open | extended | closed
+
 class DashboardData(BaseModel):
     indices_globais: IndicesGlobais
     commodities: Commodities
@@ -109,5 +124,6 @@ class DashboardData(BaseModel):
     ai_analysis: Optional[Dict[str, Any]] = None
     win: Optional[IndiceData] = None 
     wdo: Optional[IndiceData] = None 
+    freshness: Optional[Dict[str, Dict[str, ScrapeFreshness]]] = None # Key: macro/tv -> name
     timestamp: str
     formatted_time: str
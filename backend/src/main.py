@@ -1,15 +1,17 @@
 import asyncio
 import logging
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import json
+from src.utils.codec import to_json
 from datetime import datetime
+from typing import Optional
 
-from src.config import API_TITLE, API_HOST, API_PORT, DEBUG, WS_UPDATE_INTERVAL, MT5_HOST, MT5_PORT, MT5_DI_SYMBOL
+from src.config import API_TITLE, API_HOST, API_PORT, DEBUG, WS_UPDATE_INTERVAL, MT5_HOST, MT5_PORT, MT5_DI_SYMBOL, SNAPSHOT_ENABLED
 from src.utils.logging_config import setup_logging
 from src.indices.collector import IndicesCollector
 from src.cache.redis_manager import RedisManager
+from src.snapshots.store import SnapshotStore
 from src.websocket.manager import ConnectionManager
 from src.websocket.manager import ConnectionManager
 from src.websocket.broadcaster import WebSocketBroadcaster
@@ -22,6 +24,7 @@ logger = logging.getLogger(__name__)
 # Globals
 redis_manager: RedisManager = None
 indices_collector: IndicesCollector = None
+snapshot_store: SnapshotStore = None
 connection_manager: ConnectionManager = ConnectionManager()
 broadcaster: WebSocketBroadcaster = None
 broadcaster_task: asyncio.Task = None
@@ -31,12 +34,13 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"🚀 {API_TITLE} iniciando...")
     
-    global redis_manager, indices_collector, broadcaster, broadcaster_task
+    global redis_manager, indices_collector, snapshot_store, broadcaster, broadcaster_task
     
     redis_manager = RedisManager()
     await redis_manager.connect()
     
-    indices_collector = IndicesCollector(redis_manager)
+    snapshot_store = SnapshotStore() if SNAPSHOT_ENABLED else None
+    indices_collector = IndicesCollector(redis_manager, snapshot_store)
     
     broadcaster = WebSocketBroadcaster(connection_manager, indices_collector, interval=WS_UPDATE_INTERVAL)
     broadcaster_task = asyncio.create_task(broadcaster.start())
@@ -50,6 +54,8 @@ async def lifespan(app: FastAPI):
     broadcaster.stop()
     if broadcaster_task:
         await broadcaster_task # Espera a tarefa ser cancelada
+    if snapshot_store:
+        await asyncio.to_thread(snapshot_store.flush)
     await redis_manager.disconnect()
     logger.info("✅ Encerrado")
 
@@ -69,9 +75,9 @@ app.include_router(audit.router)
 async def get_dashboard_data():
     """Retorna dados do dashboard (índices, commodities, taxas)"""
     try:
-        data = await redis_manager.get("dashboard_data")
+        data = await redis_manager.get_data("dashboard_data")
         if data:
-            return json.loads(data)
+            return data
         
         # Se não houver cache, coleta agora
         dashboard_data = await indices_collector.collect_all()
@@ -92,10 +98,10 @@ async def get_history(asset: str, timeframe: str = "D1"):
         # O Bridge salva como history:WIN$N:D1
         
         key = f"history:{asset}:{timeframe}"
-        data = await redis_manager.get(key)
+        data = await redis_manager.get_data(key)
         
         if data:
-            return json.loads(data)
+            return data
         
         return {"error": "No history found", "key": key}
     
@@ -107,15 +113,42 @@ async def get_history(asset: str, timeframe: str = "D1"):
         logger.error(f"❌ Erro em /api/history: {e}")
         return {"error": str(e)}
 
+@app.get("/api/snapshots")
+async def get_snapshots(
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Histórico intraday dos snapshots do market_data.
+    from/to: ISO (ex: 2026-10-18T10:30:00), padrão = hoje até agora.
+    fields: caminhos separados por vírgula, exatos ou prefixos
+    (ex: quant_dashboard.score.WIN.score,breadth). Vazio = todos.
+    """
+    if not snapshot_store:
+        return {"error": "Snapshot history disabled"}
+    try:
+        end = datetime.fromisoformat(to) if to else datetime.now()
+        start = datetime.fromisoformat(from_) if from_ else end.replace(hour=0, minute=0, second=0, microsecond=0)
+        selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        
+        # Leitura do Parquet fora do event loop
+        result = await asyncio.to_thread(snapshot_store.query, start, end, selected)
+        return Response(content=to_json(result), media_type="application/json")
+    
+    except Exception as e:
+        logger.error(f"❌ Erro em /api/snapshots: {e}")
+        return {"error": str(e)}
+
 @app.get("/api/analysis/latest")
 async def get_latest_analysis():
     """
     Retorna o último relatório gerado pelo AI Analyst.
     """
     try:
-        data = await redis_manager.get("ai_analyst_report")
+        data = await redis_manager.get_data("ai_analyst_report")
         if data:
-            return json.loads(data)
+            return data
         return {"sentiment": "NEUTRAL", "summary": "Aguardando análise...", "confidence": 0}
     except Exception as e:
         logger.error(f"❌ Erro em /api/analysis/latest: {e}")
@@ -128,13 +161,13 @@ async def websocket_endpoint(websocket: WebSocket):
         await connection_manager.connect(websocket)
         
         # Envia o último estado do dashboard imediatamente após a conexão
-        cached_data = await redis_manager.get("dashboard_data")
+        cached_data = await redis_manager.get_data("dashboard_data")
         if cached_data:
-            await websocket.send_json({
+            await websocket.send_text(to_json({
                 "type": "DASHBOARD_UPDATE",
-                "data": json.loads(cached_data),
+                "data": cached_data,
                 "timestamp": datetime.now().isoformat()
-            })
+            }))
         
         while True:
             # Mantém conexão aberta, pode receber mensagens do cliente se necessário
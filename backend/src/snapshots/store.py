@@ -0,0 +1,242 @@
+"""
+Snapshot Store
+==============
+Histórico intraday dos snapshots do market_data em Parquet, particionado
+por dia:
+
+    <SNAPSHOT_DIR>/2026-10-18/093000123456-000001.parquet   (partes, a cada flush)
+    <SNAPSHOT_DIR>/2026-10-17.parquet                       (dia compactado)
+
+Cada snapshot vira uma linha com uma coluna por folha do payload, com o
+caminho em notação de ponto (`quant_dashboard.score.WIN.score`,
+`breadth.up`, ...). Números viram float64, listas viram texto JSON.
+Como o Parquet é colunar, `query` lê só as colunas pedidas (e só os row
+groups do intervalo), sem decodificar o payload inteiro.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import SNAPSHOT_DIR, SNAPSHOT_FLUSH_SECONDS, SNAPSHOT_RETENTION_DAYS
+from src.utils.codec import to_json
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP = "timestamp"
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def flatten(obj: Any, prefix: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Achata dicts aninhados em {"a.b.c": valor} (números -> float, listas -> JSON)."""
+    if out is None:
+        out = {}
+    for key, value in obj.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            if value:
+                flatten(value, path + ".", out)
+        elif isinstance(value, bool) or value is None or isinstance(value, str):
+            out[path] = value
+        elif isinstance(value, (int, float)):
+            out[path] = float(value)
+        else:
+            out[path] = to_json(value)
+    return out
+
+
+def _column(values: list) -> pa.Array:
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Tipos misturados na mesma coluna: guarda como texto
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _select(names: List[str], fields: Optional[List[str]]) -> List[str]:
+    """Colunas pedidas: nome exato ou prefixo (`breadth` -> `breadth.*`)."""
+    if not fields:
+        return [n for n in names if n != TIMESTAMP]
+    return [
+        n for n in names
+        if n != TIMESTAMP and any(n == f or n.startswith(f + ".") for f in fields)
+    ]
+
+
+def _concat(tables: List[pa.Table]) -> pa.Table:
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mesma coluna com tipos incompatíveis entre partes: tudo vira texto
+        as_text = []
+        for table in tables:
+            as_text.append(pa.table({
+                name: col if name == TIMESTAMP or col.type == pa.string() else col.cast(pa.string())
+                for name, col in zip(table.column_names, table.columns)
+            }))
+        return pa.concat_tables(as_text, promote_options="permissive")
+
+
+class SnapshotStore:
+    """
+    Grava snapshots em memória e descarrega uma parte Parquet por dia a cada
+    `flush_seconds`. Na virada do dia as partes do dia anterior são
+    compactadas num único arquivo e dias além da retenção são apagados.
+    """
+
+    def __init__(self, directory: str = SNAPSHOT_DIR, flush_seconds: float = SNAPSHOT_FLUSH_SECONDS,
+                 retention_days: int = SNAPSHOT_RETENTION_DAYS):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.retention_days = retention_days
+        self.buffer: List[Dict[str, Any]] = []
+        self.buffer_day: Optional[date] = None
+        self.first_buffered: Optional[datetime] = None
+        self.last_timestamp: Optional[datetime] = None
+        self.seq = 0
+        self.lock = threading.Lock()  # append (event loop) x flush/query (threads)
+        os.makedirs(self.directory, exist_ok=True)
+
+    # ------------------------------------------------------------------ escrita
+
+    def append(self, timestamp: datetime, snapshot: Dict[str, Any]) -> bool:
+        """
+        Acrescenta um snapshot (ignorado se não for mais novo que o último).
+
+        Returns:
+            True se o buffer deve ser descarregado (`flush`)
+        """
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+
+        row = flatten(snapshot)
+        row[TIMESTAMP] = timestamp
+        with self.lock:
+            if self.buffer_day is not None and timestamp.date() != self.buffer_day:
+                # Virada do dia: o buffer do dia anterior vai para disco antes
+                self._flush_locked()
+            if not self.buffer:
+                self.buffer_day = timestamp.date()
+                self.first_buffered = timestamp
+            self.buffer.append(row)
+            self.last_timestamp = timestamp
+            return (timestamp - self.first_buffered).total_seconds() >= self.flush_seconds
+
+    def flush(self):
+        """Grava o buffer como uma nova parte do dia."""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.buffer:
+            return
+        rows, day, first = self.buffer, self.buffer_day, self.first_buffered
+        self.buffer, self.buffer_day, self.first_buffered = [], None, None
+
+        names = {TIMESTAMP: None}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        table = pa.table({name: _column([row.get(name) for row in rows]) for name in names})
+
+        day_dir = os.path.join(self.directory, day.strftime(DAY_FORMAT))
+        os.makedirs(day_dir, exist_ok=True)
+        self.seq += 1
+        path = os.path.join(day_dir, f"{first:%H%M%S%f}-{self.seq:06d}.parquet")
+        pq.write_table(table, path, compression="zstd")
+        logger.debug(f"💾 {len(rows)} snapshots -> {path}")
+
+        self._compact_past_days(day)
+
+    def _compact_past_days(self, today: date):
+        """Junta as partes de dias anteriores num arquivo por dia e aplica a retenção."""
+        oldest = today - timedelta(days=self.retention_days)
+        for entry in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, entry)
+            try:
+                day = datetime.strptime(entry.split(".")[0], DAY_FORMAT).date()
+            except ValueError:
+                continue
+
+            if day < oldest:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+                logger.info(f"🗑️ Snapshots de {entry} removidos (retenção {self.retention_days}d)")
+            elif day < today and os.path.isdir(path):
+                parts = [os.path.join(path, p) for p in sorted(os.listdir(path)) if p.endswith(".parquet")]
+                if os.path.exists(path + ".parquet"):
+                    parts.insert(0, path + ".parquet")  # Partes tardias (restart) somam ao dia já compactado
+                if parts:
+                    table = _concat([pq.read_table(p) for p in parts]).sort_by(TIMESTAMP)
+                    pq.write_table(table, path + ".parquet", compression="zstd", row_group_size=10_000)
+                shutil.rmtree(path)
+                logger.info(f"📦 Snapshots de {entry} compactados ({len(parts)} partes)")
+
+    # ------------------------------------------------------------------ leitura
+
+    def _files(self, start: datetime, end: datetime) -> List[str]:
+        files = []
+        day = start.date()
+        while day <= end.date():
+            name = day.strftime(DAY_FORMAT)
+            compacted = os.path.join(self.directory, name + ".parquet")
+            day_dir = os.path.join(self.directory, name)
+            if os.path.exists(compacted):
+                files.append(compacted)
+            if os.path.isdir(day_dir):
+                files.extend(os.path.join(day_dir, p) for p in sorted(os.listdir(day_dir)) if p.endswith(".parquet"))
+            day += timedelta(days=1)
+        return files
+
+    def query(self, start: datetime, end: datetime, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Snapshots com start <= timestamp <= end, só com as colunas pedidas.
+
+        Args:
+            start: Início (inclusivo)
+            end: Fim (inclusivo)
+            fields: Caminhos ou prefixos (`quant_dashboard.score.WIN.score`, `breadth`);
+                    vazio = todas as colunas
+
+        Returns:
+            Dict colunar {"timestamp": [...], "<coluna>": [...]}
+        """
+        tables = []
+        for path in self._files(start, end):
+            columns = _select(pq.read_schema(path).names, fields)
+            if fields and not columns:
+                continue
+            tables.append(pq.read_table(
+                path,
+                columns=[TIMESTAMP] + columns,
+                filters=[(TIMESTAMP, ">=", start), (TIMESTAMP, "<=", end)]
+            ))
+
+        # Linhas ainda no buffer (últimos segundos)
+        with self.lock:
+            recent = [row for row in self.buffer if start <= row[TIMESTAMP] <= end]
+        if recent:
+            names = {TIMESTAMP: None}
+            for row in recent:
+                names.update(dict.fromkeys(row))
+            columns = [TIMESTAMP] + _select(list(names), fields)
+            tables.append(pa.table({name: _column([row.get(name) for row in recent]) for name in columns}))
+
+        tables = [t for t in tables if t.num_rows]
+        if not tables:
+            return {TIMESTAMP: []}
+
+        table = _concat(tables).sort_by(TIMESTAMP)
+        result = table.to_pydict()
+        result[TIMESTAMP] = [ts.isoformat() for ts in result[TIMESTAMP]]
+        return result
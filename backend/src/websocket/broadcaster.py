@@ -2,22 +2,47 @@ import asyncio
 import logging
 from src.websocket.manager import ConnectionManager
 from src.indices.collector import IndicesCollector
-from src.config import WS_UPDATE_INTERVAL
+from src.config import WS_UPDATE_INTERVAL, WS_PUSH_ENABLED
 
 logger = logging.getLogger(__name__)
 
 class WebSocketBroadcaster:
-    def __init__(self, manager: ConnectionManager, collector: IndicesCollector, interval: float = WS_UPDATE_INTERVAL):
+    def __init__(self, manager: ConnectionManager, collector: IndicesCollector, interval: float = WS_UPDATE_INTERVAL, push: bool = WS_PUSH_ENABLED):
         self.manager = manager
         self.collector = collector
         self.interval = interval
+        self.push = push
+        self.push_ok = True  # Stream respondendo (False = caiu para polling)
         self.running = False
         self.broadcast_task: asyncio.Task = None
     
+    async def _wait_next(self):
+        """
+        Espera a próxima publicação do bridge (stream) ou, sem push, o intervalo.
+        Com push, o intervalo vira o timeout do XREAD: sem publicações o
+        broadcast continua periódico (polling).
+        """
+        if not self.push:
+            await asyncio.sleep(self.interval)
+            return
+        try:
+            await self.collector.wait_for_update(self.interval)
+            if not self.push_ok:
+                logger.info("✅ Stream do bridge de volta, broadcast por push")
+                self.push_ok = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.push_ok:
+                logger.warning(f"⚠️ Stream do bridge indisponível, usando polling: {e}")
+                self.push_ok = False
+            await asyncio.sleep(self.interval)
+    
     async def start(self):
-        """Inicia o broadcast periódico"""
+        """Inicia o broadcast (push pelo stream do bridge, polling como fallback)"""
         self.running = True
-        logger.info(f"🔄 Iniciando broadcaster com intervalo de {self.interval}s")
+        mode = "push (stream) + polling de fallback" if self.push else "polling"
+        logger.info(f"🔄 Iniciando broadcaster: {mode}, intervalo de {self.interval}s")
         
         while self.running:
             try:
@@ -27,8 +52,8 @@ class WebSocketBroadcaster:
                 # Envia via WebSocket
                 await self.manager.broadcast(dashboard_data.model_dump())
                 
-                # Aguarda intervalo
-                await asyncio.sleep(self.interval)
+                # Aguarda a próxima publicação (ou o intervalo)
+                await self._wait_next()
             
             except asyncio.CancelledError:
                 logger.info("⛔ Broadcaster task cancelada.")
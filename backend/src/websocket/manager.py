@@ -1,8 +1,8 @@
 import logging
 from typing import Set, List
 from fastapi import WebSocket
-import json
 from datetime import datetime
+from src.utils.codec import to_json
 
 logger = logging.getLogger(__name__)
 
@@ -22,18 +22,21 @@ class ConnectionManager:
     async def broadcast(self, message: dict):
         """Envia mensagem para todos os clientes conectados"""
         if not self.active_connections:
-            logger.warning("⚠️ Nenhuma conexão ativa para broadcast.")
+            logger.debug("Nenhuma conexão ativa para broadcast.")
             return
         
         disconnected = set()
         
+        # Serializa uma vez para todos os clientes
+        text = to_json({
+            "type": "DASHBOARD_UPDATE", # Tipo de mensagem genérico para o dashboard
+            "data": message,
+            "timestamp": datetime.now().isoformat()
+        })
+        
         for connection in list(self.active_connections): # Usar list() para evitar RuntimeError durante iteração e modificação
             try:
-                await connection.send_json({
-                    "type": "DASHBOARD_UPDATE", # Tipo de mensagem genérico para o dashboard
-                    "data": message,
-                    "timestamp": datetime.now().isoformat()
-                })
+                await connection.send_text(text)
             except Exception as e:
                 logger.error(f"❌ Erro ao enviar para cliente {connection.client}: {e}")
                 disconnected.add(connection)
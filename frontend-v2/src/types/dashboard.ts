@@ -89,7 +89,13 @@ export interface VolatilityRegime {
     ratio: number;
     atr5: number;
     atr20: number;
+    atr5_sma?: number;
+    atr20_sma?: number;
+    bar_time?: number;
     implication: string;
+    intraday?: {
+        [timeframe: string]: { status: string; ratio: number } | null;
+    };
 }
 
 export interface QuantDashboardData {
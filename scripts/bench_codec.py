@@ -0,0 +1,119 @@
+"""
+Benchmark: Codecs do payload (json vs orjson vs msgpack)
+========================================================
+Mede encode/decode e tamanho de cada formato de `bridge_core.codec` sobre
+payloads reais capturados:
+
+    # payloads de um pregão gravado (um market_data completo por linha)
+    python scripts/replay.py <dir> --output payloads.jsonl
+    python scripts/bench_codec.py payloads.jsonl
+
+    # ou o que está no Redis agora (seções do market_data + dashboard_data)
+    python scripts/bench_codec.py --redis
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add 'scripts' directory to path so we can import bridge_core directly
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bridge_core import codec
+
+
+def load_file(path: str, limit: int) -> list:
+    payloads = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                payloads.append(json.loads(line))
+            if len(payloads) >= limit:
+                break
+    return payloads
+
+
+def load_redis() -> list:
+    import redis
+    from bridge_core.config import BridgeConfig
+
+    client = redis.Redis(host=BridgeConfig.REDIS_HOST, port=BridgeConfig.REDIS_PORT, db=0)
+    payloads = []
+
+    manifest = codec.decode(client.get("market_data:manifest"))
+    if manifest:
+        names = list(manifest.get("sections", {}))
+        values = client.mget([f"market_data:{name}" for name in names])
+        payloads.append({name: codec.decode(v) for name, v in zip(names, values) if v is not None})
+    for key in ("market_data", "dashboard_data"):
+        value = client.get(key)
+        if value:
+            payloads.append(codec.decode(value))
+    return payloads
+
+
+def bench(fmt: str, payloads: list, repeat: int) -> dict:
+    encoded = [codec.encode(p, fmt) for p in payloads]
+    # codec.decode lê JSON com orjson quando instalado; a linha "json" mede a stdlib
+    decode = json.loads if fmt == "json" else codec.decode
+
+    best_encode = best_decode = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for p in payloads:
+            codec.encode(p, fmt)
+        best_encode = min(best_encode, time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for e in encoded:
+            decode(e)
+        best_decode = min(best_decode, time.perf_counter() - t0)
+
+    n = len(payloads)
+    return {
+        "encode_us": best_encode / n * 1e6,
+        "decode_us": best_decode / n * 1e6,
+        "bytes": sum(len(e) for e in encoded) / n
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos codecs do payload")
+    parser.add_argument("file", nargs="?", help="JSONL com um payload por linha (replay.py --output)")
+    parser.add_argument("--redis", action="store_true", help="Usa os valores atuais do Redis")
+    parser.add_argument("--limit", type=int, default=1000, help="Máximo de payloads lidos do arquivo")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.redis:
+        payloads = load_redis()
+    elif args.file:
+        payloads = load_file(args.file, args.limit)
+    else:
+        parser.error("informe um arquivo JSONL ou --redis")
+
+    if not payloads:
+        print("⚠️ Nenhum payload encontrado.")
+        return
+
+    formats = [fmt for fmt in codec.FORMATS if codec.available(fmt)]
+    missing = [fmt for fmt in codec.FORMATS if fmt not in formats]
+    print(f"📦 {len(payloads)} payloads, {args.repeat} rodadas" + (f" (sem {', '.join(missing)})" if missing else ""))
+
+    results = {fmt: bench(fmt, payloads, args.repeat) for fmt in formats}
+    base = results["json"]
+
+    print("=" * 60)
+    print(f"{'codec':<8} {'encode µs':>10} {'decode µs':>10} {'bytes':>10} {'vs json':>16}")
+    for fmt, r in results.items():
+        speedup = (base["encode_us"] + base["decode_us"]) / (r["encode_us"] + r["decode_us"])
+        size = r["bytes"] / base["bytes"] * 100
+        print(f"{fmt:<8} {r['encode_us']:10.1f} {r['decode_us']:10.1f} {r['bytes']:10.0f} "
+              f"{speedup:6.1f}x {size:6.1f}%")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: Extração de cotação do Investing.com
+===============================================
+Compara o parse completo (html.parser + todos os seletores) com o caminho
+rápido (`extract_quote_fast`: lxml + XPath, ou SoupStrainer sem lxml)
+sobre páginas salvas:
+
+    python scripts/bench_investing_parse.py                      # fixtures/investing/*.html
+    python scripts/bench_investing_parse.py --recording <dir>    # páginas de uma gravação (BRIDGE_RECORD_DIR)
+
+Fixtures:
+    spx_modern.html            layout atual (data-test instrument-price-*)
+    ibov_legacy_header.html    cabeçalho antigo (data-test instrument-header-*)
+    cloudflare_challenge.html  bloqueio: sem cotação, cai no parse completo
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+
+# Add 'scripts' directory to path so we can import bridge_core directly
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+
+from bridge_core import investing_client
+from bridge_core.investing_client import (
+    extract_quote, extract_quote_fast, extract_quote_full,
+    PRICE_TEST_IDS, CHANGE_TEST_IDS, _QUOTE_STRAINER, _first
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "investing")
+
+
+def load_fixtures(directory: str) -> dict:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def load_recording(directory: str) -> dict:
+    """Corpo das páginas do Investing gravadas em events.jsonl.gz."""
+    pages = {}
+    with gzip.open(os.path.join(directory, "events.jsonl.gz"), "rt", encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            if event.get("kind") == "http" and "investing.com" in str(event.get("key")):
+                body = event["data"].get("body")
+                if body:
+                    pages[f"{event['key']}@{event['t']}"] = body
+    return pages
+
+
+def strainer_only(html: str):
+    """Caminho rápido forçado para SoupStrainer (como sem lxml instalado)."""
+    soup = BeautifulSoup(html, 'html.parser', parse_only=_QUOTE_STRAINER)
+    found = {}
+    for node in soup.find_all(attrs={"data-test": True}):
+        found.setdefault(node["data-test"], node.text)
+    return _first(found, PRICE_TEST_IDS), _first(found, CHANGE_TEST_IDS)
+
+
+def timeit(fn, pages: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for html in pages:
+            fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def clean(value):
+    return value.strip() if value is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da extração de cotação do Investing.com")
+    parser.add_argument("--fixtures", default=FIXTURES, help="Diretório com páginas .html salvas")
+    parser.add_argument("--recording", help="Diretório de gravação (events.jsonl.gz)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_recording(args.recording) if args.recording else load_fixtures(args.fixtures)
+    if not pages:
+        print("⚠️ Nenhuma página encontrada.")
+        return
+
+    # Conferência: o caminho adotado (rápido com fallback) bate com o parse completo
+    print("=" * 72)
+    for name, html in pages.items():
+        price, change, path = extract_quote(html)
+        full = tuple(clean(v) for v in extract_quote_full(html))
+        status = "ok" if (clean(price), clean(change)) == full else f"DIVERGE (completo: {full})"
+        print(f"{name[:40]:<40} {path:<5} {clean(price)!s:>10} {clean(change)!s:>10}  {status}")
+
+    html_list = list(pages.values())
+    total_mb = sum(len(h) for h in html_list) / 1e6
+    methods = [
+        ("completo (html.parser + seletores)", extract_quote_full),
+        ("SoupStrainer (data-test)", strainer_only),
+    ]
+    if investing_client.lxml_html is not None:
+        methods.append(("lxml + XPath", extract_quote_fast))
+    methods.append(("extract_quote (rápido + fallback)", extract_quote))
+
+    print("=" * 72)
+    print(f"📄 {len(html_list)} páginas, {total_mb:.2f} MB, {args.repeat} rodadas")
+    base = None
+    for label, fn in methods:
+        elapsed = timeit(fn, html_list, args.repeat)
+        base = base or elapsed
+        print(f"{label:<36} {len(html_list) / elapsed:8.1f} páginas/s {total_mb / elapsed:8.1f} MB/s {base / elapsed:6.1f}x")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
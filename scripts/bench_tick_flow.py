@@ -0,0 +1,114 @@
+"""
+Benchmark: Fluxo de Agressão (iterrows vs kernel vetorizado)
+=============================================================
+Compara o caminho antigo (DataFrame + iterrows) com `aggression_totals`
+sobre um array sintético no mesmo dtype de `mt5.copy_ticks_range`.
+
+Não precisa do MT5. Uso:
+    python scripts/bench_tick_flow.py [--ticks 1000000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add 'scripts' directory to path so we can import bridge_core directly
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bridge_core.flow_kernels import aggression_totals, TICK_FLAG_BUY, TICK_FLAG_SELL
+
+# Mesmo layout do array retornado por mt5.copy_ticks_*
+TICK_DTYPE = np.dtype([
+    ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"),
+    ("volume", "<u8"), ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8")
+])
+
+
+def make_ticks(n: int, seed: int = 42) -> np.ndarray:
+    """Gera n ticks de negócio sintéticos (WIN ~ 130.000 pts)."""
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n, dtype=TICK_DTYPE)
+
+    start_msc = 1_760_000_000_000
+    ticks["time_msc"] = start_msc + np.cumsum(rng.integers(0, 20, n))
+    ticks["time"] = ticks["time_msc"] // 1000
+    ticks["last"] = 130_000 + np.cumsum(rng.choice([-5, 0, 5], n))
+    ticks["bid"] = ticks["last"] - 5
+    ticks["ask"] = ticks["last"] + 5
+    ticks["volume"] = rng.integers(1, 50, n)
+    ticks["volume_real"] = ticks["volume"]
+
+    # ~48% compra, ~48% venda, ~4% sem agressor (leilão / cross)
+    side = rng.random(n)
+    flags = np.full(n, 8 | 16, dtype=np.uint32)  # LAST | VOLUME
+    flags[side < 0.48] |= TICK_FLAG_BUY
+    flags[(side >= 0.48) & (side < 0.96)] |= TICK_FLAG_SELL
+    ticks["flags"] = flags
+    return ticks
+
+
+def legacy_flow(ticks: np.ndarray) -> dict:
+    """
+    Caminho original de calculate_aggression_flow (DataFrame + iterrows).
+
+    iterrows converte a linha inteira para float64, então `flags & ...`
+    levantava TypeError no código original; o int() abaixo só existe para o
+    caminho legado conseguir terminar e ser medido.
+    """
+    df = pd.DataFrame(ticks)
+    buy_volume = 0
+    sell_volume = 0
+    for _, tick in df.iterrows():
+        volume = tick['volume']
+        flags = int(tick['flags'])
+        if flags & TICK_FLAG_BUY:
+            buy_volume += volume
+        elif flags & TICK_FLAG_SELL:
+            sell_volume += volume
+    return {
+        "buy": int(buy_volume),
+        "sell": int(sell_volume),
+        "net": int(buy_volume - sell_volume),
+        "total_ticks": len(df)
+    }
+
+
+def timeit(fn, ticks, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(ticks)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do fluxo de agressão")
+    parser.add_argument("--ticks", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--legacy-repeat", type=int, default=1, help="iterrows é lento; 1 rodada basta")
+    args = parser.parse_args()
+
+    print(f"🎲 Gerando {args.ticks:,} ticks sintéticos...")
+    ticks = make_ticks(args.ticks)
+
+    legacy_time, legacy_result = timeit(legacy_flow, ticks, args.legacy_repeat)
+    kernel_time, kernel_result = timeit(aggression_totals, ticks, args.repeat)
+
+    assert legacy_result == kernel_result, f"Divergência: {legacy_result} != {kernel_result}"
+
+    print("=" * 60)
+    print(f"iterrows (legado) : {legacy_time * 1000:10.1f} ms")
+    print(f"kernel vetorizado : {kernel_time * 1000:10.1f} ms")
+    print(f"speedup           : {legacy_time / kernel_time:10.0f}x")
+    print(f"resultado         : {kernel_result}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from bridge_core.config import BridgeConfig
-from bridge_core.data_engine import DataEngine
 
 # Configure Logging
 logging.basicConfig(
@@ -18,10 +17,25 @@ logging.basicConfig(
     ]
 )
 
+# Record mode: MetaTrader5 must be wrapped before bridge_core imports it
+recorder = None
+if BridgeConfig.RECORD_DIR:
+    from bridge_core.replay import Recorder, RecordingSession, install_recording_mt5
+    recorder = Recorder(BridgeConfig.RECORD_DIR)
+    install_recording_mt5(recorder)
+
+from bridge_core.data_engine import DataEngine
+
 if __name__ == "__main__":
-    engine = DataEngine()
+    if recorder:
+        engine = DataEngine(session_factory=lambda **kwargs: RecordingSession(recorder, **kwargs), recorder=recorder)
+    else:
+        engine = DataEngine()
     try:
         asyncio.run(engine.run())
     except KeyboardInterrupt:
         engine.stop()
         print("\n👋 Bridge encerrado.")
+    finally:
+        if recorder:
+            recorder.close()
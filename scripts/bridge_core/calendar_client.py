@@ -1,14 +1,16 @@
-import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
 import logging
-import datetime
 import random
+from . import clock
+from .http_pool import HttpPool
 
 logger = logging.getLogger("Bridge.Calendar")
 
 class CalendarClient:
-    def __init__(self):
+    def __init__(self, http: HttpPool = None):
+        # Sessão HTTP compartilhada do bridge (DataEngine.http)
+        self.http = http or HttpPool()
         self.url = "https://br.investing.com/economic-calendar/"
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -18,58 +20,20 @@ class CalendarClient:
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0"
         ]
 
-    def _should_fetch(self, cache: list) -> bool:
+    async def fetch(self, jitter=(2, 6)):
         """
-        Smart Polling Logic:
-        1. If cache is empty -> Fetch.
-        2. If there is a high impact event (3 stars) in the last 30 mins with no actual value -> Fetch.
-        3. Else -> Skip.
-        """
-        if not cache:
-            logger.info("🔍 Cache vazio. Iniciando primeira coleta...")
-            return True
+        Baixa e lê o calendário (eventos USD/BRL de 3 estrelas).
 
-        now = datetime.datetime.now()
-        
-        for event in cache:
-            # Parse event time (HH:MM)
-            try:
-                event_time_str = event.get("time", "")
-                if ":" not in event_time_str: continue
-                
-                hour, minute = map(int, event_time_str.split(":"))
-                event_dt = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                
-                # Check if event is in the past 30 mins or future 5 mins
-                diff_minutes = (now - event_dt).total_seconds() / 60
-                
-                # If event passed recently (0 to 30 mins ago) AND has no actual value AND is high impact
-                if 0 <= diff_minutes <= 30 and not event.get("actual") and event.get("impact", 0) >= 3:
-                    logger.info(f"⚡ Evento Pendente Detectado: {event['event']} ({event['time']}). Buscando atualização...")
-                    return True
-                    
-            except Exception:
-                continue
-                
-        logger.debug("💤 Nenhum evento pendente. Usando cache.")
-        return False
+        Args:
+            jitter: Atraso aleatório (s) antes do request; curto no burst pós-divulgação
 
-    async def fetch_events(self, session: aiohttp.ClientSession, current_cache: list = None):
-        """
-        Fetches economic calendar events with Smart Polling (Async).
+        Returns:
+            Lista de eventos, ou None se o request/parse falhou (mantém o cache)
         """
-        if current_cache is None:
-            current_cache = []
-
-        # 1. Check if we need to fetch
-        if not self._should_fetch(current_cache):
-            return current_cache
-
         try:
-            # 2. Jitter (Random Delay)
-            delay = random.uniform(2, 6)
-            logger.info(f"⏳ Aguardando {delay:.2f}s (Jitter)...")
-            await asyncio.sleep(delay)
+            delay = random.uniform(*jitter)
+            logger.debug(f"⏳ Aguardando {delay:.2f}s (Jitter)...")
+            await clock.sleep(delay)
 
             headers = {
                 "User-Agent": random.choice(self.user_agents),
@@ -78,76 +42,84 @@ class CalendarClient:
                 "Upgrade-Insecure-Requests": "1"
             }
             
+            session = await self.http.get_session()
             async with session.get(self.url, headers=headers, timeout=15) as response:
                 if response.status in [403, 503]:
                     logger.warning(f"🛡️ Bloqueio detectado ({response.status}). Mantendo cache.")
-                    return current_cache
+                    return None
                     
                 if response.status != 200:
                     logger.warning(f"⚠️ Falha ao acessar Calendário: Status {response.status}")
-                    return current_cache
+                    return None
 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-            
-            table = soup.find("table", id="economicCalendarData")
             
-            if not table:
-                logger.warning("⚠️ Tabela do calendário não encontrada.")
-                return current_cache
+            events = await asyncio.to_thread(self.parse_events, html)
+            if events is not None:
+                logger.info(f"📅 Calendário atualizado: {len(events)} eventos relevantes.")
+            return events
 
-            events = []
-            rows = table.find("tbody").find_all("tr", class_="js-event-item")
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar calendário: {e}")
+            return None
 
-            for row in rows:
-                try:
-                    # Extract Time
-                    time_cell = row.find("td", class_="time")
-                    event_time = time_cell.text.strip() if time_cell else ""
-                    
-                    # Extract Currency
-                    # Use specific class 'flagCur' to avoid issues with multiple classes
-                    currency_cell = row.find("td", class_="flagCur")
-                    currency = currency_cell.text.strip() if currency_cell else ""
-                    
-                    # Filter Currency (USD or BRL only)
-                    if currency not in ["USD", "BRL"]:
-                        continue
+    @staticmethod
+    def parse_events(html: str):
+        """Eventos da tabela do calendário, ou None se a tabela não veio."""
+        soup = BeautifulSoup(html, 'html.parser')
+        table = soup.find("table", id="economicCalendarData")
+        
+        if not table:
+            logger.warning("⚠️ Tabela do calendário não encontrada.")
+            return None
 
-                    # Extract Impact (Stars)
-                    sentiment_cell = row.find("td", class_="sentiment")
-                    impact = 0
-                    if sentiment_cell:
-                        impact = len(sentiment_cell.find_all("i", class_="grayFullBullishIcon"))
-                    
-                    # Filter Impact (3 stars only)
-                    if impact < 3:
-                        continue
+        events = []
+        rows = table.find("tbody").find_all("tr", class_="js-event-item")
 
-                    # Extract Event Name
-                    event_cell = row.find("td", class_="event")
-                    event_name = event_cell.find("a").text.strip() if event_cell and event_cell.find("a") else ""
-                    
-                    # Extract Values
-                    actual = row.find("td", class_="act").text.strip()
-                    forecast = row.find("td", class_="fore").text.strip()
-                    previous = row.find("td", class_="prev").text.strip()
+        for row in rows:
+            try:
+                # Extract Time
+                time_cell = row.find("td", class_="time")
+                event_time = time_cell.text.strip() if time_cell else ""
+                
+                # Extract Currency
+                # Use specific class 'flagCur' to avoid issues with multiple classes
+                currency_cell = row.find("td", class_="flagCur")
+                currency = currency_cell.text.strip() if currency_cell else ""
+                
+                # Filter Currency (USD or BRL only)
+                if currency not in ["USD", "BRL"]:
+                    continue
 
-                    events.append({
-                        "time": event_time,
-                        "currency": currency,
-                        "impact": impact,
-                        "event": event_name,
-                        "actual": actual,
-                        "forecast": forecast,
-                        "previous": previous
-                    })
-                except Exception:
+                # Extract Impact (Stars)
+                sentiment_cell = row.find("td", class_="sentiment")
+                impact = 0
+                if sentiment_cell:
+                    impact = len(sentiment_cell.find_all("i", class_="grayFullBullishIcon"))
+                
+                # Filter Impact (3 stars only)
+                if impact < 3:
                     continue
-            
-            logger.info(f"📅 Calendário atualizado: {len(events)} eventos relevantes.")
-            return events
 
-        except Exception as e:
-            logger.error(f"❌ Erro ao buscar calendário: {e}")
-            return current_cache
+                # Extract Event Name
+                event_cell = row.find("td", class_="event")
+                event_name = event_cell.find("a").text.strip() if event_cell and event_cell.find("a") else ""
+                
+                # Extract Values
+                actual = row.find("td", class_="act").text.strip()
+                forecast = row.find("td", class_="fore").text.strip()
+                previous = row.find("td", class_="prev").text.strip()
+
+                events.append({
+                    "time": event_time,
+                    "currency": currency,
+                    "impact": impact,
+                    "event": event_name,
+                    "actual": actual,
+                    "forecast": forecast,
+                    "previous": previous
+                })
+            except Exception:
+                continue
+        
+        return events
@@ -0,0 +1,167 @@
+"""
+Calendar Scheduler
+==================
+Agenda do calendário econômico guiada pelos horários de divulgação.
+
+O horário "HH:MM" de cada evento é lido uma vez, quando o calendário é
+baixado, e as divulgações de alto impacto ainda sem `actual` vão para um
+heap por horário. O loop dorme até a próxima divulgação (ou até o refresh
+periódico) e, a partir dela, busca o calendário em rajada
+(`CALENDAR_BURST_SECONDS` após o horário) até o `actual` aparecer; depois
+da última tentativa da rajada o evento é abandonado e volta o ritmo normal.
+
+Eventos no mesmo horário (ex: payroll + desemprego às 09:30) dividem os
+mesmos requests. Quando um `actual` chega, `on_release` é chamado na hora
+(o DataEngine publica só a seção do calendário, sem esperar o próximo ciclo).
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import datetime
+import heapq
+import itertools
+import logging
+
+from . import clock
+from .config import BridgeConfig
+
+logger = logging.getLogger("Bridge.CalendarScheduler")
+
+
+def event_key(event: dict) -> tuple:
+    return (event.get("time"), event.get("currency"), event.get("event"))
+
+
+def release_time(event: dict, day: datetime.date):
+    """Horário da divulgação no dia do calendário (None para "Dia Todo", feriados...)."""
+    value = event.get("time", "")
+    if ":" not in value:
+        return None
+    try:
+        hour, minute = map(int, value.split(":"))
+        return datetime.datetime.combine(day, datetime.time(hour, minute))
+    except ValueError:
+        return None
+
+
+class CalendarScheduler:
+    """
+    Args:
+        client: CalendarClient (`fetch(jitter)` -> eventos ou None)
+        on_update: Callable(eventos) a cada calendário baixado
+        on_release: Callable(eventos, divulgados) quando algum `actual` chega
+    """
+
+    def __init__(self, client, on_update, on_release):
+        self.client = client
+        self.on_update = on_update
+        self.on_release = on_release
+        self.burst = BridgeConfig.CALENDAR_BURST_SECONDS
+        self.events = []
+        self.heap = []          # (próxima tentativa, seq, horário da divulgação, índice na rajada)
+        self.pending = {}       # horário da divulgação (ts) -> {chave do evento}
+        self.seq = itertools.count()
+        self.next_refresh = 0.0
+        self.counters = {"fetches": 0, "burst_fetches": 0, "released": 0, "expired": 0}
+
+    # ------------------------------------------------------------------ agenda
+
+    def _schedule(self, events: list, now: float):
+        """Coloca no heap as divulgações sem `actual` cuja rajada ainda não acabou."""
+        day = datetime.datetime.fromtimestamp(now).date()
+        for event in events:
+            if event.get("actual") or event.get("impact", 0) < 3:
+                continue
+            released = release_time(event, day)
+            if released is None:
+                continue
+            release_ts = released.timestamp()
+            # Primeira tentativa da rajada que ainda está no futuro
+            step = next((i for i, offset in enumerate(self.burst) if release_ts + offset > now), None)
+            if step is None:
+                continue  # Rajada já passou (ex: bridge iniciado depois da divulgação)
+            keys = self.pending.get(release_ts)
+            if keys is None:
+                keys = self.pending[release_ts] = set()
+                heapq.heappush(self.heap, (release_ts + self.burst[step], next(self.seq), release_ts, step))
+                logger.info(f"🗓️ Divulgação agendada: {event['time']} {event['currency']} {event['event']}")
+            keys.add(event_key(event))
+
+    def _apply(self, events: list, now: float):
+        """Novo calendário: atualiza o cache, avisa as divulgações e reagenda."""
+        self.events = events
+        self.on_update(events)
+        released = []
+        by_key = {event_key(e): e for e in events}
+        for keys in self.pending.values():
+            for key in list(keys):
+                event = by_key.get(key)
+                if event and event.get("actual"):
+                    keys.discard(key)
+                    released.append(event)
+        if released:
+            self.counters["released"] += len(released)
+            for event in released:
+                logger.info(f"⚡ Divulgado: {event['event']} ({event['time']}) = {event['actual']}")
+            self.on_release(events, released)
+        self._schedule(events, now)
+        self.next_refresh = now + BridgeConfig.CALENDAR_REFRESH_SECONDS
+
+    # ------------------------------------------------------------------ loop
+
+    async def _fetch(self, burst: bool):
+        self.counters["fetches"] += 1
+        if burst:
+            self.counters["burst_fetches"] += 1
+        jitter = BridgeConfig.CALENDAR_BURST_JITTER if burst else (2, 6)
+        return await self.client.fetch(jitter=jitter)
+
+    async def _burst(self, now: float):
+        """Tentativa da rajada para todas as divulgações vencidas (um único request)."""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap))
+
+        events = await self._fetch(burst=True)
+        now = clock.now().timestamp()
+        if events is not None:
+            self._apply(events, now)
+
+        for _, _, release_ts, step in due:
+            if not self.pending.get(release_ts):
+                self.pending.pop(release_ts, None)
+                continue
+            # Próxima tentativa ainda no futuro (uma rajada lenta pode ter pulado passos)
+            step = next((i for i in range(step + 1, len(self.burst)) if release_ts + self.burst[i] > now), None)
+            if step is None:
+                self.counters["expired"] += len(self.pending.pop(release_ts))
+                logger.warning(f"⚠️ Sem actual {self.burst[-1] // 60:.0f}min após a divulgação das "
+                               f"{datetime.datetime.fromtimestamp(release_ts):%H:%M}; voltando ao ritmo normal")
+                continue
+            heapq.heappush(self.heap, (release_ts + self.burst[step], next(self.seq), release_ts, step))
+
+    async def _refresh(self):
+        events = await self._fetch(burst=False)
+        now = clock.now().timestamp()
+        if events is not None:
+            self._apply(events, now)
+        else:
+            self.next_refresh = now + BridgeConfig.CALENDAR_RETRY_SECONDS
+
+    async def run(self, running=lambda: True):
+        while running():
+            now = clock.now().timestamp()
+            if self.heap and self.heap[0][0] <= now:
+                await self._burst(now)
+            elif now >= self.next_refresh:
+                await self._refresh()
+            else:
+                wake = self.next_refresh
+                if self.heap:
+                    wake = min(wake, self.heap[0][0])
+                # Dorme até o próximo prazo (limitado, para acompanhar a virada do dia)
+                await clock.sleep(min(wake - now, BridgeConfig.CALENDAR_MAX_SLEEP))
+
+    def stats(self) -> dict:
+        return {"pending": sum(len(k) for k in self.pending.values()), **self.counters}
@@ -0,0 +1,58 @@
+"""
+Clock
+=====
+Relógio do bridge. Em produção é só `datetime.now()` / `asyncio.sleep`;
+o replay troca por um relógio virtual (ver replay.py) para reproduzir um
+pregão gravado em 1x, 10x ou velocidade máxima.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import asyncio
+import datetime
+
+
+class SystemClock:
+    """Relógio de parede (padrão)."""
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    def begin_cycle(self):
+        """Início de um ciclo do loop principal (o replay alinha o tempo virtual)."""
+
+    async def pace(self, seconds: float):
+        """Fim de um ciclo do loop principal. No relógio real é só um sleep."""
+        await asyncio.sleep(seconds)
+
+
+_clock = SystemClock()
+
+
+def now() -> datetime.datetime:
+    return _clock.now()
+
+
+async def sleep(seconds: float):
+    await _clock.sleep(seconds)
+
+
+def begin_cycle():
+    _clock.begin_cycle()
+
+
+async def pace(seconds: float):
+    await _clock.pace(seconds)
+
+
+def set_clock(clock):
+    global _clock
+    _clock = clock
+
+
+def get_clock():
+    return _clock
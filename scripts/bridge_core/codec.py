@@ -0,0 +1,113 @@
+"""
+Payload Codec
+=============
+Serialização dos valores gravados no Redis (market_data, history, ...).
+
+Formatos (`PAYLOAD_CODEC`):
+    json     json da stdlib
+    orjson   JSON via orjson (mesmos bytes lidos por qualquer parser JSON)
+    msgpack  MessagePack, precedido do marcador 0xC1
+
+O marcador 0xC1 é o único byte que o MessagePack nunca usa e não pode
+iniciar um JSON, então `decode` detecta o formato pelo primeiro byte e
+valores JSON antigos (sem marcador) continuam legíveis.
+
+Mesmo formato de backend/src/utils/codec.py e ai-analyst/codec.py
+(cada serviço tem a sua cópia; mantenha em sincronia, verificado por
+scripts/tests/test_codec_compat.py).
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import json
+import logging
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from .config import BridgeConfig
+
+logger = logging.getLogger("Bridge.Codec")
+
+MSGPACK_MARKER = b"\xc1"
+FORMATS = ("json", "orjson", "msgpack")
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(obj):
+    """Tipos que json/msgpack não conhecem (escalares e arrays NumPy, datetimes)."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def available(fmt: str) -> bool:
+    return fmt == "json" or (fmt == "orjson" and orjson is not None) or (fmt == "msgpack" and msgpack is not None)
+
+
+def resolve(fmt: str) -> str:
+    """Formato efetivo: cai para orjson/json se a biblioteca não estiver instalada."""
+    fmt = (fmt or "json").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Codec desconhecido: {fmt} (use {', '.join(FORMATS)})")
+    if available(fmt):
+        return fmt
+    fallback = "orjson" if available("orjson") else "json"
+    logger.warning(f"⚠️ {fmt} não instalado, usando {fallback}")
+    return fallback
+
+
+def encode(obj, fmt: str = "json") -> bytes:
+    """Serializa `obj` no formato pedido (já resolvido por `resolve`)."""
+    if fmt == "orjson":
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    if fmt == "msgpack":
+        return MSGPACK_MARKER + msgpack.packb(obj, default=_default, use_bin_type=True)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def decode(data):
+    """Desserializa um valor de qualquer formato (detectado pelo marcador)."""
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode()
+    if data[:1] == MSGPACK_MARKER:
+        if msgpack is None:
+            raise ValueError("Valor em MessagePack, mas msgpack não está instalado")
+        return msgpack.unpackb(data[1:], raw=False, strict_map_key=False)
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # NaN/Infinity gravados pelo json da stdlib
+    return json.loads(data)
+
+
+class Codec:
+    """Codec configurado para um publicador (`encode` + `decode` automático)."""
+
+    def __init__(self, fmt: str = None):
+        self.format = resolve(fmt or BridgeConfig.PAYLOAD_CODEC)
+
+    def encode(self, obj) -> bytes:
+        return encode(obj, self.format)
+
+    @staticmethod
+    def decode(data):
+        return decode(data)
@@ -10,10 +10,39 @@ class BridgeConfig:
     if REDIS_HOST == "redis":
         REDIS_HOST = "localhost"
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+    REDIS_MAX_CONNECTIONS = 4
+    REDIS_TIMEOUT = float(os.getenv("BRIDGE_REDIS_TIMEOUT", 2.0))  # connect/read timeout (s)
+    # Pending writes kept while Redis is down (latest value per key + stream entries)
+    REDIS_BUFFER_SIZE = int(os.getenv("BRIDGE_REDIS_BUFFER", 1000))
+    REDIS_RECONNECT_MIN = 0.5   # Reconnect backoff (s), doubling up to MAX
+    REDIS_RECONNECT_MAX = 30.0
+    
+    # HTTP (one connector shared by every scraper)
+    HTTP_POOL_LIMIT = int(os.getenv("BRIDGE_HTTP_POOL_LIMIT", 20))
+    HTTP_LIMIT_PER_HOST = int(os.getenv("BRIDGE_HTTP_LIMIT_PER_HOST", 4))
+    HTTP_DNS_TTL = 600      # DNS cache (s)
+    # Idle connections kept open (s): long enough to span the 60-150s scraper loops
+    HTTP_KEEPALIVE = float(os.getenv("BRIDGE_HTTP_KEEPALIVE", 180))
     
     # Intervals
     SLOW_INTERVAL = 300  # 5 minutes for Macro Scraper
+    GLOBAL_INTERVAL = 120  # 2 minutes for Global/TV + MT5 fallback scrapes
     FAST_INTERVAL = 1    # 1 second for MT5
+    # Max seconds between market_data publishes when nothing changed
+    HEARTBEAT_INTERVAL = float(os.getenv("BRIDGE_HEARTBEAT_SECONDS", 5))
+
+    # Publish mode: "interval" (every FAST_INTERVAL) or "event" (on new ticks)
+    PUBLISH_MODE = os.getenv("BRIDGE_PUBLISH_MODE", "interval").lower()
+    COALESCE_MS = int(os.getenv("BRIDGE_COALESCE_MS", 100))  # Ticks within the window -> one payload
+    TICK_POLL_MS = int(os.getenv("BRIDGE_TICK_POLL_MS", 20))
+    PUBLISH_WATCH_SYMBOLS = os.getenv("BRIDGE_WATCH_SYMBOLS", "WIN$N,WDO$N").split(",")
+    # market_data is published as market_data:<section> + market_data:manifest;
+    # set BRIDGE_PUBLISH_LEGACY=true to also write the full payload to market_data
+    PUBLISH_LEGACY_KEY = os.getenv("BRIDGE_PUBLISH_LEGACY", "false").lower() == "true"
+    # Each publish is also appended to the capped stream market_data:stream (0 = off)
+    STREAM_MAXLEN = int(os.getenv("BRIDGE_STREAM_MAXLEN", 1000))
+    # Redis value encoding: json | orjson | msgpack (readers detect it automatically)
+    PAYLOAD_CODEC = os.getenv("PAYLOAD_CODEC", "orjson")
 
     # MT5 Symbols (Blue Chips + DI + Futures)
     MT5_SYMBOLS = [
@@ -22,7 +51,78 @@ class BridgeConfig:
         "DI1F27", "DI1F29", "DI1F31", "WIN$N", "WDO$N", "IBOV"
     ]
 
-    # Investing.com Targets
+    # MT5 Tick Flow: order-size buckets (contracts per trade)
+    # < 20 = Varejo, 20-99 = Institucional, >= 100 = Gringo
+    FLOW_SIZE_EDGES = [20, 100]
+    FLOW_SIZE_GROUPS = ["RETAIL", "INSTITUTIONAL", "FOREIGN"]
+    # Ticks retidos por símbolo no ring buffer dos horizontes: precisa cobrir o
+    # maior horizonte (60m) no pico do pregão. Custa 8 × (3 + faixas) bytes por
+    # tick; começa em FLOW_RING_INITIAL (1 << 16 ≈ 3 MB com 3 faixas) e dobra
+    # conforme a sessão enche, até FLOW_RING_CAPACITY (1 << 20 ≈ 48 MB)
+    FLOW_RING_CAPACITY = int(os.getenv("BRIDGE_FLOW_RING_CAPACITY", 1 << 20))
+    FLOW_RING_INITIAL = int(os.getenv("BRIDGE_FLOW_RING_INITIAL", 1 << 16))
+
+    # VWAP Engine (sessão + janelas móveis em minutos, bandas em desvios padrão)
+    VWAP_ROLLING_MINUTES = [60]
+    VWAP_BANDS = [1, 2]
+    # VWAPs ancorados recriados a cada sessão: "nome=HH:MM" (horário do servidor)
+    VWAP_ANCHORS = dict(
+        item.split("=") for item in os.getenv("VWAP_ANCHORS", "open=09:00,us_open=10:30").split(",") if item
+    )
+
+    # Volatility Regime (ATR Wilder rápido vs lento por timeframe)
+    VOLATILITY_TIMEFRAMES = ["D1", "H1", "M5"]
+    VOLATILITY_FAST = 5
+    VOLATILITY_SLOW = 20
+    VOLATILITY_WARMUP_BARS = 100
+
+    # Tick Archive (colunas .npy por símbolo/dia, alimentado pelo fluxo MT5)
+    TICK_ARCHIVE_ENABLED = os.getenv("TICK_ARCHIVE_ENABLED", "true").lower() == "true"
+    TICK_ARCHIVE_DIR = os.getenv(
+        "TICK_ARCHIVE_DIR",
+        os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticks')
+    )
+
+    # Scrape scheduler: per-host token bucket (requests/s, burst)
+    SCRAPE_RATE_PER_HOST = float(os.getenv("BRIDGE_SCRAPE_RATE", 0.5))
+    SCRAPE_BURST = int(os.getenv("BRIDGE_SCRAPE_BURST", 3))
+    SCRAPE_TICK = 1.0  # Max seconds between dispatcher checks
+    # Adaptive interval: base interval x session factor x volatility factor,
+    # dormant while every session of the instrument is closed (market_hours.py)
+    SCRAPE_OPEN_FACTOR = 0.5        # Regular session
+    SCRAPE_EXTENDED_FACTOR = 0.75   # Pre/after market, Globex overnight, night sessions
+    SCRAPE_MIN_INTERVAL = 30
+    # Move (% per sqrt(minute)) at which the volatility factor is 1: faster above, slower below
+    SCRAPE_REF_MOVE_PCT = float(os.getenv("BRIDGE_SCRAPE_REF_MOVE", 0.05))
+    SCRAPE_VOL_FACTOR_MIN = 0.5
+    SCRAPE_VOL_FACTOR_MAX = 2.0
+    # Per-URL circuit breaker: open after N consecutive failures, cool-off doubling up to MAX (s)
+    SCRAPE_BREAKER_THRESHOLD = int(os.getenv("BRIDGE_SCRAPE_BREAKER_THRESHOLD", 3))
+    SCRAPE_BREAKER_COOLOFF = 120
+    SCRAPE_BREAKER_COOLOFF_MAX = 3600
+    # Trading session per scraped name (market_hours.SESSIONS); not listed = always open
+    SCRAPE_SESSIONS = {
+        "SP500": "NYSE", "DOW_JONES": "NYSE", "VIX": "NYSE",
+        "EWZ": "NYSE", "PBR": "NYSE", "VALE_ADR": "NYSE",
+        "NASDAQ": "CME", "US10Y": "CME", "OURO": "CME", "GOLD": "CME", "COBRE": "CME",
+        "DXY": "FX", "PTAX": "FX",
+        "DAX40": "XETRA",
+        "BRENT": "ICE",
+        "MINERIO_FERRO": "DCE",
+        "CUPOM_LIMPO": "B3",
+    }
+
+    # Economic calendar: refresh cadence, then burst polling after each high-impact release
+    CALENDAR_REFRESH_SECONDS = 1800
+    CALENDAR_RETRY_SECONDS = 120     # After a failed refresh
+    CALENDAR_MAX_SLEEP = 300         # Wake up at least this often (day rollover)
+    # Seconds after the release time to fetch until `actual` shows up (then give up)
+    CALENDAR_BURST_SECONDS = [2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 900, 1800]
+    CALENDAR_BURST_JITTER = (0.0, 1.0)
+
+    # Record & Replay: grava a sessão em <dir>/events.jsonl.gz (vazio = desligado)
+    RECORD_DIR = os.getenv("BRIDGE_RECORD_DIR", "")
+
     # Investing.com Targets
     MACRO_TARGETS = {
         # Índices Globais
@@ -46,3 +146,29 @@ class BridgeConfig:
         "CUPOM_LIMPO": "https://br.investing.com/rates-bonds/brazil-10-year-bond-yield",
         "PTAX": "https://economia.awesomeapi.com.br/json/last/USD-BRL",
     }
+
+    # Global Assets (tv_cache). Same page as a MACRO_TARGETS entry = one request for both
+    GLOBAL_TARGETS = {
+        "SP500": "https://www.investing.com/indices/us-spx-500",
+        "NASDAQ": "https://www.investing.com/indices/nq-100",
+        "DXY": "https://www.investing.com/indices/usdollar",
+        "VIX": "https://www.investing.com/indices/volatility-s-p-500",
+        "US10Y": "https://www.investing.com/rates-bonds/u.s.-10-year-bond-yield",
+        "BRENT": "https://www.investing.com/commodities/brent-oil",
+        "GOLD": "https://www.investing.com/commodities/gold"
+    }
+
+    # Blue chips scraped (tv_cache) only while missing from MT5
+    FALLBACK_TARGETS = {
+        "LREN3": "https://br.investing.com/equities/lojas-renner-on",
+        "AXIA3": "https://br.investing.com/equities/centrais-eletricas-brasileiras-sa",
+        "BBAS3": "https://br.investing.com/equities/banco-do-brasil-on",
+        "RENT3": "https://br.investing.com/equities/localiza-rent-a-car-sa-on",
+        "SBSP3": "https://br.investing.com/equities/sabesp-on",
+        "VALE3": "https://br.investing.com/equities/vale-on",
+        "PETR4": "https://br.investing.com/equities/petrobras-pn",
+        "ITUB4": "https://br.investing.com/equities/itauunibanco-pn",
+        "BBDC4": "https://br.investing.com/equities/bradesco-pn",
+        "WEGE3": "https://br.investing.com/equities/weg-on",
+        "BPAC11": "https://br.investing.com/equities/btgpactual-unit"
+    }
@@ -1,166 +1,145 @@
 import asyncio
+import calendar
 import logging
 import datetime
-import aiohttp
-import random
 from .config import BridgeConfig
+from . import clock
+from .latency import LatencyStats
+from .mt5_executor import MT5Executor
 from .mt5_client import MT5Client
+from .http_pool import HttpPool
 from .investing_client import InvestingClient
 from .calendar_client import CalendarClient
+from .calendar_scheduler import CalendarScheduler
+from .scrape_scheduler import ScrapeScheduler, PRIORITY_FALLBACK, PRIORITY_GLOBAL, PRIORITY_MACRO
 from .redis_client import RedisClient
 from .flow_monitor import FlowMonitor
-from .profit_bridge import ProfitBridge
+from .tick_flow_calculator import get_mt5_flow_data, get_shared_calculator
+try:
+    from .profit_bridge import ProfitBridge
+except ImportError:  # win32com só existe no Windows (ex: replay no Linux)
+    ProfitBridge = None
 
 logger = logging.getLogger("Bridge.DataEngine")
 
 class DataEngine:
-    def __init__(self):
+    def __init__(self, redis=None, flow_monitor=None, session_factory=None, recorder=None, use_profit=True):
+        """
+        Args:
+            redis: Publisher with `publish`, `publish_sections` and async `aclose` (default: RedisClient)
+            flow_monitor: SpyFlow reader (default: FlowMonitor)
+            session_factory: Callable(**kwargs) returning an aiohttp-like session (default: aiohttp.ClientSession)
+            recorder: Optional replay.Recorder that logs SpyFlow updates and cycle starts
+            use_profit: Try to attach the Profit Pro RTD bridge
+        """
         self.running = True
         
         # Clients
-        self.mt5 = MT5Client()
-        self.investing = InvestingClient()
-        self.calendar = CalendarClient()
-        self.redis = RedisClient()
-        self.flow_monitor = FlowMonitor()
+        # Every MT5 call goes through one worker thread (the library is not thread-safe)
+        self.executor = MT5Executor()
+        self.mt5 = self.executor.run_sync(MT5Client)
+        # One HTTP session/connector shared by every scraper loop
+        self.http = HttpPool(session_factory)
+        self.investing = InvestingClient(self.http)
+        self.calendar = CalendarClient(self.http)
+        self.calendar_scheduler = CalendarScheduler(self.calendar, self._store_calendar, self._publish_release)
+        self.redis = redis or RedisClient()
+        self.flow_monitor = flow_monitor or FlowMonitor()
+        self.recorder = recorder
+        # Anchored VWAPs (published in the vwap section), before the first tick load
+        self.executor.run_sync(self._register_vwap_anchors)
         
         # Profit Pro RTD Bridge (optional, will fail gracefully if Excel not open)
-        try:
-            self.profit = ProfitBridge("profit-data.xlsx")
-            logger.info("✅ Profit Pro RTD connected")
-        except Exception as e:
-            logger.warning(f"⚠️ Profit Pro RTD not available: {e}")
-            self.profit = None
+        self.profit = None
+        if use_profit and ProfitBridge is not None:
+            try:
+                self.profit = ProfitBridge("profit-data.xlsx")
+                logger.info("✅ Profit Pro RTD connected")
+            except Exception as e:
+                logger.warning(f"⚠️ Profit Pro RTD not available: {e}")
+        elif use_profit:
+            logger.warning("⚠️ Profit Pro RTD not available: win32com not installed")
         
         # State/Cache
         self.macro_cache = {}
         self.calendar_cache = []
         self.tv_cache = {} 
         self.missing_in_mt5 = set() 
+        # Bumped whenever a scraper loop updates macro/tv/calendar caches
+        self.cache_version = 0
+        self._published_version = None
+        self._last_publish = None
+        # Tick -> publish latency (event publish mode)
+        self.latency = LatencyStats()
         
         # Initialize Macro Cache
         for name in BridgeConfig.MACRO_TARGETS:
             self.macro_cache[name] = {"valor": 0.0, "var": 0.0, "var_pct": 0.0}
+        
+        # Scrape registry: one request per page, fanned out to macro_cache/tv_cache
+        self.scheduler = ScrapeScheduler(self.investing.scrape_ticker, self._store_scrape)
+        # (polled faster while the instrument's market is open, dormant while closed)
+        sessions = BridgeConfig.SCRAPE_SESSIONS
+        for name, url in BridgeConfig.MACRO_TARGETS.items():
+            self.scheduler.register("macro", name, url, BridgeConfig.SLOW_INTERVAL, PRIORITY_MACRO,
+                                    session=sessions.get(name))
+        for name, url in BridgeConfig.GLOBAL_TARGETS.items():
+            self.scheduler.register("tv", name, url, BridgeConfig.GLOBAL_INTERVAL, PRIORITY_GLOBAL,
+                                    session=sessions.get(name))
+        for symbol, url in BridgeConfig.FALLBACK_TARGETS.items():
+            self.scheduler.register(
+                "tv", symbol, url, BridgeConfig.GLOBAL_INTERVAL, PRIORITY_FALLBACK,
+                condition=lambda symbol=symbol: symbol in self.missing_in_mt5,
+                session="B3"
+            )
 
-    async def _fetch_macro_loop(self):
+    async def _scrape_loop(self):
         """
-        Async loop for Investing.com Scraper (Indices/Commodities).
+        Investing.com / AwesomeAPI scrapers (macro, global and MT5 fallback).
+        Each page is requested once per interval and paced per host by the
+        ScrapeScheduler; results land in macro_cache and/or tv_cache.
         """
-        async with aiohttp.ClientSession() as session:
-            while self.running:
-                logger.info("🔄 Scraping Macro Data...")
-                tasks = []
-                for name, url in BridgeConfig.MACRO_TARGETS.items():
-                    tasks.append(self.investing.scrape_ticker(session, name, url))
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for i, name in enumerate(BridgeConfig.MACRO_TARGETS.keys()):
-                    result = results[i]
-                    if isinstance(result, dict):
-                        self.macro_cache[name] = result
-                
-                # Jitter (300s + random 10-30s)
-                sleep_time = BridgeConfig.SLOW_INTERVAL + random.randint(10, 30)
-                await asyncio.sleep(sleep_time)
+        await asyncio.gather(self.scheduler.run(lambda: self.running), self._scrape_report_loop())
 
-    async def _fetch_calendar_loop(self):
-        """
-        Async loop for Economic Calendar (Smart Polling).
-        """
-        async with aiohttp.ClientSession() as session:
-            while self.running:
-                # Pass copy of cache for decision making
-                current_cache = self.calendar_cache.copy()
-                
-                events = await self.calendar.fetch_events(session, current_cache)
-                if events:
-                    self.calendar_cache = events
-                
-                # Check every minute
-                # Jitter (60s + random 5-15s)
-                sleep_time = 60 + random.randint(5, 15)
-                await asyncio.sleep(sleep_time)
+    async def _scrape_report_loop(self):
+        while self.running:
+            await clock.sleep(BridgeConfig.SLOW_INTERVAL)
+            logger.info(f"🗓️ Scraper: {self.scheduler.stats()}")
+            logger.info(f"🌐 HTTP: {self.http.summary()}")
+
+    def _store_scrape(self, instrument, data: dict):
+        """Fan-out of one scrape result to every cache registered for the page."""
+        for cache, name in instrument.targets:
+            if cache == "macro":
+                self.macro_cache[name] = data
+            elif cache == "tv":
+                # Format for Frontend (TV cache compatibility)
+                self.tv_cache[name] = {
+                    "symbol": name,
+                    "price": data["valor"],
+                    "change": data["var"],
+                    "change_pct": data["var_pct"]
+                }
+        self.cache_version += 1
 
-    async def _fetch_global_loop(self):
+    async def _fetch_calendar_loop(self):
         """
-        Loop for Global Data (Indices/Commodities) + Fallback.
-        Replaces TVClient with Investing Scraper.
+        Economic Calendar: sleeps until the next high-impact release, then
+        burst-polls until its `actual` is out (see CalendarScheduler).
         """
-        # Global Assets URLs (Investing.com)
-        global_urls = {
-            "SP500": "https://www.investing.com/indices/us-spx-500",
-            "NASDAQ": "https://www.investing.com/indices/nq-100",
-            "DXY": "https://www.investing.com/indices/usdollar",
-            "VIX": "https://www.investing.com/indices/volatility-s-p-500",
-            "US10Y": "https://www.investing.com/rates-bonds/u.s.-10-year-bond-yield",
-            "BRENT": "https://www.investing.com/commodities/brent-oil",
-            "GOLD": "https://www.investing.com/commodities/gold"
-        }
-        
-        # Fallback URLs (Investing.com)
-        fallback_urls = {
-            "LREN3": "https://br.investing.com/equities/lojas-renner-on",
-            "AXIA3": "https://br.investing.com/equities/centrais-eletricas-brasileiras-sa",
-            "BBAS3": "https://br.investing.com/equities/banco-do-brasil-on",
-            "RENT3": "https://br.investing.com/equities/localiza-rent-a-car-sa-on",
-            "SBSP3": "https://br.investing.com/equities/sabesp-on",
-            "VALE3": "https://br.investing.com/equities/vale-on",
-            "PETR4": "https://br.investing.com/equities/petrobras-pn",
-            "ITUB4": "https://br.investing.com/equities/itauunibanco-pn",
-            "BBDC4": "https://br.investing.com/equities/bradesco-pn",
-            "WEGE3": "https://br.investing.com/equities/weg-on",
-            "BPAC11": "https://br.investing.com/equities/btgpactual-unit"
-        }
+        await self.calendar_scheduler.run(lambda: self.running)
 
-        async with aiohttp.ClientSession() as session:
-            while self.running:
-                logger.info("🌍 Scraping Global Data...")
-                
-                # 1. Fetch Global Assets
-                tasks = []
-                names = []
-                for name, url in global_urls.items():
-                    names.append(name)
-                    tasks.append(self.investing.scrape_ticker(session, name, url))
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for i, name in enumerate(names):
-                    res = results[i]
-                    if isinstance(res, dict):
-                        # Format for Frontend (TV cache compatibility)
-                        self.tv_cache[name] = {
-                            "symbol": name,
-                            "price": res["valor"],
-                            "change": res["var"],
-                            "change_pct": res["var_pct"]
-                        }
-                
-                # 2. Fetch Fallback Assets (Investing Scraper)
-                if self.missing_in_mt5:
-                    logger.info(f"⚠️ Fallback (Scraper) ativado para: {self.missing_in_mt5}")
-                    for symbol in self.missing_in_mt5:
-                        if symbol in fallback_urls:
-                            try:
-                                url = fallback_urls[symbol]
-                                data = await self.investing.scrape_ticker(session, symbol, url)
-                                if data:
-                                    self.tv_cache[symbol] = {
-                                        "symbol": symbol,
-                                        "price": data["valor"],
-                                        "change": data["var"],
-                                        "change_pct": data["var_pct"]
-                                    }
-                            except Exception as e:
-                                logger.error(f"❌ Fallback Error {symbol}: {e}")
-                        else:
-                            logger.warning(f"⚠️ Sem URL de fallback para {symbol}")
+    def _store_calendar(self, events: list):
+        self.calendar_cache = events
+        self.cache_version += 1
 
-                # Jitter to avoid pattern detection (120s + random 10-30s)
-                sleep_time = 120 + random.randint(10, 30)
-                logger.info(f"💤 Sleeping for {sleep_time}s...")
-                await asyncio.sleep(sleep_time)
+    def _publish_release(self, events: list, released: list):
+        """A release just came out: publish the calendar section now, not on the next cycle."""
+        self.redis.publish_sections(
+            "market_data",
+            {"calendar": events},
+            {"changed": [], "timestamp": clock.now().isoformat()}
+        )
 
     async def _main_loop(self):
         """
@@ -168,99 +147,221 @@ class DataEngine:
         Collects MT5 data (Realtime) + Cached Macro/TV/Calendar -> Redis.
         If Profit Pro RTD is available, uses its calculated indicators.
         """
+        if BridgeConfig.PUBLISH_MODE == "event":
+            await self._event_loop()
+            return
+        
         while self.running:
             try:
-                # 1. MT5 Data (Sync, fast local)
-                mt5_data = await asyncio.to_thread(self.mt5.fetch_data)
-                
-                # 1.5. Profit Pro RTD Data (if available)
-                profit_data = None
-                if self.profit:
-                    try:
-                        profit_data = await asyncio.to_thread(self.profit.get_data)
-                        logger.debug("📊 Profit Pro RTD data fetched")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error reading Profit RTD: {e}")
-                
-                # Check for missing assets (Fallback Logic)
-                # We check against MT5Client.TOP_ASSETS
-                # mt5_data["blue_chips"] contains the ones successfully fetched
-                found_symbols = set(mt5_data.get("blue_chips", {}).keys())
-                expected_symbols = set(self.mt5.TOP_ASSETS)
-                self.missing_in_mt5 = expected_symbols - found_symbols
+                await self._collect_and_publish()
                 
-                # 2. Aggregate
-                # Calculate Volatility Regime (WIN)
-                volatility_regime = self.mt5.get_volatility_regime("WIN$N") or self.mt5.get_volatility_regime("WIN$")
+                # Fast Interval (1s)
+                await clock.pace(BridgeConfig.FAST_INTERVAL)
                 
-                # Check Flow Data
-                flow_data = self.flow_monitor.check_update() or self.flow_monitor.current_flows
+            except Exception as e:
+                logger.error(f"❌ Main Loop Error: {e}")
+                await clock.pace(1)
+
+    async def _event_loop(self):
+        """
+        Event-driven publishing (PUBLISH_MODE=event).
+        Polls the last tick of the watched symbols every TICK_POLL_MS; a new
+        tick schedules a publish COALESCE_MS after the poll that saw it, so a
+        burst of ticks becomes a single payload. The regular 1s cycle
+        (scrapers, SpyFlow, heartbeat) keeps running in between.
+        
+        The window runs on the bridge clock only (virtual under replay). The
+        tick→publish latency adds the tick's age when it was detected, from
+        its `time_msc` minus the server clock offset (the smallest
+        bridge - `time_msc` gap seen), capped at one poll interval.
+        """
+        poll_interval = BridgeConfig.TICK_POLL_MS / 1000
+        pending_since = None  # Bridge time (ms) of the poll that saw the first unpublished tick
+        pending_age = 0       # Estimated age (ms) of that tick when it was seen
+        server_offset = None  # Bridge clock - server clock (ms), smallest gap observed
+        next_cycle = 0
+        last_report = self._clock_msc()
+        logger.info(f"⚡ Event publishing: coalesce {BridgeConfig.COALESCE_MS}ms, watching {BridgeConfig.PUBLISH_WATCH_SYMBOLS}")
+        
+        while self.running:
+            try:
+                moved = await self.executor.call(self.mt5.poll_ticks, BridgeConfig.PUBLISH_WATCH_SYMBOLS, key="poll_ticks")
+                now = self._clock_msc()
+                if moved:
+                    gap = now - max(moved.values())
+                    server_offset = gap if server_offset is None else min(server_offset, gap)
+                    if pending_since is None:
+                        pending_since = now
+                        pending_age = min(max(now - min(moved.values()) - server_offset, 0), BridgeConfig.TICK_POLL_MS)
                 
-                # 3. Quant Score Calculation
-                # If Profit Pro RTD is available, use its pre-calculated scores
-                # Otherwise, calculate manually
-                if profit_data and profit_data.get("win") and profit_data.get("wdo"):
-                    # Use Profit Pro RTD scores directly
-                    quant_score = {
-                        "WIN": {
-                            "score": profit_data["win"].get("score", 0),
-                            "bull_power": profit_data["win"].get("bull_power", 0),
-                            "bear_power": profit_data["win"].get("bear_power", 0),
-                            "max_score": 15,
-                            "details": [f"Profit Pro: {profit_data['win'].get('decision', 'N/A')}"],
-                            "sentiment": self._get_sentiment(profit_data["win"].get("decision", "")),
-                            "status": profit_data["win"].get("decision", "AGUARDAR"),
-                            "direction": self._get_direction(profit_data["win"].get("decision", ""))
-                        },
-                        "WDO": {
-                            "score": profit_data["wdo"].get("score", 0),
-                            "bull_power": profit_data["wdo"].get("bull_power", 0),
-                            "bear_power": profit_data["wdo"].get("bear_power", 0),
-                            "max_score": 15,
-                            "details": [f"Profit Pro: {profit_data['wdo'].get('decision', 'N/A')}"],
-                            "sentiment": self._get_sentiment(profit_data["wdo"].get("decision", "")),
-                            "status": profit_data["wdo"].get("decision", "AGUARDAR"),
-                            "direction": self._get_direction(profit_data["wdo"].get("decision", ""))
-                        }
-                    }
-                    logger.info("✅ Using Profit Pro RTD scores")
-                else:
-                    # Fallback to manual calculation
-                    quant_score = self.flow_monitor.calculate_quant_score(
-                        flow_data, 
-                        {**self.macro_cache, **mt5_data},  # Merge macro cache with MT5 data (includes WDO, DI)
-                        mt5_data.get("blue_chips", {}),
-                        self.mt5  # Pass MT5Client instance
-                    )
-                    logger.debug("📊 Using manual score calculation")
+                # Clock stepped back (NTP, replay): restart the window instead of waiting on it
+                if pending_since is not None and now < pending_since:
+                    pending_since = now
                 
-                payload = {
-                    "mt5": mt5_data,
-                    "blue_chips": mt5_data.get("blue_chips", {}), 
-                    "breadth": mt5_data.get("breadth", {}),       
-                    "basis": mt5_data.get("basis", 0.0),          
-                    "volatility": volatility_regime,
-                    "quant_dashboard": {
-                        "flows": flow_data, # Renamed to flows (plural) to indicate dict of assets
-                        "score": quant_score,
-                        "source": "profit_pro" if profit_data else "manual"  # Indicate data source
-                    },
-                    "profit_rtd": profit_data,  # Include raw Profit Pro data
-                    "macro": self.macro_cache,
-                    "tv": self.tv_cache,
-                    "calendar": self.calendar_cache,
-                    "timestamp": datetime.datetime.now().isoformat()
-                }
+                if pending_since is not None and now - pending_since >= BridgeConfig.COALESCE_MS:
+                    await self._collect_and_publish(force=True)
+                    self.latency.add(self._clock_msc() - pending_since + pending_age)
+                    pending_since = None
+                    next_cycle = now + BridgeConfig.FAST_INTERVAL * 1000
+                elif now >= next_cycle:
+                    await self._collect_and_publish()
+                    next_cycle = now + BridgeConfig.FAST_INTERVAL * 1000
                 
-                # 3. Publish
-                self.redis.publish("market_data", payload)
+                if now - last_report >= 60_000 and self.latency.count:
+                    logger.info(f"⏱️ Tick→publish: {self.latency.summary()}")
+                    last_report = now
                 
-                # Fast Interval (1s)
-                await asyncio.sleep(BridgeConfig.FAST_INTERVAL)
+                await clock.pace(poll_interval)
                 
             except Exception as e:
-                logger.error(f"❌ Main Loop Error: {e}")
-                await asyncio.sleep(1)
+                logger.error(f"❌ Event Loop Error: {e}")
+                pending_since = None
+                await clock.pace(1)
+
+    @staticmethod
+    def _clock_msc() -> int:
+        """Bridge clock in epoch ms (wall time counted as UTC, like the tick `time_msc`)."""
+        now = clock.now()
+        return calendar.timegm(now.timetuple()) * 1000 + now.microsecond // 1000
+
+    async def _collect_and_publish(self, force: bool = False) -> bool:
+        """
+        One aggregation cycle: MT5 + caches -> market_data sections.
+        
+        Args:
+            force: Publish even if nothing changed since the last payload
+        
+        Returns:
+            True if a payload was published
+        """
+        # Replay aligns the cycle with the recorded one; the recorder stamps
+        # every event of the cycle with its start time
+        clock.begin_cycle()
+        if self.recorder:
+            self.recorder.begin_cycle()
+        try:
+            return await self._collect_cycle(force)
+        finally:
+            if self.recorder:
+                self.recorder.end_cycle()
+
+    async def _collect_cycle(self, force: bool) -> bool:
+        # 1. MT5 Data (Sync, fast local) + symbols whose tick moved
+        mt5_data, changed = await self.executor.call(self.mt5.fetch_snapshot, key="fetch_snapshot")
+        
+        # 1.5. Profit Pro RTD Data (if available)
+        profit_data = None
+        if self.profit:
+            try:
+                profit_data = await asyncio.to_thread(self.profit.get_data)
+                logger.debug("📊 Profit Pro RTD data fetched")
+            except Exception as e:
+                logger.warning(f"⚠️ Error reading Profit RTD: {e}")
+        
+        # Check for missing assets (Fallback Logic)
+        # We check against MT5Client.TOP_ASSETS
+        # mt5_data["blue_chips"] contains the ones successfully fetched
+        found_symbols = set(mt5_data.get("blue_chips", {}).keys())
+        expected_symbols = set(self.mt5.TOP_ASSETS)
+        self.missing_in_mt5 = expected_symbols - found_symbols
+        
+        # Check Flow Data
+        flow_update = self.flow_monitor.check_update()
+        if flow_update and self.recorder:
+            self.recorder.record("flow", None, flow_update)
+        
+        # Nothing moved: skip score/serialization, only a periodic heartbeat
+        now = clock.now()
+        if not (force or changed or flow_update or profit_data
+                or self.cache_version != self._published_version
+                or self._last_publish is None
+                or (now - self._last_publish).total_seconds() >= BridgeConfig.HEARTBEAT_INTERVAL):
+            return False
+        
+        # 2. Aggregate
+        # Calculate Volatility Regime (WIN)
+        volatility_regime = await self.executor.call(self._volatility_regime, key="volatility_regime")
+        
+        flow_data = dict(flow_update or self.flow_monitor.current_flows)
+        
+        # SpyFlow ausente para o ativo: usa o fluxo por tamanho de ordem dos ticks MT5
+        for asset, symbol in (("WIN", "WIN$N"), ("WDO", "WDO$N")):
+            if asset not in flow_data:
+                flow_data[asset] = await self.executor.call(get_mt5_flow_data, symbol, key=("flow", symbol))
+        
+        # 3. Quant Score Calculation
+        # If Profit Pro RTD is available, use its pre-calculated scores
+        # Otherwise, calculate manually
+        if profit_data and profit_data.get("win") and profit_data.get("wdo"):
+            # Use Profit Pro RTD scores directly
+            quant_score = {
+                "WIN": {
+                    "score": profit_data["win"].get("score", 0),
+                    "bull_power": profit_data["win"].get("bull_power", 0),
+                    "bear_power": profit_data["win"].get("bear_power", 0),
+                    "max_score": 15,
+                    "details": [f"Profit Pro: {profit_data['win'].get('decision', 'N/A')}"],
+                    "sentiment": self._get_sentiment(profit_data["win"].get("decision", "")),
+                    "status": profit_data["win"].get("decision", "AGUARDAR"),
+                    "direction": self._get_direction(profit_data["win"].get("decision", ""))
+                },
+                "WDO": {
+                    "score": profit_data["wdo"].get("score", 0),
+                    "bull_power": profit_data["wdo"].get("bull_power", 0),
+                    "bear_power": profit_data["wdo"].get("bear_power", 0),
+                    "max_score": 15,
+                    "details": [f"Profit Pro: {profit_data['wdo'].get('decision', 'N/A')}"],
+                    "sentiment": self._get_sentiment(profit_data["wdo"].get("decision", "")),
+                    "status": profit_data["wdo"].get("decision", "AGUARDAR"),
+                    "direction": self._get_direction(profit_data["wdo"].get("decision", ""))
+                }
+            }
+            logger.info("✅ Using Profit Pro RTD scores")
+        else:
+            # Fallback to manual calculation
+            # Runs on the MT5 thread: the score reads volume average / VWAP from MT5Client
+            quant_score = await self.executor.call(
+                self.flow_monitor.calculate_quant_score,
+                flow_data, 
+                {**self.macro_cache, **mt5_data},  # Merge macro cache with MT5 data (includes WDO, DI)
+                mt5_data.get("blue_chips", {}),
+                self.mt5  # Pass MT5Client instance
+            )
+            logger.debug("📊 Using manual score calculation")
+        
+        # blue_chips/breadth/basis travel as their own sections, not inside mt5
+        sections = {
+            "mt5": {k: v for k, v in mt5_data.items() if k not in ("blue_chips", "breadth", "basis")},
+            "blue_chips": mt5_data.get("blue_chips", {}),
+            "breadth": mt5_data.get("breadth", {}),
+            "basis": mt5_data.get("basis", 0.0),
+            "volatility": volatility_regime,
+            "vwap": {
+                symbol: await self.executor.call(self._vwap, symbol, key=("vwap", symbol))
+                for symbol in ("WIN$N", "WDO$N")
+            },
+            "quant_dashboard": {
+                "flows": flow_data, # Renamed to flows (plural) to indicate dict of assets
+                "score": quant_score,
+                "source": "profit_pro" if profit_data else "manual"  # Indicate data source
+            },
+            "profit_rtd": profit_data,  # Include raw Profit Pro data
+            "macro": self.macro_cache,
+            "tv": self.tv_cache,
+            # Fetch time/source/stale flag per macro/tv value (age = timestamp - fetched_at)
+            "freshness": self.scheduler.freshness(),
+            "calendar": self.calendar_cache
+        }
+        meta = {
+            "changed": sorted(changed),  # MT5 symbols whose tick moved since the last cycle
+            "timestamp": now.isoformat()
+        }
+        
+        # 3. Publish (only sections whose content changed + manifest, one round trip)
+        self.redis.publish_sections("market_data", sections, meta)
+        self._published_version = self.cache_version
+        self._last_publish = now
+        return True
 
     async def _fetch_history_loop(self):
         """
@@ -276,8 +377,10 @@ class DataEngine:
                 
                 for symbol in targets:
                     for tf in timeframes:
-                        # Run in thread to avoid blocking
-                        data = await asyncio.to_thread(self.mt5.get_history, symbol, tf, 100)
+                        # Run on the MT5 thread to avoid blocking
+                        data = await self.executor.call(
+                            self.mt5.get_history, symbol, tf, 100, live=True, key=("history", symbol, tf)
+                        )
                         if data:
                             key = f"history:{symbol}:{tf}"
                             self.redis.publish(key, data)
@@ -289,7 +392,24 @@ class DataEngine:
                 logger.error(f"❌ History Loop Error: {e}")
             
             # Sleep for 5 minutes
-            await asyncio.sleep(300)
+            await clock.sleep(300)
+
+    def _volatility_regime(self):
+        """WIN volatility regime (runs on the MT5 thread)."""
+        return self.mt5.get_volatility_regime("WIN$N") or self.mt5.get_volatility_regime("WIN$")
+
+    @staticmethod
+    def _register_vwap_anchors():
+        """Daily VWAP anchors from VWAP_ANCHORS (runs on the MT5 thread)."""
+        vwap = get_shared_calculator().vwap
+        for name, hhmm in BridgeConfig.VWAP_ANCHORS.items():
+            vwap.add_daily_anchor(name, hhmm)
+        logger.info(f"⚓ VWAP anchors: {BridgeConfig.VWAP_ANCHORS}")
+
+    @staticmethod
+    def _vwap(symbol: str):
+        """Tick VWAP snapshot (runs on the MT5 thread)."""
+        return get_shared_calculator().calculate_vwap(symbol)
 
     def _get_sentiment(self, decision: str) -> str:
         """Convert Profit Pro decision text to sentiment."""
@@ -317,14 +437,19 @@ class DataEngine:
         """
         logger.info("🚀 DataEngine Starting (Async Mode)...")
         
-        await asyncio.gather(
-            self._fetch_macro_loop(),
-            self._fetch_calendar_loop(),
-            self._fetch_global_loop(),
-            self._fetch_history_loop(),
-            self._main_loop()
-        )
+        try:
+            await asyncio.gather(
+                self._scrape_loop(),
+                self._fetch_calendar_loop(),
+                self._fetch_history_loop(),
+                self._main_loop()
+            )
+        finally:
+            # Flush whatever the publisher still has queued
+            await self.redis.aclose()
+            await self.http.aclose()
 
     def stop(self):
         self.running = False
-        self.mt5.shutdown()
+        self.executor.run_sync(self.mt5.shutdown)
+        self.executor.shutdown()
@@ -0,0 +1,308 @@
+"""
+Flow Kernels
+============
+Reduções vetorizadas (NumPy puro) sobre o array estruturado de ticks
+retornado por `mt5.copy_ticks_range` / `mt5.copy_ticks_from`.
+
+Não depende do MetaTrader5: os valores das flags são os mesmos do terminal,
+o que permite rodar benchmarks e replays em máquinas sem MT5.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import numpy as np
+
+# Mesmos valores de mt5.TICK_FLAG_BUY / mt5.TICK_FLAG_SELL
+TICK_FLAG_BUY = 32   # Comprador agrediu (bateu na oferta de venda)
+TICK_FLAG_SELL = 64  # Vendedor agrediu (bateu na oferta de compra)
+
+
+def aggression_masks(flags: np.ndarray, buy_flag: int = TICK_FLAG_BUY, sell_flag: int = TICK_FLAG_SELL):
+    """
+    Máscaras booleanas de agressão compradora e vendedora.
+
+    Um tick com as duas flags conta como compra (mesma precedência do
+    `if/elif` do cálculo original).
+
+    Args:
+        flags: Coluna `flags` dos ticks
+        buy_flag: Bit de agressão compradora
+        sell_flag: Bit de agressão vendedora
+
+    Returns:
+        Tupla (buy_mask, sell_mask)
+    """
+    buy_mask = (flags & buy_flag) != 0
+    sell_mask = ((flags & sell_flag) != 0) & ~buy_mask
+    return buy_mask, sell_mask
+
+
+def aggression_totals(ticks: np.ndarray, buy_flag: int = TICK_FLAG_BUY, sell_flag: int = TICK_FLAG_SELL) -> dict:
+    """
+    Soma o volume agredido de compra e venda de um lote de ticks.
+
+    Args:
+        ticks: Array estruturado com os campos `flags` e `volume`
+        buy_flag: Bit de agressão compradora
+        sell_flag: Bit de agressão vendedora
+
+    Returns:
+        Dict com volume de compra, venda, saldo e quantidade de ticks
+    """
+    if ticks is None or len(ticks) == 0:
+        return {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+
+    volume = ticks['volume'].astype(np.int64, copy=False)
+    buy_mask, sell_mask = aggression_masks(ticks['flags'], buy_flag, sell_flag)
+
+    # np.dot sobre a máscara evita materializar volume[mask]
+    buy_volume = int(np.dot(buy_mask, volume))
+    sell_volume = int(np.dot(sell_mask, volume))
+
+    return {
+        "buy": buy_volume,
+        "sell": sell_volume,
+        "net": buy_volume - sell_volume,
+        "total_ticks": len(ticks)
+    }
+
+
+def size_bucket_flow(ticks: np.ndarray, edges, buy_flag: int = TICK_FLAG_BUY, sell_flag: int = TICK_FLAG_SELL):
+    """
+    Classifica os negócios por tamanho de ordem em uma única passada.
+
+    `np.digitize` atribui a faixa pelo volume de cada negócio e o saldo
+    financeiro assinado (+compra / -venda, volume × preço) é somado por
+    faixa com `np.bincount`.
+
+    Args:
+        ticks: Array estruturado com `flags`, `volume` e `last`
+        edges: Limites crescentes das faixas (ex: [20, 100] -> <20, 20-99, >=100)
+        buy_flag: Bit de agressão compradora
+        sell_flag: Bit de agressão vendedora
+
+    Returns:
+        Tupla (totais_por_faixa, faixa_por_tick, saldo_por_tick)
+    """
+    n_buckets = len(edges) + 1
+    if ticks is None or len(ticks) == 0:
+        return np.zeros(n_buckets), np.zeros(0, dtype=np.intp), np.zeros(0)
+
+    buy_mask, sell_mask = aggression_masks(ticks['flags'], buy_flag, sell_flag)
+    sign = buy_mask.astype(np.int8) - sell_mask.astype(np.int8)
+    signed = sign * ticks['volume'].astype(np.float64) * ticks['last']
+
+    bucket = np.digitize(ticks['volume'], edges)
+    totals = np.bincount(bucket, weights=signed, minlength=n_buckets)
+    return totals, bucket, signed
+
+
+def ticks_after_cursor(ticks: np.ndarray, last_time_msc: int, seen_at_last: int):
+    """
+    Descarta ticks já processados de um lote vindo de `copy_ticks_from`.
+
+    O MT5 só aceita o início em segundos, então o lote repete ticks do
+    segundo do cursor. Ticks com o mesmo `time_msc` do cursor são
+    indistinguíveis entre si: pulamos os `seen_at_last` primeiros.
+
+    Args:
+        ticks: Lote ordenado por `time_msc`
+        last_time_msc: `time_msc` do último tick processado (cursor)
+        seen_at_last: Quantos ticks com `time_msc == last_time_msc` já foram processados
+
+    Returns:
+        Tupla (ticks_novos, novo_last_time_msc, novo_seen_at_last)
+    """
+    if ticks is None or len(ticks) == 0:
+        return ticks[:0] if ticks is not None else None, last_time_msc, seen_at_last
+
+    times = ticks['time_msc']
+    lo = int(np.searchsorted(times, last_time_msc, side='left'))
+    hi = int(np.searchsorted(times, last_time_msc, side='right'))
+    start = lo + min(hi - lo, seen_at_last)
+    fresh = ticks[start:]
+
+    if len(fresh) == 0:
+        return fresh, last_time_msc, seen_at_last
+
+    new_last = int(times[-1])
+    new_seen = len(times) - int(np.searchsorted(times, new_last, side='left'))
+    return fresh, new_last, new_seen
+
+
+class FlowRingBuffer:
+    """
+    Ring buffer de ticks com somas acumuladas de compra/venda.
+
+    Cada posição guarda o `time_msc` do tick e o volume comprado/vendido
+    acumulado até ele. O fluxo de qualquer horizonte sai de uma busca
+    binária pelo início da janela e uma subtração (O(log n)), sem
+    percorrer os ticks.
+
+    Com `buckets > 0` guarda também o saldo financeiro acumulado de cada
+    faixa de tamanho de ordem (ver `size_bucket_flow`), uma coluna por
+    faixa: o lote entra como faixa + saldo por tick, sem matriz n × faixas.
+
+    Começa com `initial` posições e dobra conforme enche, até `capacity`;
+    só a partir daí passa a sobrescrever os ticks mais antigos.
+    """
+
+    def __init__(self, capacity: int = 1 << 20, buckets: int = 0, initial: int = None):
+        self.max_capacity = capacity
+        self.capacity = min(capacity, initial or capacity)  # Posições alocadas
+        self.buckets = buckets
+        self.times = np.zeros(self.capacity, dtype=np.int64)
+        self.cum_buy = np.zeros(self.capacity, dtype=np.int64)
+        self.cum_sell = np.zeros(self.capacity, dtype=np.int64)
+        # Saldo acumulado de cada faixa de tamanho (uma coluna por faixa)
+        self.cum_buckets = [np.zeros(self.capacity, dtype=np.float64) for _ in range(buckets)]
+        self.start = 0  # Posição física do tick mais antigo retido
+        self.size = 0
+
+        self._columns = [self.cum_buy, self.cum_sell] + self.cum_buckets
+        # Acumulado imediatamente antes do tick mais antigo retido
+        self._base = [np.int64(0), np.int64(0)] + [np.float64(0)] * buckets
+
+    def _grow(self, needed: int):
+        """Realoca com o dobro de posições (ou `needed`, até `max_capacity`), em ordem lógica."""
+        capacity = min(self.max_capacity, max(self.capacity * 2, needed))
+        end = self.start + self.size
+
+        def regrow(col):
+            grown = np.zeros(capacity, dtype=col.dtype)
+            head = col[self.start:min(end, self.capacity)]
+            grown[:len(head)] = head
+            grown[len(head):self.size] = col[:max(0, end - self.capacity)]
+            return grown
+
+        self.times = regrow(self.times)
+        self._columns = [regrow(col) for col in self._columns]
+        self.cum_buy, self.cum_sell = self._columns[:2]
+        self.cum_buckets = self._columns[2:]
+        self.capacity = capacity
+        self.start = 0
+
+    def _phys(self, logical: int) -> int:
+        return (self.start + logical) % self.capacity
+
+    def _cum_before(self, logical: int) -> list:
+        if logical == 0:
+            return list(self._base)
+        pos = self._phys(logical - 1)
+        return [col[pos] for col in self._columns]
+
+    def _write(self, col: np.ndarray, pos: int, values: np.ndarray):
+        first = min(len(values), self.capacity - pos)
+        col[pos:pos + first] = values[:first]
+        if len(values) > first:
+            col[:len(values) - first] = values[first:]
+
+    def _values(self, column: int, buy_volume, sell_volume, bucket, signed, n: int) -> np.ndarray:
+        """Valor por tick de uma coluna: compra, venda ou saldo de uma faixa."""
+        if column == 0:
+            return buy_volume
+        if column == 1:
+            return sell_volume
+        if bucket is None:
+            return np.zeros(n)
+        return np.where(bucket == column - 2, signed, 0.0)
+
+    def append(self, times: np.ndarray, buy_volume: np.ndarray, sell_volume: np.ndarray,
+               bucket: np.ndarray = None, signed: np.ndarray = None):
+        """
+        Acrescenta um lote de ticks (ordenado por tempo).
+
+        Cada coluna é acumulada e gravada por vez, então os temporários são
+        de um vetor de `n` posições, não de uma matriz `n × colunas`.
+
+        Args:
+            times: `time_msc` de cada tick
+            buy_volume: Volume agredido na compra por tick (0 se não for compra)
+            sell_volume: Volume agredido na venda por tick (0 se não for venda)
+            bucket: Faixa de tamanho de cada tick (`size_bucket_flow`)
+            signed: Saldo financeiro de cada tick (+compra / -venda)
+        """
+        n = len(times)
+        if n == 0:
+            return
+        if self.size + n > self.capacity and self.capacity < self.max_capacity:
+            self._grow(self.size + n)
+
+        last = self._cum_before(self.size)
+        # Lote maior que o buffer: fica só com a cauda
+        keep = min(n, self.capacity)
+        if n >= self.capacity:
+            pos = 0
+            base = []
+        else:
+            overflow = self.size + n - self.capacity
+            if overflow > 0:
+                # Guarda o acumulado do último tick despejado antes de sobrescrever
+                self._base = self._cum_before(overflow)
+            pos = self._phys(self.size)
+
+        self._write(self.times, pos, times[n - keep:])
+        for i, (prev, col) in enumerate(zip(last, self._columns)):
+            cum = prev + np.cumsum(self._values(i, buy_volume, sell_volume, bucket, signed, n), dtype=col.dtype)
+            if n >= self.capacity:
+                base.append(cum[n - keep - 1] if n > keep else prev)
+            self._write(col, pos, cum[n - keep:])
+
+        if n >= self.capacity:
+            self._base = base
+            self.start = 0
+            self.size = keep
+        elif overflow > 0:
+            self.start = self._phys(overflow)
+            self.size = self.capacity
+        else:
+            self.size += n
+
+    def _search(self, cutoff_msc: int) -> int:
+        """Índice lógico do primeiro tick com time_msc >= cutoff_msc."""
+        end = self.start + self.size
+        head = self.times[self.start:min(end, self.capacity)]
+        tail = self.times[:max(0, end - self.capacity)]
+        if len(tail) and cutoff_msc > head[-1]:
+            return len(head) + int(np.searchsorted(tail, cutoff_msc, side='left'))
+        return int(np.searchsorted(head, cutoff_msc, side='left'))
+
+    @property
+    def oldest_msc(self) -> int:
+        return int(self.times[self.start]) if self.size else 0
+
+    @property
+    def newest_msc(self) -> int:
+        return int(self.times[self._phys(self.size - 1)]) if self.size else 0
+
+    def flow_since(self, cutoff_msc: int) -> dict:
+        """
+        Fluxo dos ticks com `time_msc >= cutoff_msc` ainda retidos no buffer.
+
+        Se o horizonte começa antes do tick mais antigo retido, o resultado
+        cobre só o que o buffer ainda guarda.
+        """
+        if self.size == 0:
+            return {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+
+        idx = self._search(cutoff_msc)
+        before = self._cum_before(idx)
+        last = self._cum_before(self.size)
+        buy = int(last[0] - before[0])
+        sell = int(last[1] - before[1])
+        return {
+            "buy": buy,
+            "sell": sell,
+            "net": buy - sell,
+            "total_ticks": self.size - idx
+        }
+
+    def buckets_since(self, cutoff_msc: int) -> np.ndarray:
+        """Saldo financeiro por faixa de tamanho desde `cutoff_msc`."""
+        if not self.buckets or self.size == 0:
+            return np.zeros(self.buckets, dtype=np.float64)
+
+        idx = self._search(cutoff_msc)
+        last, before = self._cum_before(self.size), self._cum_before(idx)
+        return np.array([last[k] - before[k] for k in range(2, 2 + self.buckets)], dtype=np.float64)
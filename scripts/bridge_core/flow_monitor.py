@@ -4,6 +4,7 @@ import time
 import logging
 from datetime import datetime
 from .config import BridgeConfig
+from . import clock
 
 logger = logging.getLogger("Bridge.FlowMonitor")
 
@@ -16,7 +17,7 @@ class FlowMonitor:
     
     def _is_market_open(self):
         """Check if Brazilian market is currently open."""
-        now = datetime.now()
+        now = clock.now()
         
         # Weekend
         if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
@@ -119,11 +120,11 @@ class FlowMonitor:
         
         # --- CHECK IF MARKET IS CLOSED ---
         market_open = self._is_market_open()
+        symbol_key = "WIN$N" if asset_type == "WIN" else "WDO$N"
+        asset_data = macro_data.get(symbol_key, {})
         
         if not market_open:
             # Market is closed - use daily variation instead
-            symbol_key = "WIN$N" if asset_type == "WIN" else "WDO$N"
-            asset_data = macro_data.get(symbol_key, {})
             variation_pct = asset_data.get("var_pct", 0)
             
             # Calculate Bull/Bear from variation
@@ -275,8 +276,7 @@ class FlowMonitor:
             # WIN: Top 10 Ações (EXCLUSIVO)
             
             # Filtro de Horário (antes das 10:00 AM)
-            from datetime import datetime
-            current_hour = datetime.now().hour
+            current_hour = clock.now().hour
             
             if current_hour < 10:
                 details.append("⏰ Aguardando Abertura à Vista (10:00)")
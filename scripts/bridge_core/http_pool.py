@@ -0,0 +1,127 @@
+"""
+HTTP Pool
+=========
+Sessão HTTP única do bridge, compartilhada por todos os scrapers
+(macro, global/fallback e calendário).
+
+Um só `TCPConnector` para br.investing.com, www.investing.com e
+awesomeapi: limite total e por host (as rajadas de `gather` dos loops não
+abrem dezenas de conexões no mesmo host), cache de DNS e keep-alive longo
+o bastante para que a conexão aberta por um loop seja reaproveitada pelo
+próximo. Um `TraceConfig` conta conexões novas x reaproveitadas e
+acertos do cache de DNS por host.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import logging
+from collections import defaultdict
+
+import aiohttp
+
+from .config import BridgeConfig
+
+logger = logging.getLogger("Bridge.HTTP")
+
+
+class HttpPool:
+    """
+    Dona do connector e da sessão compartilhada.
+
+    A sessão é criada na primeira chamada de `get_session` (o connector
+    precisa do event loop rodando) e fechada em `aclose`.
+    """
+
+    def __init__(self, session_factory=None):
+        """
+        Args:
+            session_factory: Callable(**kwargs) que devolve uma sessão tipo aiohttp
+                             (default: aiohttp.ClientSession; replay/gravação trocam)
+        """
+        self.session_factory = session_factory or aiohttp.ClientSession
+        self.connector = None
+        self.session = None
+        # host -> contadores
+        self.hosts = defaultdict(lambda: {"requests": 0, "new": 0, "reused": 0, "errors": 0})
+        self.dns = {"hits": 0, "misses": 0}
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host
+            self.hosts[ctx.host]["requests"] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.hosts[ctx.host]["new"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.hosts[ctx.host]["reused"] += 1
+
+        async def on_request_exception(session, ctx, params):
+            self.hosts[ctx.host]["errors"] += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.dns["hits"] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.dns["misses"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    async def get_session(self):
+        if self.session is None:
+            self.connector = aiohttp.TCPConnector(
+                limit=BridgeConfig.HTTP_POOL_LIMIT,
+                limit_per_host=BridgeConfig.HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=BridgeConfig.HTTP_DNS_TTL,
+                keepalive_timeout=BridgeConfig.HTTP_KEEPALIVE
+            )
+            # Atribuída antes do await: os scrapers de um gather pegam a mesma sessão
+            self.session = self.session_factory(
+                connector=self.connector,
+                trace_configs=[self._trace_config()]
+            )
+            await self.session.__aenter__()
+            logger.info(
+                f"🌐 Pool HTTP: {BridgeConfig.HTTP_POOL_LIMIT} conexões "
+                f"({BridgeConfig.HTTP_LIMIT_PER_HOST}/host), DNS {BridgeConfig.HTTP_DNS_TTL}s, "
+                f"keep-alive {BridgeConfig.HTTP_KEEPALIVE}s"
+            )
+        return self.session
+
+    def stats(self) -> dict:
+        requests = sum(h["requests"] for h in self.hosts.values())
+        new = sum(h["new"] for h in self.hosts.values())
+        reused = sum(h["reused"] for h in self.hosts.values())
+        return {
+            "requests": requests,
+            "new_connections": new,
+            "reused_connections": reused,
+            "reuse_pct": round(reused / (new + reused) * 100, 1) if new + reused else None,
+            "dns_hits": self.dns["hits"],
+            "dns_misses": self.dns["misses"],
+            "hosts": {host: dict(h) for host, h in self.hosts.items()}
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"{s['requests']} requisições, {s['new_connections']} conexões novas, "
+                f"{s['reused_connections']} reaproveitadas ({s['reuse_pct']}%), "
+                f"DNS {s['dns_hits']} hits/{s['dns_misses']} misses")
+
+    async def aclose(self):
+        if self.session is not None:
+            await self.session.__aexit__(None, None, None)
+            self.session = None
+        if self.connector is not None:
+            # Sessões substitutas (replay) não fecham o connector que recebem
+            await self.connector.close()
+            self.connector = None
@@ -0,0 +1,86 @@
+"""
+Indicators
+==========
+Indicadores vetorizados (NumPy puro) sobre o array estruturado de barras
+retornado por `mt5.copy_rates_from_pos` / `MT5Client.get_history_array`
+(campos `time`, `open`, `high`, `low`, `close`, `tick_volume`, `real_volume`).
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import numpy as np
+
+
+def true_range(rates: np.ndarray) -> np.ndarray:
+    """
+    True Range de cada barra a partir da segunda.
+
+    TR = max(high - low, |high - close anterior|, |low - close anterior|)
+
+    Args:
+        rates: Array estruturado com `high`, `low` e `close`
+
+    Returns:
+        Array com len(rates) - 1 valores
+    """
+    if rates is None or len(rates) < 2:
+        return np.zeros(0)
+
+    high = rates['high'][1:]
+    low = rates['low'][1:]
+    prev_close = rates['close'][:-1]
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(rates: np.ndarray, period: int = 14, method: str = "sma") -> float:
+    """
+    Average True Range.
+
+    Args:
+        rates: Array estruturado com `high`, `low` e `close`
+        period: Quantidade de barras da média
+        method: "sma" (média simples dos últimos `period` TRs) ou
+                "wilder" (semente SMA + suavização (n-1)/n sobre todo o histórico)
+
+    Returns:
+        ATR ou 0.0 se houver menos de period + 1 barras
+    """
+    tr = true_range(rates)
+    if len(tr) < period:
+        return 0.0
+
+    if method == "sma":
+        return float(tr[-period:].mean())
+
+    # Wilder: atr_k = a * atr_{k-1} + (1 - a) * tr_k, com a = (n-1)/n.
+    # Forma fechada: a^m * semente + (1/n) * Σ a^(m-1-j) * tr_j
+    alpha = (period - 1) / period
+    seed = tr[:period].mean()
+    rest = tr[period:]
+    weights = alpha ** np.arange(len(rest) - 1, -1, -1)
+    return float(alpha ** len(rest) * seed + np.dot(weights, rest) / period)
+
+
+def vwap(rates: np.ndarray):
+    """
+    VWAP pelo preço típico (high + low + close) / 3 ponderado por `real_volume`.
+
+    Returns:
+        VWAP ou None se o volume total for zero
+    """
+    if rates is None or len(rates) == 0:
+        return None
+
+    volume = rates['real_volume'].astype(np.float64)
+    total_volume = volume.sum()
+    if total_volume == 0:
+        return None
+
+    typical = (rates['high'] + rates['low'] + rates['close']) / 3
+    return float(np.dot(typical, volume) / total_volume)
+
+
+def average_volume(rates: np.ndarray, count: int) -> float:
+    """Média de `real_volume` das últimas `count` barras."""
+    return float(rates['real_volume'][-count:].sum() / count)
@@ -1,15 +1,103 @@
-import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from fake_useragent import UserAgent
 import logging
 import random
-import datetime
+from . import clock
+from .http_pool import HttpPool
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # Sem lxml: o caminho rápido usa SoupStrainer + html.parser
+    lxml_html = None
 
 logger = logging.getLogger("Bridge.Investing")
 
+# Nós de cotação da página de um instrumento: layout atual e cabeçalho antigo
+# (data-test -> campo), em ordem de preferência
+PRICE_TEST_IDS = ("instrument-price-last", "instrument-header-last-price")
+CHANGE_TEST_IDS = ("instrument-price-change-percent", "instrument-header-net-change-percentage")
+_QUOTE_XPATH = "//*[" + " or ".join(f'@data-test="{t}"' for t in PRICE_TEST_IDS + CHANGE_TEST_IDS) + "]"
+_QUOTE_STRAINER = SoupStrainer(attrs={"data-test": list(PRICE_TEST_IDS + CHANGE_TEST_IDS)})
+
+
+def _first(found: dict, test_ids):
+    for test_id in test_ids:
+        if test_id in found:
+            return found[test_id]
+    return None
+
+
+def extract_quote_fast(html: str):
+    """
+    Lê só os nós `data-test` de preço e variação %.
+
+    Com lxml: parse em C + um único XPath. Sem lxml: SoupStrainer, que só
+    monta os nós de cotação em vez da árvore inteira.
+
+    Returns:
+        (preço, variação) como texto, com None no que não foi encontrado
+    """
+    found = {}
+    if lxml_html is not None:
+        for node in lxml_html.fromstring(html).xpath(_QUOTE_XPATH):
+            found.setdefault(node.get("data-test"), node.text_content())
+    else:
+        soup = BeautifulSoup(html, 'html.parser', parse_only=_QUOTE_STRAINER)
+        for node in soup.find_all(attrs={"data-test": True}):
+            found.setdefault(node["data-test"], node.text)
+    return _first(found, PRICE_TEST_IDS), _first(found, CHANGE_TEST_IDS)
+
+
+def extract_quote_full(html: str):
+    """
+    Caminho completo: árvore inteira do html.parser e todos os seletores
+    conhecidos (layouts antigos do Investing.com).
+
+    Returns:
+        (preço, variação) como texto, com None no que não foi encontrado
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Selectors (Robust)
+    price_element = soup.find(class_="text-5xl")
+    if not price_element:
+        price_element = soup.find(attrs={"data-test": "instrument-price-last"})
+    if not price_element:
+        price_element = soup.select_one("div[data-test='instrument-header-details'] div[data-test='instrument-header-last-price']")
+
+    change_element = soup.find(attrs={"data-test": "instrument-price-change-percent"})
+    if not change_element:
+         change_element = soup.find(lambda tag: tag.name == "span" and "instrument-price-change-percent" in str(tag.get("data-test", "")))
+    if not change_element:
+        change_element = soup.select_one("div[data-test='instrument-header-details'] div[data-test='instrument-header-net-change-percentage']")
+
+    return (price_element.text if price_element else None,
+            change_element.text if change_element else None)
+
+
+def extract_quote(html: str):
+    """
+    Preço e variação % de uma página de instrumento: caminho rápido e, se
+    faltar algum dos dois, o parse completo.
+
+    Returns:
+        (preço, variação, caminho) com caminho "fast" ou "full"
+    """
+    try:
+        price, change = extract_quote_fast(html)
+    except Exception as e:  # HTML que o lxml recusa (ex: declaração de encoding)
+        logger.debug(f"Caminho rápido falhou: {e}")
+        price = change = None
+    if price is not None and change is not None:
+        return price, change, "fast"
+    price, change = extract_quote_full(html)
+    return price, change, "full"
+
 class InvestingClient:
-    def __init__(self):
+    def __init__(self, http: HttpPool = None):
+        # Sessão HTTP compartilhada do bridge (DataEngine.http)
+        self.http = http or HttpPool()
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -17,15 +105,18 @@ class InvestingClient:
             "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0"
         ]
+        # Páginas resolvidas pelo caminho rápido vs parse completo
+        self.parse_stats = {"fast": 0, "full": 0}
 
-    async def scrape_ticker(self, session: aiohttp.ClientSession, name: str, url: str):
+    async def scrape_ticker(self, name: str, url: str):
+        session = await self.http.get_session()
         if "awesomeapi" in url:
             return await self._fetch_api(session, name, url)
 
         try:
             # Jitter (Random Delay)
             delay = random.uniform(1, 3)
-            await asyncio.sleep(delay)
+            await clock.sleep(delay)
 
             headers = {
                 "User-Agent": random.choice(self.user_agents),
@@ -49,23 +140,13 @@ class InvestingClient:
                     return None
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
             
-            # Selectors (Robust)
-            price_element = soup.find(class_="text-5xl")
-            if not price_element:
-                price_element = soup.find(attrs={"data-test": "instrument-price-last"})
-            if not price_element:
-                price_element = soup.select_one("div[data-test='instrument-header-details'] div[data-test='instrument-header-last-price']")
+            # Parse fora do event loop (o fallback completo leva dezenas de ms)
+            price_text, change_text, path = await asyncio.to_thread(extract_quote, html)
+            self.parse_stats[path] += 1
             
-            change_element = soup.find(attrs={"data-test": "instrument-price-change-percent"})
-            if not change_element:
-                 change_element = soup.find(lambda tag: tag.name == "span" and "instrument-price-change-percent" in str(tag.get("data-test", "")))
-            if not change_element:
-                change_element = soup.select_one("div[data-test='instrument-header-details'] div[data-test='instrument-header-net-change-percentage']")
-
-            price_str = price_element.text.strip() if price_element else "N/A"
-            change_str = change_element.text.strip() if change_element else "N/A"
+            price_str = price_text.strip() if price_text is not None else "N/A"
+            change_str = change_text.strip() if change_text is not None else "N/A"
             
             if price_str == "N/A":
                 return None
@@ -93,14 +174,14 @@ class InvestingClient:
                 "valor": price,
                 "var": variation,
                 "var_pct": change_pct,
-                "timestamp": datetime.datetime.now().isoformat()
+                "timestamp": clock.now().isoformat()
             }
             
         except Exception as e:
             logger.error(f"❌ Erro no scraping de {name}: {e}")
             return None
 
-    async def _fetch_api(self, session: aiohttp.ClientSession, name: str, url: str):
+    async def _fetch_api(self, session, name: str, url: str):
         try:
             async with session.get(url, timeout=10) as response:
                 if response.status != 200:
@@ -121,7 +202,7 @@ class InvestingClient:
                         "valor": price,
                         "var": variation,
                         "var_pct": change_pct,
-                        "timestamp": datetime.datetime.now().isoformat()
+                        "timestamp": clock.now().isoformat()
                     }
                 return None
         except Exception as e:
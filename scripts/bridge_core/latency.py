@@ -0,0 +1,40 @@
+"""
+Latency Stats
+=============
+Amostras recentes de latência (ms) com mediana e p99.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class LatencyStats:
+    """Janela das últimas `maxlen` amostras de latência em milissegundos."""
+
+    def __init__(self, maxlen: int = 2000):
+        self.samples = deque(maxlen=maxlen)
+        self.count = 0  # Total de amostras desde o início
+
+    def add(self, latency_ms: float):
+        self.samples.append(latency_ms)
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        if not self.samples:
+            return {"count": self.count, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        values = np.fromiter(self.samples, dtype=np.float64, count=len(self.samples))
+        p50, p99 = np.percentile(values, [50, 99])
+        return {
+            "count": self.count,
+            "p50_ms": round(float(p50), 1),
+            "p99_ms": round(float(p99), 1),
+            "max_ms": round(float(values.max()), 1)
+        }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        return f"p50={s['p50_ms']}ms p99={s['p99_ms']}ms max={s['max_ms']}ms (n={s['count']})"
@@ -0,0 +1,135 @@
+"""
+Market Hours
+============
+Calendário de pregão de cada bolsa, para o scheduler dos scrapers saber se
+o ativo está negociando agora (e quando volta a negociar).
+
+Cada sessão tem um fuso (zoneinfo, então horário de verão é automático) e,
+por dia da semana, janelas com um status:
+
+    open      pregão regular
+    extended  pré/pós-mercado, sessão noturna, Globex fora do horário regular
+    closed    fora de qualquer janela
+
+Feriados não entram no calendário: num feriado o preço não anda e o
+intervalo cresce pelo fator de volatilidade do scheduler.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import datetime
+from zoneinfo import ZoneInfo
+
+OPEN = "open"
+EXTENDED = "extended"
+CLOSED = "closed"
+
+_RANK = {CLOSED: 0, EXTENDED: 1, OPEN: 2}
+
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+WEEKDAYS = (MON, TUE, WED, THU, FRI)
+
+
+def _minutes(hhmm: str) -> int:
+    hour, minute = map(int, hhmm.split(":"))
+    return hour * 60 + minute
+
+
+class Session:
+    """Janelas semanais de negociação de uma bolsa, no fuso local dela."""
+
+    def __init__(self, tz: str, windows):
+        """
+        Args:
+            tz: Fuso IANA (ex: "America/New_York")
+            windows: [(dias, "HH:MM", "HH:MM", status)]; "24:00" fecha o dia
+        """
+        self.tz = ZoneInfo(tz)
+        self.windows = {day: [] for day in range(7)}
+        for days, start, end, status in windows:
+            for day in days:
+                self.windows[day].append((_minutes(start), _minutes(end), status))
+        for day_windows in self.windows.values():
+            day_windows.sort()
+
+    def status(self, timestamp: float) -> str:
+        local = datetime.datetime.fromtimestamp(timestamp, self.tz)
+        minute = local.hour * 60 + local.minute
+        best = CLOSED
+        for start, end, status in self.windows[local.weekday()]:
+            if start <= minute < end and _RANK[status] > _RANK[best]:
+                best = status
+        return best
+
+    def seconds_until_open(self, timestamp: float) -> float:
+        """Segundos até a próxima janela (open ou extended); 0 se já está em uma."""
+        local = datetime.datetime.fromtimestamp(timestamp, self.tz)
+        for offset in range(8):
+            day = local.date() + datetime.timedelta(days=offset)
+            for start, end, status in self.windows[day.weekday()]:
+                begin = datetime.datetime.combine(day, datetime.time(), self.tz) + datetime.timedelta(minutes=start)
+                finish = datetime.datetime.combine(day, datetime.time(), self.tz) + datetime.timedelta(minutes=end)
+                if finish.timestamp() <= timestamp:
+                    continue
+                return max(0.0, begin.timestamp() - timestamp)
+        return 7 * 86400.0
+
+
+SESSIONS = {
+    # B3: leilão/futuros antes da abertura do à vista
+    "B3": Session("America/Sao_Paulo", [
+        (WEEKDAYS, "09:00", "10:00", EXTENDED),
+        (WEEKDAYS, "10:00", "18:00", OPEN),
+        (WEEKDAYS, "18:00", "18:30", EXTENDED),
+    ]),
+    # NYSE/Nasdaq (índices, ADRs, ETFs): pré-mercado 04:00, after-hours até 20:00
+    "NYSE": Session("America/New_York", [
+        (WEEKDAYS, "04:00", "09:30", EXTENDED),
+        (WEEKDAYS, "09:30", "16:00", OPEN),
+        (WEEKDAYS, "16:00", "20:00", EXTENDED),
+    ]),
+    # CME Globex (futuros de índice, Treasuries, metais): domingo 17:00 a
+    # sexta 16:00 com pausa diária 16:00-17:00; regular 08:30-15:00
+    "CME": Session("America/Chicago", [
+        ((SUN, MON, TUE, WED, THU), "17:00", "24:00", EXTENDED),
+        (WEEKDAYS, "00:00", "08:30", EXTENDED),
+        (WEEKDAYS, "08:30", "15:00", OPEN),
+        (WEEKDAYS, "15:00", "16:00", EXTENDED),
+    ]),
+    # ICE Futures Europe (Brent)
+    "ICE": Session("Europe/London", [
+        (WEEKDAYS, "01:00", "23:00", OPEN),
+    ]),
+    # Xetra (DAX): indicação pré-abertura a partir das 08:00
+    "XETRA": Session("Europe/Berlin", [
+        (WEEKDAYS, "08:00", "09:00", EXTENDED),
+        (WEEKDAYS, "09:00", "17:30", OPEN),
+        (WEEKDAYS, "17:30", "22:00", EXTENDED),
+    ]),
+    # Dalian (minério): pregão diurno + sessão noturna
+    "DCE": Session("Asia/Shanghai", [
+        (WEEKDAYS, "09:00", "11:30", OPEN),
+        (WEEKDAYS, "13:30", "15:00", OPEN),
+        (WEEKDAYS, "21:00", "23:00", EXTENDED),
+    ]),
+    # Câmbio/índice do dólar: domingo 17:00 a sexta 17:00 (Nova York)
+    "FX": Session("America/New_York", [
+        ((SUN,), "17:00", "24:00", OPEN),
+        ((MON, TUE, WED, THU), "00:00", "24:00", OPEN),
+        ((FRI,), "00:00", "17:00", OPEN),
+    ]),
+}
+
+
+def status(sessions, timestamp: float) -> str:
+    """Melhor status entre as sessões (vazio = sempre aberto)."""
+    if not sessions:
+        return OPEN
+    return max((SESSIONS[name].status(timestamp) for name in sessions), key=_RANK.get)
+
+
+def seconds_until_open(sessions, timestamp: float) -> float:
+    if not sessions:
+        return 0.0
+    return min(SESSIONS[name].seconds_until_open(timestamp) for name in sessions)
@@ -1,17 +1,45 @@
 import MetaTrader5 as mt5
 import logging
 import datetime
+import time
+import numpy as np
 from .config import BridgeConfig
+from . import clock
+from . import indicators
+from .tick_flow_calculator import get_shared_calculator
+from .volatility_state import VolatilityState
 
 logger = logging.getLogger("Bridge.MT5")
 
 class MT5Client:
+    # Retry interval for symbols whose session metadata is not published yet
+    METADATA_RETRY_SECONDS = 60
+
+    # Bar length per timeframe (bars are aligned to multiples in server time)
+    TIMEFRAME_SECONDS = {"D1": 86400, "H1": 3600, "M5": 300, "M1": 60}
+
     def __init__(self):
         self.connected = False
         self.TOP_ASSETS = [
             "VALE3", "PETR4", "ITUB4", "BBDC4", "BBAS3", 
             "WEGE3", "SBSP3", "RENT3", "LREN3", "B3SA3"
         ]
+        # Symbols already added to Market Watch (symbol_select is done once)
+        self.selected = set()
+        # Per-session symbol metadata: symbol -> {"session", "session_close", "ajuste", "last", "fetched_at"}
+        self.metadata = {}
+        self.fetch_stats = {"cycles": 0, "last_ms": 0.0, "avg_ms": 0.0}
+        # Change tracking: symbol -> (tick time_msc, metadata) of the last built entry
+        self._last_state = {}
+        self._entries = {}       # symbol -> last "mt5" entry dict
+        self._blue_entries = {}  # symbol -> last blue chip entry dict (None = no data)
+        self._watch_msc = {}     # symbol -> tick time_msc seen by poll_ticks
+        # Bar cache: (symbol, timeframe) -> {"bars", "forming", "next_bar", "capacity"}
+        self._history = {}
+        # Stats derived from closed bars: (name, symbol, args) -> (last closed bar time, value)
+        self._bar_stats = {}
+        # symbol -> VolatilityState (incremental ATR per timeframe)
+        self.volatility = {}
         self.connect()
 
     def connect(self):
@@ -21,15 +49,82 @@ class MT5Client:
         else:
             logger.info("✅ MT5 Inicializado com sucesso")
             self.connected = True
+            self.selected.clear()
+            self.metadata.clear()
             self._ensure_symbols()
 
     def _ensure_symbols(self):
         # Ensure main symbols + Top 10 are selected
         all_symbols = BridgeConfig.MT5_SYMBOLS + self.TOP_ASSETS + ["IBOV"]
         for symbol in all_symbols:
-            if not mt5.symbol_select(symbol, True):
+            if not self._select(symbol):
                 logger.warning(f"⚠️ Símbolo {symbol} não encontrado no MT5")
 
+    def _select(self, symbol: str) -> bool:
+        """Adds the symbol to Market Watch once per connection."""
+        if symbol in self.selected:
+            return True
+        if mt5.symbol_select(symbol, True):
+            self.selected.add(symbol)
+            return True
+        return False
+
+    def refresh_metadata(self, symbol: str = None):
+        """
+        Drops cached session metadata so it is re-read on the next fetch.
+
+        Args:
+            symbol: Symbol to refresh (default: all)
+        """
+        if symbol is None:
+            self.metadata.clear()
+        else:
+            self.metadata.pop(symbol, None)
+
+    def _get_metadata(self, symbol: str, tick):
+        """
+        Session fields of `symbol_info` that don't change intraday
+        (previous close, settlement, session average).
+
+        Read once per trading session: the cache is refreshed when the tick
+        date moves to a new day, on `refresh_metadata`, or every
+        METADATA_RETRY_SECONDS while the terminal still reports no close.
+        """
+        if tick and tick.time:
+            session = datetime.datetime.fromtimestamp(tick.time, tz=datetime.timezone.utc).date()
+        else:
+            session = clock.now().date()
+
+        meta = self.metadata.get(symbol)
+        now = clock.now().timestamp()
+        if meta and meta["session"] == session and (
+            meta["session_close"] > 0 or now - meta["fetched_at"] < self.METADATA_RETRY_SECONDS
+        ):
+            return meta
+
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            return None
+
+        # Adjustment Price (Ajuste)
+        ajuste = 0.0
+        # Try settlement price first (Ajuste oficial)
+        if hasattr(info, 'session_price_settlement') and info.session_price_settlement > 0:
+            ajuste = info.session_price_settlement
+        # Fallback to Weighted Average if settlement not available (rare for Futures)
+        elif hasattr(info, 'session_aw') and info.session_aw > 0:
+            ajuste = info.session_aw
+
+        meta = {
+            "session": session,
+            "session_close": info.session_close,
+            "ajuste": ajuste,
+            "last": info.last,
+            "fetched_at": now
+        }
+        self.metadata[symbol] = meta
+        return meta
+
     def get_market_breadth(self):
         """
         Calculates Market Breadth (Top 10 Assets).
@@ -39,20 +134,20 @@ class MT5Client:
         details = {}
 
         for symbol in self.TOP_ASSETS:
-            # Force selection to ensure data availability
-            if not mt5.symbol_select(symbol, True):
+            # Ensure data availability
+            if not self._select(symbol):
                 logger.warning(f"⚠️ Falha ao selecionar {symbol} no MT5")
 
             tick = mt5.symbol_info_tick(symbol)
-            info = mt5.symbol_info(symbol)
+            meta = self._get_metadata(symbol, tick)
             
-            if tick and info and info.session_close > 0:
-                change = tick.last - info.session_close
+            if tick and meta and meta["session_close"] > 0:
+                change = tick.last - meta["session_close"]
                 if change > 0: up += 1
                 elif change < 0: down += 1
                 else: neutral += 1
                 
-                details[symbol] = (change / info.session_close) * 100
+                details[symbol] = (change / meta["session_close"]) * 100
             else:
                 neutral += 1
         
@@ -79,48 +174,101 @@ class MT5Client:
             return 0.0
 
     def fetch_data(self):
+        """
+        Polls the latest tick of every configured symbol.
+
+        Only `symbol_info_tick` hits the terminal every cycle; session
+        fields come from the metadata cache (see `_get_metadata`).
+        """
+        return self.fetch_snapshot()[0]
+
+    def poll_ticks(self, symbols) -> dict:
+        """
+        Cheap new-tick check for event-driven publishing.
+
+        Returns:
+            {symbol: time_msc} of the symbols whose last tick moved since the
+            previous poll (the first poll of a symbol only sets the baseline)
+        """
+        moved = {}
+        if not self.connected:
+            return moved
+        for symbol in symbols:
+            tick = mt5.symbol_info_tick(symbol)
+            last = self._watch_msc.get(symbol)
+            if tick and tick.time_msc != last:
+                self._watch_msc[symbol] = tick.time_msc
+                if last is not None:
+                    moved[symbol] = tick.time_msc
+        return moved
+
+    def _poll(self, symbol: str, ticks: dict, changed: set):
+        """
+        Latest tick + session metadata of a symbol, once per cycle.
+
+        Adds the symbol to `changed` when its tick `time_msc` or metadata
+        moved since the previous cycle.
+        """
+        if symbol not in ticks:
+            tick = mt5.symbol_info_tick(symbol)
+            meta = self._get_metadata(symbol, tick)
+            state = (tick.time_msc if tick else None, meta)
+            last = self._last_state.get(symbol)
+            if last is None or last[0] != state[0] or last[1] is not meta:
+                changed.add(symbol)
+                self._last_state[symbol] = state
+            ticks[symbol] = (tick, meta)
+        return ticks[symbol]
+
+    def fetch_snapshot(self):
+        """
+        Full snapshot plus the symbols whose tick moved since the last call.
+
+        Entries of unchanged symbols are the same dict objects as in the
+        previous snapshot (their `timestamp` is the time of the last change).
+
+        Returns:
+            Tuple (data, changed_symbols)
+        """
         data = {}
+        changed = set()
         if not self.connected:
             if not mt5.initialize():
-                return {}
+                return {}, changed
             self.connected = True
+            self._ensure_symbols()
+
+        started = time.perf_counter()
+        ticks = {}
 
         # 1. Main Symbols (WIN, WDO, DI)
         for symbol in BridgeConfig.MT5_SYMBOLS:
             try:
-                tick = mt5.symbol_info_tick(symbol)
-                info = mt5.symbol_info(symbol)
+                tick, meta = self._poll(symbol, ticks, changed)
+                if symbol not in changed and symbol in self._entries:
+                    data[symbol] = self._entries[symbol]
+                    continue
                 
                 price = 0.0
                 if tick and tick.last > 0:
                     price = tick.last
-                elif info:
-                    price = info.session_close if info.session_close > 0 else info.last
+                elif meta:
+                    price = meta["session_close"] if meta["session_close"] > 0 else meta["last"]
 
                 # Calculate Change
                 change = 0.0
                 change_pct = 0.0
                 
-                if info and info.session_close > 0 and price > 0:
-                    change = price - info.session_close
-                    change_pct = (change / info.session_close) * 100
-                
-                # Adjustment Price (Ajuste)
-                ajuste = 0.0
-                if info:
-                    # Try settlement price first (Ajuste oficial)
-                    if hasattr(info, 'session_price_settlement') and info.session_price_settlement > 0:
-                        ajuste = info.session_price_settlement
-                    # Fallback to Weighted Average if settlement not available (rare for Futures)
-                    elif hasattr(info, 'session_aw') and info.session_aw > 0:
-                        ajuste = info.session_aw
-
-                data[symbol] = {
+                if meta and meta["session_close"] > 0 and price > 0:
+                    change = price - meta["session_close"]
+                    change_pct = (change / meta["session_close"]) * 100
+
+                data[symbol] = self._entries[symbol] = {
                     "valor": price,
                     "var": change,
                     "var_pct": change_pct,
-                    "ajuste": ajuste,
-                    "timestamp": datetime.datetime.now().isoformat()
+                    "ajuste": meta["ajuste"] if meta else 0.0,
+                    "timestamp": clock.now().isoformat()
                 }
             except Exception:
                 pass
@@ -130,33 +278,34 @@ class MT5Client:
         up, down, neutral = 0, 0, 0
         
         for symbol in self.TOP_ASSETS:
-            # Force selection
-            if not mt5.symbol_select(symbol, True):
-                logger.warning(f"⚠️ Falha ao selecionar {symbol}")
+            tick, meta = self._poll(symbol, ticks, changed)
 
-            tick = mt5.symbol_info_tick(symbol)
-            info = mt5.symbol_info(symbol)
-            
-            # Use tick if available, else info (last price)
-            price = 0.0
-            if tick and tick.last > 0:
-                price = tick.last
-            elif info:
-                price = info.session_close if info.session_close > 0 else info.last
-            
-            if price > 0 and info and info.session_close > 0:
-                change = price - info.session_close
-                change_pct = (change / info.session_close) * 100
-                
-                blue_chips[symbol] = {
-                    "valor": price,
-                    "var": change,
-                    "var_pct": change_pct
-                }
-                
-                # DEBUG: Log specific assets to find the "wrong percentage" cause
-                if symbol in ["VALE3", "PETR4"]:
-                     logger.info(f"🔍 {symbol}: Price={price}, Close={info.session_close}, Calc_Pct={change_pct:.2f}%")
+            if symbol in changed or symbol not in self._blue_entries:
+                # Use tick if available, else cached session data
+                price = 0.0
+                if tick and tick.last > 0:
+                    price = tick.last
+                elif meta:
+                    price = meta["session_close"] if meta["session_close"] > 0 else meta["last"]
+
+                entry = None
+                if price > 0 and meta and meta["session_close"] > 0:
+                    change = price - meta["session_close"]
+                    entry = {
+                        "valor": price,
+                        "var": change,
+                        "var_pct": (change / meta["session_close"]) * 100
+                    }
+
+                    # DEBUG: Log specific assets to find the "wrong percentage" cause
+                    if symbol in ["VALE3", "PETR4"]:
+                         logger.info(f"🔍 {symbol}: Price={price}, Close={meta['session_close']}, Calc_Pct={entry['var_pct']:.2f}%")
+                self._blue_entries[symbol] = entry
+
+            entry = self._blue_entries[symbol]
+            if entry:
+                blue_chips[symbol] = entry
+                change = entry["var"]
                 
                 if change > 0: up += 1
                 elif change < 0: down += 1
@@ -235,12 +384,24 @@ class MT5Client:
         if "VALE3" in blue_chips:
             v = blue_chips["VALE3"]
             # logger.info(f"🔍 DEBUG VALE3: Price={v['valor']}, Var={v['var']}, Pct={v['var_pct']:.2f}%")
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.fetch_stats
+        stats["cycles"] += 1
+        stats["last_ms"] = elapsed_ms
+        stats["avg_ms"] += (elapsed_ms - stats["avg_ms"]) / min(stats["cycles"], 100)
+        if stats["cycles"] % 300 == 0:
+            logger.info(f"⏱️ MT5 fetch: {stats['avg_ms']:.1f} ms/ciclo (média), {len(self.metadata)} símbolos em cache")
             
-        return data
+        return data, changed
 
     def calculate_vwap(self, symbol: str, period_minutes: int = 60):
         """
         Calculates VWAP (Volume Weighted Average Price) intraday.
+
+        Served from the incremental tick VWAP engine when `period_minutes`
+        is one of BridgeConfig.VWAP_ROLLING_MINUTES; otherwise (or before
+        the first trade) from closed M1 bars.
         
         Args:
             symbol: Symbol to calculate VWAP for (e.g., "WDO$N")
@@ -253,31 +414,24 @@ class MT5Client:
             if not mt5.initialize():
                 return None
             self.connected = True
+
+        snapshot = get_shared_calculator().calculate_vwap(symbol)
+        if snapshot and snapshot.get(f"{period_minutes}m"):
+            return snapshot[f"{period_minutes}m"]["vwap"]
         
-        # Get M1 candles for the period
-        rates = self.get_history(symbol, "M1", period_minutes)
+        # Get closed M1 candles for the period
+        rates = self.get_history_array(symbol, "M1", period_minutes, closed_only=True)
         
-        if not rates or len(rates) < 5:
+        if len(rates) < 5:
             logger.warning(f"⚠️ Dados insuficientes para VWAP de {symbol}")
             return None
         
-        total_pv = 0  # Price × Volume
-        total_volume = 0
-        
-        for rate in rates:
-            # Typical Price = (High + Low + Close) / 3
-            typical_price = (rate['high'] + rate['low'] + rate['close']) / 3
-            volume = rate['real_volume']
-            
-            if volume > 0:
-                total_pv += typical_price * volume
-                total_volume += volume
-        
-        if total_volume == 0:
+        # Typical Price = (High + Low + Close) / 3, weighted by real volume
+        vwap = indicators.vwap(rates)
+        if vwap is None:
             logger.warning(f"⚠️ Volume zero para VWAP de {symbol}")
             return None
         
-        vwap = total_pv / total_volume
         return round(vwap, 2)
 
     def get_volume_average(self, symbol: str, days: int = 10):
@@ -296,18 +450,21 @@ class MT5Client:
                 return 5000  # Fallback
             self.connected = True
         
-        # Get daily history
-        rates = self.get_history(symbol, "D1", days)
+        # Get closed daily bars (today's partial volume would drag the average down)
+        rates = self.get_history_array(symbol, "D1", days, closed_only=True)
         
-        if not rates or len(rates) < days:
+        if len(rates) < days:
             logger.warning(f"⚠️ Histórico insuficiente para volume médio de {symbol}, usando fallback")
             return 5000  # Fallback to fixed value
+
+        last_close = int(rates['time'][-1])
+        cached = self._bar_stats.get(("volume_average", symbol, days))
+        if cached and cached[0] == last_close:
+            return cached[1]
         
-        # Sum real volume from last N days
-        total_volume = sum(rate['real_volume'] for rate in rates[-days:])
-        
-        # Calculate daily average
-        avg_daily_volume = total_volume / days
+        # Average real volume of the last N days
+        avg_daily_volume = indicators.average_volume(rates, days)
+        self._bar_stats[("volume_average", symbol, days)] = (last_close, avg_daily_volume)
         
         logger.info(f"📊 Volume médio {days}d para {symbol}: {avg_daily_volume:.0f}")
         return avg_daily_volume
@@ -315,14 +472,88 @@ class MT5Client:
     def shutdown(self):
         mt5.shutdown()
 
-    def get_history(self, symbol: str, timeframe_str: str, count: int = 100):
+    def _server_time(self, symbol: str) -> int:
+        """Latest known server time (seconds) for the symbol, from its last tick."""
+        state = self._last_state.get(symbol)
+        if state and state[0]:
+            return state[0] // 1000
+        tick = mt5.symbol_info_tick(symbol)
+        return int(tick.time) if tick else 0
+
+    @staticmethod
+    def _rates_to_dicts(rates: np.ndarray) -> list:
+        """JSON form of a rates array (used for the `history:*` keys)."""
+        columns = ("time", "open", "high", "low", "close", "tick_volume", "real_volume")
+        values = [rates[name].tolist() for name in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+
+    def _refresh_history(self, symbol: str, timeframe_str: str, tf, count: int, entry: dict, now: int):
         """
-        Fetches historical data from MT5.
+        Fetches bars from MT5 into the cache.
+
+        With a warm cache only the bars since the cached forming bar are
+        requested and merged by open time; otherwise `count` bars.
+        """
+        tf_seconds = self.TIMEFRAME_SECONDS.get(timeframe_str, 86400)
+        incremental = bool(entry and len(entry["bars"]) and count <= entry["capacity"])
+        if incremental:
+            # Calendar bars since the cached last bar bound the trading bars
+            last_open = int(entry["bars"]['time'][-1])
+            capacity = entry["capacity"]
+            fetch = min(capacity, max(0, now - last_open) // tf_seconds + 2)
+        else:
+            capacity = count
+            fetch = count
+
+        rates = mt5.copy_rates_from_pos(symbol, tf, 0, fetch)
+        if rates is None:
+            return None
+
+        bars = rates
+        if incremental and len(rates):
+            cached = entry["bars"]
+            older = cached[cached['time'] < rates['time'][0]]
+            bars = np.concatenate([older.astype(rates.dtype), rates])
+        elif incremental:
+            bars = entry["bars"]
+        bars = np.array(bars[-capacity:])
+        # Readers get views of this array: never mutate it in place
+        bars.flags.writeable = False
+
+        forming = len(bars) > 0 and int(bars['time'][-1]) + tf_seconds > now
+        entry = {
+            "bars": bars,
+            "forming": forming,
+            # Valid until the next bar boundary (server time)
+            "next_bar": (now // tf_seconds + 1) * tf_seconds,
+            "capacity": capacity
+        }
+        self._history[(symbol, timeframe_str)] = entry
+        return entry
+
+    def get_history_array(self, symbol: str, timeframe_str: str, count: int = 100, closed_only: bool = False, live: bool = False) -> np.ndarray:
+        """
+        Fetches historical bars from MT5 as the terminal's structured array.
         timeframe_str: "D1", "H1", "M5", etc.
+
+        Bars are cached per (symbol, timeframe) and only re-read from the
+        terminal when a bar closes (server time, from the symbol's last tick),
+        so repeated reads inside the same bar come from memory. The result
+        is a read-only view of the cache.
+
+        Args:
+            closed_only: Drop the bar still forming
+            live: Refresh the forming bar from the terminal (one-bar fetch)
+
+        Returns:
+            Structured array (`time`, `open`, `high`, `low`, `close`,
+            `tick_volume`, `real_volume`, ...), empty if unavailable
         """
+        empty = np.zeros(0, dtype=[("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                                   ("close", "<f8"), ("tick_volume", "<u8"), ("real_volume", "<u8")])
         if not self.connected:
             if not mt5.initialize():
-                return []
+                return empty
             self.connected = True
 
         # Map string to MT5 constant
@@ -336,82 +567,68 @@ class MT5Client:
         tf = tf_map.get(timeframe_str, mt5.TIMEFRAME_D1)
         
         # Ensure symbol is selected
-        if not mt5.symbol_select(symbol, True):
+        if not self._select(symbol):
              logger.warning(f"⚠️ Símbolo {symbol} não encontrado para histórico")
-             return []
+             return empty
 
-        rates = mt5.copy_rates_from_pos(symbol, tf, 0, count)
-        
-        if rates is None:
+        key = (symbol, timeframe_str)
+        entry = self._history.get(key)
+        now = self._server_time(symbol)
+        needed = count + 1 if closed_only else count
+
+        if entry is None or needed > entry["capacity"] or now >= entry["next_bar"]:
+            entry = self._refresh_history(symbol, timeframe_str, tf, needed, entry, now)
+        elif live and entry["forming"]:
+            rates = mt5.copy_rates_from_pos(symbol, tf, 0, 1)
+            if rates is not None and len(rates) and rates['time'][-1] == entry["bars"]['time'][-1]:
+                bars = entry["bars"].copy()
+                bars[-1] = rates[-1]
+                bars.flags.writeable = False
+                entry["bars"] = bars
+            else:
+                entry = self._refresh_history(symbol, timeframe_str, tf, needed, entry, now)
+
+        if entry is None:
             logger.warning(f"⚠️ Sem histórico para {symbol}")
-            return []
-            
-        data = []
-        for rate in rates:
-            data.append({
-                "time": int(rate['time']),
-                "open": float(rate['open']),
-                "high": float(rate['high']),
-                "low": float(rate['low']),
-                "close": float(rate['close']),
-                "tick_volume": int(rate['tick_volume']),
-                "real_volume": int(rate['real_volume'])
-            })
-        return data
-
-    def calculate_atr(self, rates, period=14):
+            return empty
+
+        bars = entry["bars"][:-1] if closed_only and entry["forming"] else entry["bars"]
+        return bars[-count:]
+
+    def get_history(self, symbol: str, timeframe_str: str, count: int = 100, closed_only: bool = False, live: bool = False):
+        """
+        Same as `get_history_array`, as a list of dicts (JSON boundary).
+        """
+        return self._rates_to_dicts(self.get_history_array(symbol, timeframe_str, count, closed_only, live))
+
+    def calculate_atr(self, rates, period=14, method="sma"):
         """
         Calculates ATR (Average True Range).
-        rates: List of dicts with 'high', 'low', 'close'.
+        rates: Structured array with 'high', 'low', 'close'.
+        method: "sma" (mean of the last `period` TRs) or "wilder".
         """
-        if len(rates) < period + 1:
-            return 0.0
-            
-        tr_list = []
-        for i in range(1, len(rates)):
-            high = rates[i]['high']
-            low = rates[i]['low']
-            prev_close = rates[i-1]['close']
-            
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            tr_list.append(tr)
-            
-        if not tr_list:
-            return 0.0
-            
-        # Simple Moving Average of TR (Wilder's is better but SMA is fine for this proxy)
-        # Using simple slicing for last 'period' TRs
-        relevant_tr = tr_list[-period:]
-        if len(relevant_tr) < period:
-            return 0.0
-            
-        return sum(relevant_tr) / period
+        return indicators.atr(rates, period, method)
 
     def get_volatility_regime(self, symbol: str):
         """
-        Calculates Volatility Regime based on ATR(5) vs ATR(20).
+        Calculates Volatility Regime based on Wilder ATR(5) vs ATR(20) on D1,
+        plus the same regime on the intraday timeframes (H1/M5).
+
+        Served from a per-symbol VolatilityState that only processes bars
+        closed since the previous call.
         """
-        # Fetch last 30 daily candles to be safe
-        rates = self.get_history(symbol, "D1", 30)
-        if not rates or len(rates) < 25:
-            return None
-            
-        atr5 = self.calculate_atr(rates, 5)
-        atr20 = self.calculate_atr(rates, 20)
-        
-        if atr20 == 0:
+        state = self.volatility.get(symbol)
+        if state is None:
+            state = self.volatility[symbol] = VolatilityState()
+        state.sync(self, symbol)
+
+        regime = state.regime("D1")
+        if regime is None:
             return None
-            
-        ratio = atr5 / atr20
-        status = "EXPANDING" if atr5 > atr20 else "CONTRACTING"
-        
-        # Calculate average daily range in points (last 5 days)
-        current_range = atr5
-        
-        return {
-            "status": status,
-            "ratio": round(ratio, 2),
-            "atr5": round(atr5, 2),
-            "atr20": round(atr20, 2),
-            "implication": "Stops devem ser MAIORES (Volatilidade Alta)" if status == "EXPANDING" else "Stops podem ser CURTOS (Volatilidade Baixa)"
-        }
+
+        regime["implication"] = (
+            "Stops devem ser MAIORES (Volatilidade Alta)" if regime["status"] == "EXPANDING"
+            else "Stops podem ser CURTOS (Volatilidade Baixa)"
+        )
+        regime["intraday"] = {tf: state.regime(tf) for tf in state.timeframes if tf != "D1"}
+        return regime
@@ -0,0 +1,74 @@
+"""
+MT5 Executor
+============
+Thread único dono da conexão com o terminal MetaTrader5.
+
+A biblioteca MetaTrader5 não é segura para chamadas simultâneas de várias
+threads; com `asyncio.to_thread` cada chamada caía numa thread qualquer do
+pool. Aqui todas as chamadas entram numa fila atendida por uma só thread
+e as corrotinas aguardam futures. Pedidos com a mesma `key` ainda em
+andamento (ex: mesmo símbolo/timeframe no mesmo ciclo) são mesclados:
+quem chega depois aguarda o resultado do primeiro.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .latency import LatencyStats
+
+logger = logging.getLogger("Bridge.MT5Executor")
+
+
+class MT5Executor:
+    """Fila de chamadas ao MT5 atendida por uma única thread."""
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MT5")
+        self._inflight = {}  # key -> asyncio.Future do pedido em andamento
+        self.queue_wait = LatencyStats()  # Tempo na fila até começar a rodar (ms)
+        self.calls = 0
+        self.merged = 0
+
+    def run_sync(self, fn, *args, **kwargs):
+        """Roda `fn` na thread do MT5 e bloqueia até o resultado (uso fora do event loop)."""
+        return self._pool.submit(fn, *args, **kwargs).result()
+
+    async def call(self, fn, *args, key=None, **kwargs):
+        """
+        Enfileira `fn(*args, **kwargs)` na thread do MT5.
+
+        Args:
+            fn: Função síncrona que usa o MT5
+            key: Identificador do pedido para mesclar pedidos iguais em andamento
+
+        Returns:
+            Resultado de `fn`
+        """
+        if key is not None and key in self._inflight:
+            self.merged += 1
+            return await asyncio.shield(self._inflight[key])
+
+        submitted = time.perf_counter()
+
+        def job():
+            self.queue_wait.add((time.perf_counter() - submitted) * 1000)
+            return fn(*args, **kwargs)
+
+        future = asyncio.get_running_loop().run_in_executor(self._pool, job)
+        self.calls += 1
+        if key is not None:
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: cancelar quem aguarda não cancela o pedido dos demais
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "merged": self.merged, "queue_wait": self.queue_wait.snapshot()}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
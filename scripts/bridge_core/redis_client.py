@@ -1,33 +1,176 @@
-import redis
+import asyncio
 import logging
-import json
+import random
+from collections import OrderedDict, deque
+
+import redis.asyncio as redis
+
 from .config import BridgeConfig
+from .codec import Codec
+from .sections import SectionTracker, MANIFEST, STREAM, SECTION_FIELD, section_key
 
 logger = logging.getLogger("Bridge.Redis")
 
 class RedisClient:
-    def __init__(self):
-        self.client = None
-        self.connect()
+    """
+    Publicador assíncrono do bridge.
 
-    def connect(self):
-        try:
-            self.client = redis.Redis(
+    `publish` / `publish_sections` não tocam a rede: só enfileiram os valores
+    serializados e acordam a task escritora, que manda tudo o que estiver na
+    fila num pipeline (redis.asyncio com pool de conexões). Com o Redis fora,
+    a escritora reconecta com backoff exponencial e a fila guarda só o valor
+    mais novo de cada chave (+ entradas do stream, limitadas), então o estado
+    mais recente é gravado assim que a conexão volta, sem travar o loop do MT5.
+    """
+
+    def __init__(self):
+        self.codec = Codec()
+        self.trackers = {}  # prefixo -> SectionTracker
+        self.latest = {}    # prefixo -> últimas seções (payload legado em publicações parciais)
+        self.client = redis.Redis(
+            connection_pool=redis.ConnectionPool(
                 host=BridgeConfig.REDIS_HOST,
                 port=BridgeConfig.REDIS_PORT,
                 db=0,
-                decode_responses=True
+                max_connections=BridgeConfig.REDIS_MAX_CONNECTIONS,
+                socket_connect_timeout=BridgeConfig.REDIS_TIMEOUT,
+                socket_timeout=BridgeConfig.REDIS_TIMEOUT
             )
-            self.client.ping()
-            logger.info(f"✅ Conectado ao Redis em {BridgeConfig.REDIS_HOST}:{BridgeConfig.REDIS_PORT}")
-        except Exception as e:
-            logger.error(f"❌ Falha ao conectar no Redis: {e}")
-            self.client = None
+        )
+
+        # Escritas pendentes: chave -> valor (o mais novo prevalece) e entradas do stream
+        self.pending = OrderedDict()
+        self.pending_stream = deque(maxlen=BridgeConfig.REDIS_BUFFER_SIZE)
+        self.wakeup = asyncio.Event()
+        self.writer_task = None
+        self.connected = False
+        self.counters = {"writes": 0, "batches": 0, "errors": 0, "dropped": 0}
+
+    # ------------------------------------------------------------------ queue
+
+    def _ensure_writer(self):
+        if self.writer_task is None or self.writer_task.done():
+            self.writer_task = asyncio.get_running_loop().create_task(self._writer())
+
+    def _queue(self, key: str, encoded: bytes):
+        # Reinserir move a chave para o fim: no lote o manifest sempre vai
+        # depois das seções para as quais aponta
+        self.pending.pop(key, None)
+        self.pending[key] = encoded
+        if len(self.pending) > BridgeConfig.REDIS_BUFFER_SIZE:
+            dropped, _ = self.pending.popitem(last=False)
+            self.counters["dropped"] += 1
+            # Seção descartada ficaria velha no Redis: regrava tudo no próximo ciclo
+            for tracker in self.trackers.values():
+                tracker.invalidate()
+            logger.warning(f"⚠️ Buffer do Redis cheio, descartando {dropped}")
 
     def publish(self, key: str, data: dict):
-        if not self.client:
-            return
+        self._queue(key, self.codec.encode(data))
+        self._ensure_writer()
+        self.wakeup.set()
+
+    def publish_sections(self, prefix: str, sections: dict, meta: dict = None):
+        """
+        Enfileira as seções que mudaram + o manifest (gravados num único
+        pipeline) e a mesma atualização para o stream `<prefix>:stream`
+        (push para o backend).
+
+        Args:
+            prefix: Prefixo das chaves (ex.: "market_data")
+            sections: nome -> dados da seção (pode ser só parte delas)
+            meta: Campos extras do manifest (timestamp, changed)
+        """
+        tracker = self.trackers.setdefault(prefix, SectionTracker(prefix, self.codec))
+        changed, manifest = tracker.diff(sections, meta)
+
+        for name, encoded in changed.items():
+            self._queue(section_key(prefix, name), encoded)
+        # Manifest por último: nunca aponta para uma versão ainda não gravada
+        self._queue(section_key(prefix, MANIFEST), manifest)
+        if BridgeConfig.PUBLISH_LEGACY_KEY:
+            latest = self.latest.setdefault(prefix, {})
+            latest.update(sections)
+            self._queue(prefix, self.codec.encode({**latest, **(meta or {})}))
+        if BridgeConfig.STREAM_MAXLEN > 0:
+            if len(self.pending_stream) == self.pending_stream.maxlen:
+                self.counters["dropped"] += 1
+            fields = {MANIFEST: manifest}
+            fields.update({SECTION_FIELD + name: encoded for name, encoded in changed.items()})
+            self.pending_stream.append((section_key(prefix, STREAM), fields))
+
+        self._ensure_writer()
+        self.wakeup.set()
+
+    # ------------------------------------------------------------------ writer
+
+    async def _flush(self):
+        """Envia tudo o que está pendente num pipeline; em caso de falha, devolve à fila."""
+        batch, self.pending = self.pending, OrderedDict()
+        entries = list(self.pending_stream)
+        self.pending_stream.clear()
+
         try:
-            self.client.set(key, json.dumps(data))
-        except Exception as e:
-            logger.error(f"❌ Erro ao publicar no Redis: {e}")
+            pipe = self.client.pipeline(transaction=False)
+            for key, encoded in batch.items():
+                pipe.set(key, encoded)
+            for stream, fields in entries:
+                pipe.xadd(stream, fields, maxlen=BridgeConfig.STREAM_MAXLEN, approximate=True)
+            await pipe.execute()
+        except BaseException:
+            # Valores enfileirados durante a tentativa são mais novos e prevalecem
+            for key, encoded in reversed(batch.items()):
+                if key not in self.pending:
+                    self.pending[key] = encoded
+                    self.pending.move_to_end(key, last=False)
+            self.pending_stream.extendleft(reversed(entries))
+            raise
+
+        self.counters["writes"] += len(batch) + len(entries)
+        self.counters["batches"] += 1
+
+    async def _writer(self):
+        delay = BridgeConfig.REDIS_RECONNECT_MIN
+        while True:
+            if not self.pending and not self.pending_stream:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+
+            try:
+                if not self.connected:
+                    await self.client.ping()
+                    self.connected = True
+                    delay = BridgeConfig.REDIS_RECONNECT_MIN
+                    logger.info(f"✅ Conectado ao Redis em {BridgeConfig.REDIS_HOST}:{BridgeConfig.REDIS_PORT}")
+                await self._flush()
+
+            except Exception as e:  # RedisError, OSError, timeouts
+                if self.connected or self.counters["errors"] == 0:
+                    logger.error(f"❌ Redis indisponível ({e}), bufferizando (reconexão em até {BridgeConfig.REDIS_RECONNECT_MAX:.0f}s)")
+                self.connected = False
+                self.counters["errors"] += 1
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, BridgeConfig.REDIS_RECONNECT_MAX)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "pending": len(self.pending),
+            "pending_stream": len(self.pending_stream),
+            **self.counters
+        }
+
+    async def aclose(self, timeout: float = 2.0):
+        """Última tentativa de gravar o que está pendente e fecha o pool."""
+        if self.writer_task:
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+        if self.pending or self.pending_stream:
+            try:
+                await asyncio.wait_for(self._flush(), timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ {len(self.pending)} chaves não gravadas no Redis ao encerrar: {e}")
+        await self.client.aclose()
@@ -0,0 +1,605 @@
+"""
+Record & Replay
+===============
+Grava as entradas do DataEngine durante um pregão e as reproduz depois,
+sem terminal MT5, em 1x, 10x ou velocidade máxima.
+
+Entradas gravadas (`<dir>/events.jsonl.gz`, uma linha JSON por evento):
+- "mt5":   resultado de symbol_info, symbol_info_tick, copy_rates_from_pos e copy_ticks_*
+- "http":  corpo e status de cada página/API buscada (Investing, calendário, AwesomeAPI)
+- "flow":  cada atualização dos JSON do SpyFlow
+- "cycle": início de cada ciclo do loop principal
+
+Cada evento leva o instante em que a chamada começou; dentro de um ciclo,
+o instante em que o ciclo começou. Em velocidade máxima o relógio do replay
+salta para o início gravado de cada ciclo, então o ciclo i reproduzido lê
+exatamente o que o ciclo i gravado leu.
+
+No replay, `ReplayMT5` substitui o módulo MetaTrader5, `ReplaySession`
+substitui o aiohttp.ClientSession e `ReplayClock` substitui o relógio
+(ver clock.py), então o `_main_loop` real roda e gera os mesmos payloads.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import asyncio
+import bisect
+import calendar
+import datetime
+import gzip
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from . import clock
+from .flow_kernels import ticks_after_cursor
+from .flow_monitor import FlowMonitor
+from .codec import Codec
+from .sections import SectionTracker, MANIFEST, section_key
+
+logger = logging.getLogger("Bridge.Replay")
+
+EVENTS_FILE = "events.jsonl.gz"
+
+# Chamadas do MT5 que viram eventos "mt5"
+RECORDED_MT5_CALLS = (
+    "symbol_info", "symbol_info_tick", "copy_rates_from_pos",
+    "copy_ticks_from", "copy_ticks_range"
+)
+
+
+# --- Codificação ---
+
+def _encode(value):
+    """Converte resultados do MT5 (namedtuples, arrays estruturados) em JSON."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        return {"__struct__": [list(d) for d in value.dtype.descr], "rows": value.tolist()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if hasattr(value, "_asdict"):
+        return {"__ns__": {k: _encode(v) for k, v in value._asdict().items()}}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return str(value)
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__struct__" in value:
+        dtype = np.dtype([tuple(d) for d in value["__struct__"]])
+        return np.array([tuple(row) for row in value["rows"]], dtype=dtype)
+    if "__ns__" in value:
+        return SimpleNamespace(**{k: _decode(v) for k, v in value["__ns__"].items()})
+    if "__datetime__" in value:
+        return datetime.datetime.fromisoformat(value["__datetime__"])
+    return {k: _decode(v) for k, v in value.items()}
+
+
+def _to_epoch(value) -> float:
+    """Datas do MT5: datetime ingênuo é tratado como UTC, como no terminal."""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            return calendar.timegm(value.timetuple()) + value.microsecond / 1e6
+        return value.timestamp()
+    return float(value)
+
+
+# --- Gravação ---
+
+class Recorder:
+    """
+    Grava eventos em `<dir>/events.jsonl.gz`.
+
+    Chamado tanto do event loop quanto das threads do `asyncio.to_thread`.
+    Resultados "mt5" idênticos ao anterior da mesma chamada não são regravados.
+
+    Entre `begin_cycle` e `end_cycle` todo evento leva o instante de início
+    do ciclo; fora dele, o instante de início da chamada (`started`).
+    """
+
+    FLUSH_EVERY = 200
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, EVENTS_FILE)
+        self._file = gzip.open(self.path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._last = {}
+        self._pending = 0
+        self._cycle_t = None
+        logger.info(f"🎙️ Gravando sessão em {self.path}")
+
+    def begin_cycle(self):
+        with self._lock:
+            self._cycle_t = clock.now().timestamp()
+        self.record("cycle", None, None)
+
+    def end_cycle(self):
+        with self._lock:
+            self._cycle_t = None
+
+    def record(self, kind: str, key, data, started: float = None):
+        line_data = json.dumps(_encode(data), separators=(",", ":"))
+        with self._lock:
+            if kind == "mt5":
+                if self._last.get(key) == line_data:
+                    return
+                self._last[key] = line_data
+            if self._cycle_t is not None:
+                t = self._cycle_t
+            else:
+                t = started if started is not None else clock.now().timestamp()
+            self._file.write(f'{{"t":{t},"kind":"{kind}","key":{json.dumps(key)},"data":{line_data}}}\n')
+            self._pending += 1
+            if self._pending >= self.FLUSH_EVERY:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class RecordingMT5:
+    """
+    Envolve o módulo MetaTrader5 e grava as chamadas de dados.
+
+    Deve ser instalado em `sys.modules["MetaTrader5"]` antes de importar o
+    bridge_core (ver `install_recording_mt5`).
+    """
+
+    def __init__(self, mt5_module, recorder: Recorder):
+        self._mt5 = mt5_module
+        self._recorder = recorder
+        constants = {
+            name: getattr(mt5_module, name) for name in dir(mt5_module)
+            if name.isupper() and isinstance(getattr(mt5_module, name), int)
+        }
+        recorder.record("mt5_constants", None, constants)
+
+    def __getattr__(self, name):
+        attr = getattr(self._mt5, name)
+        if name not in RECORDED_MT5_CALLS:
+            return attr
+
+        def recorded_call(*args):
+            started = clock.now().timestamp()
+            result = attr(*args)
+            if name.startswith("copy_ticks"):
+                # Ticks: todo lote é informação nova, grava sempre (menos vazio)
+                if result is not None and len(result):
+                    self._recorder.record("ticks", args[0], result, started)
+            else:
+                key = json.dumps([name] + [_encode(a) for a in args])
+                self._recorder.record("mt5", key, result, started)
+            return result
+
+        return recorded_call
+
+
+def install_recording_mt5(recorder: Recorder):
+    """Troca o MetaTrader5 em sys.modules por um RecordingMT5."""
+    import sys
+    import importlib
+    real = importlib.import_module("MetaTrader5")
+    sys.modules["MetaTrader5"] = RecordingMT5(real, recorder)
+
+
+class _RecordingRequest:
+    def __init__(self, request, recorder: Recorder, url: str):
+        self._request = request
+        self._recorder = recorder
+        self._url = url
+        self._response = None
+        self._started = clock.now().timestamp()
+
+    async def __aenter__(self):
+        self._response = await self._request.__aenter__()
+        if self._response.status != 200:
+            self._recorder.record("http", self._url, {"status": self._response.status, "body": ""}, self._started)
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._request.__aexit__(*exc)
+
+    @property
+    def status(self):
+        return self._response.status
+
+    async def text(self):
+        body = await self._response.text()
+        self._recorder.record("http", self._url, {"status": self._response.status, "body": body}, self._started)
+        return body
+
+    async def json(self, **kwargs):
+        return json.loads(await self.text())
+
+
+class RecordingSession:
+    """aiohttp.ClientSession que grava o corpo de cada resposta."""
+
+    def __init__(self, recorder: Recorder, **kwargs):
+        import aiohttp
+        self._session = aiohttp.ClientSession(**kwargs)
+        self._recorder = recorder
+
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._session.__aexit__(*exc)
+
+    def get(self, url, **kwargs):
+        return _RecordingRequest(self._session.get(url, **kwargs), self._recorder, url)
+
+
+# --- Reprodução ---
+
+class Recording:
+    """Eventos de uma sessão gravada, indexados para consulta por tempo."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.constants = {}
+        self.calls = {}   # key -> ([t], [data])
+        self.http = {}    # url -> ([t], [data])
+        self.flows = ([], [])
+        self.ticks = {}   # symbol -> (ticks, available_at)
+        self.rates = {}   # (symbol, timeframe) -> ([t], [barras]) de copy_rates_from_pos(..., 0, n)
+        self.cycles = []  # Início de cada ciclo gravado
+        self.start = None
+        self.end = None
+
+        tick_batches = {}
+        with gzip.open(os.path.join(directory, EVENTS_FILE), "rt", encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                t, kind, key = event["t"], event["kind"], event["key"]
+                self.start = t if self.start is None else min(self.start, t)
+                self.end = t if self.end is None else max(self.end, t)
+
+                if kind == "mt5_constants":
+                    self.constants.update(event["data"])
+                elif kind == "mt5":
+                    self._add(self.calls, key, t, event["data"])
+                    call = json.loads(key)
+                    if call[0] == "copy_rates_from_pos" and call[3] == 0 and event["data"] is not None:
+                        self._add(self.rates, (call[1], call[2]), t, _decode(event["data"]))
+                elif kind == "cycle":
+                    self.cycles.append(t)
+                elif kind == "http":
+                    self._add(self.http, key, t, event["data"])
+                elif kind == "flow":
+                    self.flows[0].append(t)
+                    self.flows[1].append(event["data"])
+                elif kind == "ticks":
+                    tick_batches.setdefault(key, []).append((t, _decode(event["data"])))
+
+        for symbol, batches in tick_batches.items():
+            self.ticks[symbol] = self._merge_ticks(batches)
+
+        logger.info(f"📼 Gravação carregada: {len(self.calls)} chamadas MT5, {len(self.http)} URLs, "
+                    f"{len(self.ticks)} símbolos com ticks")
+
+    @staticmethod
+    def _add(index: dict, key, t: float, data):
+        times, values = index.setdefault(key, ([], []))
+        times.append(t)
+        values.append(data)
+
+    @staticmethod
+    def _merge_ticks(batches):
+        """Junta os lotes gravados em um fluxo único, sem repetir ticks."""
+        last, seen = 0, 0
+        merged, available = [], []
+        for t, batch in batches:
+            if len(batch) and last and int(batch['time_msc'][0]) > last:
+                # Lote que não encosta no cursor (ex: janela de range): reinicia a contagem
+                seen = 0
+            fresh, new_last, new_seen = ticks_after_cursor(batch, last, seen)
+            if len(fresh) and int(fresh['time_msc'][0]) >= last:
+                merged.append(fresh)
+                available.append(np.full(len(fresh), t))
+                last, seen = new_last, new_seen
+        if not merged:
+            return None, np.empty(0)
+        return np.concatenate(merged), np.concatenate(available)
+
+    @staticmethod
+    def latest(index: dict, key, t: float):
+        """Último valor gravado para a chave até o instante t."""
+        entry = index.get(key)
+        if not entry:
+            return None
+        pos = bisect.bisect_right(entry[0], t) - 1
+        return entry[1][pos] if pos >= 0 else None
+
+
+class ReplayClock:
+    """
+    Relógio virtual que começa no início da gravação.
+
+    speed=1 ou 10: o tempo virtual anda `speed` vezes mais rápido que o real.
+    speed=None (máximo): o tempo só anda quando o loop principal termina um
+    ciclo (`pace`) ou começa o próximo (`begin_cycle`, que salta para o
+    início gravado do ciclo); os outros loops dormem até o tempo virtual
+    alcançá-los.
+
+    Passado `end`, o loop principal para no `pace` e `finished` é sinalizado,
+    então a quantidade de ciclos reproduzidos não depende da máquina.
+    """
+
+    def __init__(self, start: float, speed: float = None, end: float = None, cycles=None):
+        self.start = start
+        self.speed = speed
+        self.end = end
+        self.cycles = cycles or []
+        self._cycle = 0
+        self.finished = asyncio.Event()
+        self._virtual = start
+        self._wall_start = time.monotonic()
+        self._sleepers = []  # heap (wake_at, seq, future)
+        self._seq = 0
+
+    def timestamp(self) -> float:
+        if self.speed:
+            return self.start + (time.monotonic() - self._wall_start) * self.speed
+        return self._virtual
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.timestamp())
+
+    async def sleep(self, seconds: float):
+        if self.speed:
+            await asyncio.sleep(seconds / self.speed)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._sleepers, (self._virtual + seconds, self._seq, future))
+        await future
+
+    def _advance(self, to: float):
+        self._virtual = max(self._virtual, to)
+        while self._sleepers and self._sleepers[0][0] <= self._virtual:
+            _, _, future = heapq.heappop(self._sleepers)
+            if not future.done():
+                future.set_result(None)
+
+    def begin_cycle(self):
+        """Início de um ciclo: em velocidade máxima, vai para o início do ciclo gravado."""
+        if self.speed or self._cycle >= len(self.cycles):
+            return
+        self._advance(self.cycles[self._cycle])
+        self._cycle += 1
+
+    async def pace(self, seconds: float):
+        if self.speed:
+            await asyncio.sleep(seconds / self.speed)
+        else:
+            self._advance(self._virtual + seconds)
+            # Deixa os loops acordados rodarem antes do próximo ciclo
+            await asyncio.sleep(0)
+
+        if self.end is not None and self.timestamp() > self.end:
+            self.finished.set()
+            await asyncio.get_running_loop().create_future()  # Até ser cancelado
+
+
+class ReplayMT5:
+    """Substituto do módulo MetaTrader5 servido a partir de uma gravação."""
+
+    def __init__(self, recording: Recording):
+        self._recording = recording
+        self._bars = {}  # (symbol, timeframe) -> [eventos já mesclados, barras]
+        for name, value in recording.constants.items():
+            setattr(self, name, value)
+
+    def _t(self) -> float:
+        return clock.get_clock().timestamp()
+
+    def initialize(self, *args, **kwargs):
+        return True
+
+    def shutdown(self):
+        pass
+
+    def last_error(self):
+        return (1, "Success")
+
+    def symbol_select(self, symbol, enable=True):
+        return True
+
+    def _latest_call(self, *args):
+        key = json.dumps(list(args))
+        data = Recording.latest(self._recording.calls, key, self._t())
+        return _decode(data)
+
+    def symbol_info(self, symbol):
+        return self._latest_call("symbol_info", symbol)
+
+    def symbol_info_tick(self, symbol):
+        return self._latest_call("symbol_info_tick", symbol)
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        """
+        Barras gravadas do símbolo/timeframe até agora, mescladas por horário
+        de abertura e fatiadas como no terminal (posição 0 = barra mais nova).
+
+        O cache de barras do MT5Client pede quantidades diferentes conforme
+        o estado dele, então a busca não depende de `count` gravado.
+        """
+        recorded = self._recording.rates.get((symbol, timeframe))
+        if recorded is None:
+            return None
+        times, batches = recorded
+        state = self._bars.setdefault((symbol, timeframe), [0, None])
+        visible = bisect.bisect_right(times, self._t())
+        while state[0] < visible:
+            batch = batches[state[0]]
+            if state[1] is None:
+                state[1] = batch
+            elif len(batch):
+                older = state[1][state[1]['time'] < batch['time'][0]]
+                state[1] = np.concatenate([older.astype(batch.dtype), batch])
+            state[0] += 1
+        bars = state[1]
+        if bars is None:
+            return None
+        end = len(bars) - start_pos
+        return bars[max(0, end - count):max(0, end)]
+
+    def _visible_ticks(self, symbol):
+        ticks, available = self._recording.ticks.get(symbol, (None, None))
+        if ticks is None:
+            return None
+        return ticks[:int(np.searchsorted(available, self._t(), side='right'))]
+
+    def copy_ticks_from(self, symbol, date_from, count, flags):
+        ticks = self._visible_ticks(symbol)
+        if ticks is None:
+            return None
+        start = int(np.searchsorted(ticks['time_msc'], int(_to_epoch(date_from) * 1000), side='left'))
+        return ticks[start:start + count]
+
+    def copy_ticks_range(self, symbol, date_from, date_to, flags):
+        ticks = self._visible_ticks(symbol)
+        if ticks is None:
+            return None
+        times = ticks['time_msc']
+        lo = int(np.searchsorted(times, int(_to_epoch(date_from) * 1000), side='left'))
+        hi = int(np.searchsorted(times, int(_to_epoch(date_to) * 1000), side='right'))
+        return ticks[lo:hi]
+
+
+class _ReplayResponse:
+    def __init__(self, status: int, body: str):
+        self.status = status
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return self._body
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+
+class ReplaySession:
+    """Substituto do aiohttp.ClientSession: devolve a última resposta gravada da URL."""
+
+    def __init__(self, recording: Recording, **kwargs):
+        self._recording = recording
+        self.requests = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        data = Recording.latest(self._recording.http, url, clock.get_clock().timestamp())
+        if data is None:
+            return _ReplayResponse(404, "")
+        return _ReplayResponse(data["status"], data["body"])
+
+
+class ReplayFlowMonitor(FlowMonitor):
+    """FlowMonitor que entrega os JSON do SpyFlow gravados, sem ler o disco."""
+
+    def __init__(self, recording: Recording):
+        self._times, self._flows = recording.flows
+        self._pos = -1
+        self.last_mtime = {}
+        self.current_flows = {}
+
+    def check_update(self):
+        pos = bisect.bisect_right(self._times, clock.get_clock().timestamp()) - 1
+        if pos <= self._pos:
+            return None
+        self._pos = pos
+        self.current_flows = dict(self._flows[pos])
+        return self.current_flows
+
+
+class MemoryPublisher:
+    """
+    Substituto local do RedisClient: guarda o último valor por chave e
+    mede a vazão de `market_data` (seções + manifest).
+    """
+
+    def __init__(self, output_path: str = None):
+        self.store = {}
+        self.publish_count = {}
+        self.bytes_published = 0
+        self.cycle_wall_times = []
+        self.codec = Codec()
+        self.trackers = {}
+        self.latest = {}
+        self._output = open(output_path, "w", encoding="utf-8") if output_path else None
+
+    def _set(self, key: str, encoded: bytes):
+        self.store[key] = encoded
+        self.publish_count[key] = self.publish_count.get(key, 0) + 1
+        self.bytes_published += len(encoded)
+
+    def publish(self, key: str, data: dict):
+        self._set(key, self.codec.encode(data))
+
+    def publish_sections(self, prefix: str, sections: dict, meta: dict = None):
+        tracker = self.trackers.setdefault(prefix, SectionTracker(prefix, self.codec))
+        changed, manifest = tracker.diff(sections, meta)
+        for name, encoded in changed.items():
+            self._set(section_key(prefix, name), encoded)
+        self._set(section_key(prefix, MANIFEST), manifest)
+        self.cycle_wall_times.append(time.perf_counter())
+        latest = self.latest.setdefault(prefix, {})
+        latest.update(sections)
+        if self._output:
+            # Payload completo por ciclo, no formato do antigo market_data
+            self._output.write(json.dumps({**latest, **(meta or {})}) + "\n")
+
+    async def aclose(self):
+        pass  # Nada pendente: tudo é gravado na hora
+
+    def close(self):
+        if self._output:
+            self._output.close()
+
+    def stats(self) -> dict:
+        walls = np.array(self.cycle_wall_times)
+        cycles = len(walls)
+        result = {"cycles": cycles, "bytes": self.bytes_published, "publishes": dict(self.publish_count)}
+        if cycles > 1:
+            gaps = np.diff(walls) * 1000
+            elapsed = walls[-1] - walls[0]
+            result.update({
+                "wall_seconds": round(elapsed, 3),
+                "payloads_per_sec": round((cycles - 1) / elapsed, 1) if elapsed > 0 else None,
+                "cycle_ms_median": round(float(np.median(gaps)), 3),
+                "cycle_ms_p99": round(float(np.percentile(gaps, 99)), 3),
+            })
+        return result
@@ -0,0 +1,98 @@
+"""
+Scrape Cache
+============
+Último valor bom de cada URL raspada + circuit breaker por URL.
+
+Stale-while-revalidate: o scheduler publica em macro_cache / tv_cache
+sempre o valor guardado aqui. Quando o Investing bloqueia ou dá timeout, o
+último valor bom volta a ser servido, com a hora da coleta, a fonte e a
+marca `stale` publicadas na seção `freshness` do market_data.
+
+Circuit breaker: depois de `threshold` falhas seguidas a URL "abre" e não
+é tentada até o fim do cool-off, que dobra a cada nova abertura (até
+`cooloff_max`). Passado o cool-off, um único request de teste (half-open)
+fecha o breaker se der certo ou o reabre com o cool-off dobrado.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+from .config import BridgeConfig
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = None, cooloff: float = None, cooloff_max: float = None):
+        self.threshold = threshold or BridgeConfig.SCRAPE_BREAKER_THRESHOLD
+        self.cooloff_min = cooloff or BridgeConfig.SCRAPE_BREAKER_COOLOFF
+        self.cooloff_max = cooloff_max or BridgeConfig.SCRAPE_BREAKER_COOLOFF_MAX
+        self.cooloff = self.cooloff_min
+        self.failures = 0       # Falhas seguidas
+        self.opened = 0         # Aberturas desde a última vez fechado
+        self.retry_at = None    # Fim do cool-off (breaker aberto)
+
+    def state(self, now: float) -> str:
+        if self.retry_at is None:
+            return CLOSED
+        return OPEN if now < self.retry_at else HALF_OPEN
+
+    def record_success(self):
+        self.failures = 0
+        self.opened = 0
+        self.cooloff = self.cooloff_min
+        self.retry_at = None
+
+    def record_failure(self, now: float) -> bool:
+        """Conta uma falha; True se o breaker abriu (ou reabriu) agora."""
+        self.failures += 1
+        if self.retry_at is not None or self.failures >= self.threshold:
+            # Half-open falhou ou limite atingido: abre com cool-off dobrado a cada vez
+            self.cooloff = min(self.cooloff_min * 2 ** self.opened, self.cooloff_max)
+            self.opened += 1
+            self.retry_at = now + self.cooloff
+            return True
+        return False
+
+
+class CacheEntry:
+    __slots__ = ("value", "fetched_at", "source", "error", "attempted_at")
+
+    def __init__(self, source: str):
+        self.value = None
+        self.fetched_at = None    # ISO da última coleta com sucesso (relógio do bridge)
+        self.source = source
+        self.error = None         # Motivo da última falha (None = última tentativa ok)
+        self.attempted_at = None
+
+
+class ScrapeCache:
+    """Último valor bom por URL (ver docstring do módulo)."""
+
+    def __init__(self):
+        self.entries = {}   # url -> CacheEntry
+
+    def entry(self, url: str) -> CacheEntry:
+        entry = self.entries.get(url)
+        if entry is None:
+            entry = self.entries[url] = CacheEntry(url)
+        return entry
+
+    def store(self, url: str, value: dict, when: str):
+        entry = self.entry(url)
+        entry.value = value
+        entry.fetched_at = when
+        entry.attempted_at = when
+        entry.error = None
+
+    def fail(self, url: str, error: str, when: str):
+        entry = self.entry(url)
+        entry.error = error
+        entry.attempted_at = when
+
+    def get(self, url: str):
+        """Último valor bom (possivelmente velho) ou None."""
+        entry = self.entries.get(url)
+        return entry.value if entry else None
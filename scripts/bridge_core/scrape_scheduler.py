@@ -0,0 +1,328 @@
+"""
+Scrape Scheduler
+================
+Agenda única dos scrapers do Investing.com / AwesomeAPI.
+
+Cada instrumento tem uma fonte canônica (uma URL) e uma lista de destinos
+(`("macro", "OURO")`, `("tv", "GOLD")`): a mesma página alimenta o
+`macro_cache` e o `tv_cache` com um só request. URLs do Investing são
+normalizadas para br.investing.com, então www/br da mesma página viram o
+mesmo instrumento (e o preço sai sempre no formato pt-BR que o parser lê).
+
+Despacho:
+- heap por vencimento (`next_due`); os vencidos saem por prioridade
+  (fallback do MT5 > global > macro)
+- token bucket por host: no máximo `rate` req/s com rajada de `burst`
+- um instrumento nunca tem dois requests em voo; o próximo é agendado
+  quando o atual termina (intervalo + jitter)
+
+Intervalo adaptativo: cada instrumento conhece as sessões em que negocia
+(market_hours.py). Com o mercado aberto o intervalo base encolhe
+(`SCRAPE_OPEN_FACTOR`, `SCRAPE_EXTENDED_FACTOR` no pré/pós) e é ajustado
+pelo quanto o preço andou entre os dois últimos scrapes (normalizado por
+raiz do tempo): mais rápido quando se move, mais lento quando parado.
+Com todas as sessões fechadas o instrumento dorme até a próxima abertura.
+
+Falhas: o último valor bom fica no ScrapeCache (servido velho, com idade
+em `freshness()`) e, depois de falhas seguidas, o circuit breaker da URL
+adia o próximo request até o fim do cool-off (scrape_cache.py).
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import math
+import random
+from urllib.parse import urlsplit
+
+from . import clock
+from . import market_hours
+from .config import BridgeConfig
+from .scrape_cache import ScrapeCache, CircuitBreaker, OPEN as BREAKER_OPEN
+
+logger = logging.getLogger("Bridge.Scheduler")
+
+# Prioridades (menor sai primeiro)
+PRIORITY_FALLBACK = 0   # Ativo que sumiu do MT5
+PRIORITY_GLOBAL = 1
+PRIORITY_MACRO = 2
+
+INVESTING_HOST = "br.investing.com"
+
+
+def canonical_url(url: str) -> str:
+    """Mesma página do Investing em qualquer subdomínio -> br.investing.com."""
+    parts = urlsplit(url)
+    if parts.hostname and parts.hostname.endswith("investing.com"):
+        return f"https://{INVESTING_HOST}{parts.path.rstrip('/')}"
+    return url
+
+
+class TokenBucket:
+    """Limite de taxa por host: `rate` tokens/s, acumulando até `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = None
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: float) -> bool:
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now: float) -> float:
+        """Segundos até haver um token."""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class Instrument:
+    """Uma URL agendada e os caches que ela alimenta."""
+
+    def __init__(self, url: str, interval: float, priority: int, jitter=(10, 30), condition=None):
+        self.url = url
+        self.host = urlsplit(url).hostname
+        self.interval = interval
+        self.priority = priority
+        self.jitter = jitter
+        # Só busca quando condition() é verdadeira (ex: ativo ausente no MT5)
+        self.condition = condition
+        self.targets = []       # [(cache, nome)]
+        self.sessions = set()   # market_hours.SESSIONS (vazio = sempre aberto)
+        self.next_due = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.breaker = CircuitBreaker()
+        # Volatilidade observada: último preço e média móvel do movimento
+        self.last_price = None
+        self.last_time = None
+        self.move = None        # EWMA de |Δ%| / sqrt(minutos)
+
+    def observe(self, price: float, now: float):
+        if price and self.last_price and self.last_time is not None and now > self.last_time:
+            minutes = (now - self.last_time) / 60
+            move = abs(price - self.last_price) / self.last_price * 100 / math.sqrt(minutes)
+            self.move = move if self.move is None else 0.3 * move + 0.7 * self.move
+        if price:
+            self.last_price = price
+            self.last_time = now
+
+    def next_interval(self, now: float) -> float:
+        """Segundos até o próximo scrape (sem jitter)."""
+        status = market_hours.status(self.sessions, now)
+        if status == market_hours.CLOSED and self.last_price is not None:
+            # Dormente: já temos o último fechamento, volta na abertura
+            return max(market_hours.seconds_until_open(self.sessions, now), self.interval)
+        if status == market_hours.CLOSED:
+            return self.interval  # Ainda sem nenhum preço: insiste no intervalo base
+
+        factor = BridgeConfig.SCRAPE_OPEN_FACTOR if status == market_hours.OPEN else BridgeConfig.SCRAPE_EXTENDED_FACTOR
+        if self.move is not None:
+            volatility = BridgeConfig.SCRAPE_REF_MOVE_PCT / max(self.move, 1e-6)
+            factor *= min(max(volatility, BridgeConfig.SCRAPE_VOL_FACTOR_MIN), BridgeConfig.SCRAPE_VOL_FACTOR_MAX)
+        return max(self.interval * factor, BridgeConfig.SCRAPE_MIN_INTERVAL)
+
+    @property
+    def name(self) -> str:
+        return self.targets[0][1]
+
+
+class ScrapeScheduler:
+    """
+    Registro de instrumentos + despachante.
+
+    Args:
+        scrape: async (nome, url) -> dict | None (InvestingClient.scrape_ticker)
+        on_result: Callable(instrumento, dados) que distribui o resultado nos caches
+    """
+
+    def __init__(self, scrape, on_result, rate: float = None, burst: int = None):
+        self.scrape = scrape
+        self.on_result = on_result
+        self.rate = rate or BridgeConfig.SCRAPE_RATE_PER_HOST
+        self.burst = burst or BridgeConfig.SCRAPE_BURST
+        self.instruments = {}   # url canônica -> Instrument
+        self.cache = ScrapeCache()
+        self.buckets = {}       # host -> TokenBucket
+        self.due = []           # heap (next_due, seq, url)
+        self.ready = []         # heap (prioridade, next_due, seq, url)
+        self.seq = itertools.count()
+        self.tasks = set()
+        self.counters = {"requests": 0, "ok": 0, "failed": 0, "skipped": 0, "deduplicated": 0, "breaker_open": 0}
+
+    def register(self, cache: str, name: str, url: str, interval: float,
+                 priority: int = PRIORITY_MACRO, condition=None, session: str = None):
+        """
+        Registra `name` no cache `cache`. Se a URL canônica já estiver
+        registrada, só acrescenta o destino e fica com o menor intervalo, a
+        maior prioridade e a união das sessões.
+
+        Args:
+            session: Sessão de market_hours.SESSIONS (None = sempre aberto)
+        """
+        url = canonical_url(url)
+        instrument = self.instruments.get(url)
+        if instrument is None:
+            instrument = self.instruments[url] = Instrument(url, interval, priority, condition=condition)
+            self.buckets.setdefault(instrument.host, TokenBucket(self.rate, self.burst))
+            heapq.heappush(self.due, (instrument.next_due, next(self.seq), url))
+        else:
+            self.counters["deduplicated"] += 1
+            instrument.interval = min(instrument.interval, interval)
+            instrument.priority = min(instrument.priority, priority)
+            if condition is None:
+                instrument.condition = None  # Algum destino precisa dele sempre
+        instrument.targets.append((cache, name))
+        if session is not None:
+            if session not in market_hours.SESSIONS:
+                raise ValueError(f"Sessão desconhecida para {name}: {session}")
+            instrument.sessions.add(session)
+        return instrument
+
+    # ------------------------------------------------------------------ despacho
+
+    def _reschedule(self, instrument: Instrument, now: float):
+        instrument.next_due = now + instrument.next_interval(now) + random.randint(*instrument.jitter)
+        if instrument.breaker.retry_at is not None:
+            # Breaker aberto: nada antes do fim do cool-off (o request seguinte é o teste half-open)
+            instrument.next_due = max(instrument.next_due, instrument.breaker.retry_at)
+        heapq.heappush(self.due, (instrument.next_due, next(self.seq), instrument.url))
+
+    async def _run(self, instrument: Instrument):
+        error = None
+        try:
+            data = await self.scrape(instrument.name, instrument.url)
+        except Exception as e:
+            logger.error(f"❌ Scrape {instrument.name}: {e}")
+            data, error = None, str(e)
+        now_dt = clock.now()
+        now = now_dt.timestamp()
+        if isinstance(data, dict):
+            self.counters["ok"] += 1
+            if instrument.breaker.retry_at is not None:
+                logger.info(f"🔌 {instrument.name}: circuit breaker fechado")
+            instrument.breaker.record_success()
+            instrument.observe(data.get("valor"), now)
+            self.cache.store(instrument.url, data, now_dt.isoformat())
+        else:
+            self.counters["failed"] += 1
+            instrument.failures += 1
+            self.cache.fail(instrument.url, error or "sem cotação", now_dt.isoformat())
+            if instrument.breaker.record_failure(now):
+                self.counters["breaker_open"] += 1
+                logger.warning(
+                    f"🔌 {instrument.name}: circuit breaker aberto após {instrument.breaker.failures} falhas, "
+                    f"nova tentativa em {instrument.breaker.cooloff:.0f}s"
+                )
+        # Os destinos sempre recebem o que está no ScrapeCache: o valor novo ou,
+        # na falha, o último bom (stale-while-revalidate)
+        value = self.cache.get(instrument.url)
+        if value is not None:
+            self.on_result(instrument, value)
+        self._reschedule(instrument, now)
+
+    def _dispatch(self, now: float) -> float:
+        """Dispara o que estiver vencido e liberado; devolve quanto dormir."""
+        while self.due and self.due[0][0] <= now:
+            due, seq, url = heapq.heappop(self.due)
+            instrument = self.instruments[url]
+            if instrument.condition is not None and not instrument.condition():
+                self.counters["skipped"] += 1
+                self._reschedule(instrument, now)
+                continue
+            heapq.heappush(self.ready, (instrument.priority, due, seq, url))
+
+        wait = BridgeConfig.SCRAPE_TICK
+        blocked = []
+        while self.ready:
+            entry = heapq.heappop(self.ready)
+            instrument = self.instruments[entry[3]]
+            bucket = self.buckets[instrument.host]
+            if not bucket.try_take(now):
+                blocked.append(entry)
+                wait = min(wait, bucket.wait_time(now))
+                continue
+            instrument.requests += 1
+            self.counters["requests"] += 1
+            task = asyncio.create_task(self._run(instrument))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        for entry in blocked:
+            heapq.heappush(self.ready, entry)
+
+        if self.due:
+            wait = min(wait, max(0.0, self.due[0][0] - now))
+        return wait
+
+    async def run(self, running=lambda: True):
+        logger.info(
+            f"🗓️ Scheduler: {len(self.instruments)} URLs para "
+            f"{sum(len(i.targets) for i in self.instruments.values())} destinos, "
+            f"{self.rate} req/s por host (rajada {self.burst})"
+        )
+        try:
+            while running():
+                wait = self._dispatch(clock.now().timestamp())
+                await clock.sleep(max(wait, 0.05))
+        finally:
+            for task in list(self.tasks):
+                task.cancel()
+
+    def freshness(self) -> dict:
+        """
+        Idade/origem de cada valor publicado: {cache: {nome: {...}}}.
+
+        Só muda quando há coleta, falha ou troca de estado do breaker/pregão
+        (a idade em segundos é calculada por quem lê, contra o timestamp do
+        manifest).
+        """
+        now = clock.now().timestamp()
+        result = {}
+        for instrument in self.instruments.values():
+            entry = self.cache.entries.get(instrument.url)
+            if entry is None:
+                continue  # Nunca tentado (ex: fallback com o ativo presente no MT5)
+            state = instrument.breaker.state(now)
+            info = {
+                "fetched_at": entry.fetched_at,
+                "source": entry.source,
+                "stale": entry.error is not None,
+                "error": entry.error,
+                "failures": instrument.breaker.failures,
+                "breaker": state,
+                "retry_at": (
+                    datetime.datetime.fromtimestamp(instrument.breaker.retry_at).isoformat()
+                    if state == BREAKER_OPEN else None
+                ),
+                "market": market_hours.status(instrument.sessions, now)
+            }
+            for cache, name in instrument.targets:
+                result.setdefault(cache, {})[name] = info
+        return result
+
+    def stats(self) -> dict:
+        now = clock.now().timestamp()
+        return {
+            "instruments": len(self.instruments),
+            "dormant": sum(
+                1 for i in self.instruments.values()
+                if market_hours.status(i.sessions, now) == market_hours.CLOSED
+            ),
+            "in_flight": len(self.tasks),
+            "queued": len(self.ready),
+            **self.counters
+        }
@@ -0,0 +1,95 @@
+"""
+Market Data Sections
+====================
+Divide o market_data em chaves por seção (`market_data:<seção>`), cada uma
+com contador de versão, e só regrava as seções cujo conteúdo mudou.
+
+    market_data:manifest  -> {"version", "timestamp", "changed",
+                              "sections": {nome: {"version", "hash", "updated"}}}
+    market_data:mt5       -> seção serializada (ver codec.py)
+    market_data:macro     -> ...
+    market_data:stream    -> Stream limitado: uma entrada por publicação com
+                             o manifest + as seções alteradas (push para o backend)
+
+O consumidor lê só o manifest (pequeno) e busca as seções cuja versão
+mudou desde a última leitura, ou recebe tudo pelo stream com XREAD BLOCK.
+
+Uma publicação pode trazer só parte das seções (ex: o calendário logo
+após uma divulgação): o manifest continua listando todas, e as ausentes
+mantêm a versão anterior.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import hashlib
+import time
+
+from .codec import Codec
+
+MANIFEST = "manifest"
+STREAM = "stream"
+SECTION_FIELD = "section:"  # Campo da entrada do stream: section:<nome> -> seção serializada
+
+
+def section_key(prefix: str, name: str) -> str:
+    return f"{prefix}:{name}"
+
+
+class SectionTracker:
+    """
+    Versões e hashes das seções publicadas sob um prefixo.
+
+    `diff` serializa cada seção, compara o hash com o da última publicação
+    e devolve só as seções alteradas (já serializadas) + o manifest novo.
+    """
+
+    def __init__(self, prefix: str, codec: Codec = None):
+        self.prefix = prefix
+        self.codec = codec or Codec()
+        # Versões partem do relógio em ms: depois de um restart continuam
+        # maiores que as anteriores (sem ler o manifest antigo do Redis), então
+        # o consumidor nunca vê a mesma versão com outro conteúdo
+        self.base_version = int(time.time() * 1000)
+        self.version = self.base_version  # Versão do manifest (sobe quando alguma seção muda)
+        self.sections = {}    # nome -> {"version", "hash", "updated"}
+
+    def invalidate(self):
+        """Esquece os hashes (escrita descartada): a próxima publicação regrava tudo."""
+        for info in self.sections.values():
+            info["hash"] = None
+
+    def diff(self, sections: dict, meta: dict = None):
+        """
+        Args:
+            sections: nome -> dados da seção (todas ou só as que mudaram)
+            meta: Campos extras do manifest (ex.: timestamp, changed)
+
+        Returns:
+            (alteradas, manifest): dict nome -> bytes das seções que mudaram
+            e o manifest já serializado
+        """
+        meta = meta or {}
+        timestamp = meta.get("timestamp")
+        changed = {}
+
+        for name, data in sections.items():
+            encoded = self.codec.encode(data)
+            digest = hashlib.blake2b(encoded, digest_size=8).hexdigest()
+            info = self.sections.setdefault(name, {"version": self.base_version, "hash": None, "updated": None})
+            if info["hash"] == digest:
+                continue
+            info["version"] += 1
+            info["hash"] = digest
+            info["updated"] = timestamp
+            changed[name] = encoded
+
+        if changed:
+            self.version += 1
+
+        manifest = {
+            **meta,
+            "version": self.version,
+            "sections": dict(self.sections)
+        }
+        return changed, self.codec.encode(manifest)
@@ -0,0 +1,228 @@
+"""
+Tick Archive
+============
+Armazena os ticks recebidos do MT5 em disco, em colunas `.npy` de dtype
+fixo, particionadas por símbolo e dia:
+
+    <raiz>/<símbolo>/<AAAA-MM-DD>/{time_msc,bid,ask,last,volume,flags}.npy
+
+Só acrescenta (append-only). Leitores abrem um dia com `np.load(mmap_mode='r')`
+e fatiam um intervalo de tempo sem copiar os dados, servindo de fonte local
+para VWAP, fluxo e replay sem consultar o terminal.
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import os
+import struct
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .config import BridgeConfig
+
+logger = logging.getLogger("Bridge.TickArchive")
+
+MS_PER_DAY = 86_400_000
+MAX_MSC = 253_402_300_799_999  # 9999-12-31 23:59:59.999
+
+
+class TickArchive:
+    """
+    Arquivo colunar de ticks, um diretório por símbolo e dia.
+
+    O cabeçalho `.npy` tem tamanho fixo e é reescrito a cada append com o
+    novo `shape`. A coluna `time_msc` é gravada por último e funciona como
+    marca de commit: bytes além do seu `shape` (append interrompido) são
+    sobrescritos no próximo append.
+    """
+
+    COLUMNS = {
+        "time_msc": np.dtype("<i8"),
+        "bid": np.dtype("<f8"),
+        "ask": np.dtype("<f8"),
+        "last": np.dtype("<f8"),
+        "volume": np.dtype("<u8"),
+        "flags": np.dtype("<u4"),
+    }
+
+    # Cabeçalho .npy v1.0 fixo (múltiplo de 64, cabe qualquer shape 1-D)
+    HEADER_LEN = 128
+
+    def __init__(self, root: str = None):
+        self.root = root or BridgeConfig.TICK_ARCHIVE_DIR
+        # (symbol, day) -> ticks confirmados no disco (já reconciliado neste processo)
+        self._counts = {}
+        # (symbol, day) -> (last_time_msc, seen_at_last) do que já estava no disco
+        # ao abrir o dia; vale até um lote passar dele (recarga após reinício)
+        self._cursors = {}
+
+    # --- Escrita ---
+
+    def _day_dir(self, symbol: str, day: str) -> str:
+        return os.path.join(self.root, symbol, day)
+
+    def _header(self, dtype: np.dtype, n: int) -> bytes:
+        meta = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (dtype.str, n)
+        body = meta.ljust(self.HEADER_LEN - 11) + "\n"
+        return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(body)) + body.encode("latin1")
+
+    def _load_tail(self, symbol: str, day: str):
+        """
+        Quantidade de ticks já confirmados no disco para o dia.
+
+        Returns:
+            Tupla (n, last_time_msc, seen_at_last) do que está no disco
+        """
+        times = self.load_day(symbol, day).get("time_msc")
+        if times is None or len(times) == 0:
+            return 0, 0, 0
+        last = int(times[-1])
+        seen = len(times) - int(np.searchsorted(times, last, side='left'))
+        return len(times), last, seen
+
+    def _append_column(self, path: str, dtype: np.dtype, n_before: int, values: np.ndarray):
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        with open(path, mode) as f:
+            f.seek(self.HEADER_LEN + n_before * dtype.itemsize)
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            f.truncate()
+            f.seek(0)
+            f.write(self._header(dtype, n_before + len(values)))
+
+    def _skip_archived(self, key, ticks: np.ndarray) -> np.ndarray:
+        """
+        Descarta os ticks que já estavam no disco quando o dia foi aberto.
+
+        Depois de um reinício o TickFlowCalculator recarrega a sessão desde a
+        abertura em vários lotes de `TICKS_BATCH`; todos eles passam por aqui
+        até o primeiro tick posterior ao cursor do disco. Os ticks com o
+        mesmo `time_msc` do cursor podem vir divididos entre lotes, então o
+        `seen_at_last` é descontado aos poucos.
+        """
+        last, seen = self._cursors[key]
+        times = ticks['time_msc']
+        lo = int(np.searchsorted(times, last, side='left'))
+        hi = int(np.searchsorted(times, last, side='right'))
+        skip = min(hi - lo, seen)
+        fresh = ticks[lo + skip:]
+        if len(fresh) > 0:
+            del self._cursors[key]  # Passamos do disco: os próximos lotes são só ticks novos
+        else:
+            self._cursors[key] = (last, seen - skip)
+        return fresh
+
+    def _append_day(self, symbol: str, day: str, ticks: np.ndarray):
+        key = (symbol, day)
+        if key not in self._counts:
+            # Primeiro lote do dia neste processo (ex: reinício do bridge, que
+            # recarrega a sessão desde a abertura): lê o cursor do que já está no disco
+            n, last, seen = self._load_tail(symbol, day)
+            self._counts[key] = n
+            if n:
+                self._cursors[key] = (last, seen)
+        n = self._counts[key]
+        if key in self._cursors:
+            ticks = self._skip_archived(key, ticks)
+        if len(ticks) == 0:
+            return
+
+        day_dir = self._day_dir(symbol, day)
+        os.makedirs(day_dir, exist_ok=True)
+
+        # time_msc por último: é ele que "confirma" o append
+        for name in [c for c in self.COLUMNS if c != "time_msc"] + ["time_msc"]:
+            path = os.path.join(day_dir, f"{name}.npy")
+            self._append_column(path, self.COLUMNS[name], n, ticks[name])
+
+        self._counts[key] = n + len(ticks)
+
+    def append(self, symbol: str, ticks: np.ndarray):
+        """
+        Acrescenta um lote de ticks (ordenado por `time_msc`) ao arquivo.
+
+        Os lotes devem ser só ticks novos em relação ao lote anterior (como
+        os entregues pelo cursor do TickFlowCalculator); o que já estava no
+        disco antes deste processo é descartado, mesmo que a recarga venha
+        em vários lotes.
+
+        Args:
+            symbol: Símbolo do ativo (ex: "WIN$N")
+            ticks: Array estruturado no formato de `mt5.copy_ticks_*`
+        """
+        if ticks is None or len(ticks) == 0:
+            return
+        try:
+            day_index = ticks['time_msc'] // MS_PER_DAY
+            bounds = np.flatnonzero(np.diff(day_index)) + 1
+            for chunk in np.split(ticks, bounds):
+                self._append_day(symbol, self._day_name(int(chunk['time_msc'][0])), chunk)
+        except Exception as e:
+            logger.error(f"❌ Erro gravando ticks de {symbol} no arquivo: {e}")
+
+    # --- Leitura ---
+
+    @staticmethod
+    def _day_name(time_msc: int) -> str:
+        # time_msc do MT5 já está no horário do servidor
+        return datetime.fromtimestamp(time_msc / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+    def days(self, symbol: str) -> list:
+        """Dias disponíveis para o símbolo (AAAA-MM-DD, em ordem)."""
+        path = os.path.join(self.root, symbol)
+        if not os.path.isdir(path):
+            return []
+        return sorted(d for d in os.listdir(path) if os.path.exists(os.path.join(path, d, "time_msc.npy")))
+
+    def load_day(self, symbol: str, day: str) -> dict:
+        """
+        Abre as colunas de um dia como memmaps somente leitura.
+
+        Todas as colunas são cortadas no tamanho confirmado de `time_msc`.
+
+        Returns:
+            Dict {coluna: np.memmap}, vazio se o dia não existir
+        """
+        day_dir = self._day_dir(symbol, day)
+        times_path = os.path.join(day_dir, "time_msc.npy")
+        if not os.path.exists(times_path):
+            return {}
+
+        times = np.load(times_path, mmap_mode="r")
+        n = len(times)
+        columns = {"time_msc": times}
+        for name in self.COLUMNS:
+            if name != "time_msc":
+                columns[name] = np.load(os.path.join(day_dir, f"{name}.npy"), mmap_mode="r")[:n]
+        return columns
+
+    def read_range(self, symbol: str, from_msc: int, to_msc: int) -> dict:
+        """
+        Ticks com `from_msc <= time_msc < to_msc`.
+
+        Dentro de um único dia devolve fatias dos memmaps (zero cópia);
+        intervalos que cruzam dias são concatenados.
+
+        Returns:
+            Dict {coluna: array}
+        """
+        parts = []
+        first_day = self._day_name(min(max(from_msc, 0), MAX_MSC))
+        last_day = self._day_name(min(max(from_msc, to_msc - 1, 0), MAX_MSC))
+        for day in self.days(symbol):
+            if day < first_day or day > last_day:
+                continue
+            columns = self.load_day(symbol, day)
+            times = columns["time_msc"]
+            lo = int(np.searchsorted(times, from_msc, side='left'))
+            hi = int(np.searchsorted(times, to_msc, side='left'))
+            if hi > lo:
+                parts.append({name: col[lo:hi] for name, col in columns.items()})
+
+        if not parts:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([p[name] for p in parts]) for name in self.COLUMNS}
@@ -9,30 +9,155 @@ Date: 2025-12-06
 """
 
 import MetaTrader5 as mt5
-import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 
+from .config import BridgeConfig
+from . import clock
+from .flow_kernels import FlowRingBuffer, aggression_masks, size_bucket_flow, ticks_after_cursor
+from .tick_archive import TickArchive
+from .vwap_engine import VwapEngine
+
 logger = logging.getLogger("Bridge.TickFlow")
 
 
+EMPTY_FLOW = {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+
+
+class _SymbolFlowState:
+    """
+    Estado incremental de um símbolo na sessão corrente.
+    
+    O cursor (`last_time_msc` + `seen_at_last`) garante que cada tick seja
+    processado uma única vez; os acumuladores dão o fluxo intraday e o ring
+    buffer dá o fluxo de qualquer horizonte dos últimos N minutos, inclusive
+    por faixa de tamanho de ordem.
+    """
+    
+    def __init__(self, session_start: datetime, ring_capacity: int, size_edges: list, ring_initial: int = None):
+        self.session_start = session_start
+        self.size_edges = size_edges
+        self.last_time_msc = 0
+        self.seen_at_last = 0
+        self.buy = 0
+        self.sell = 0
+        self.total_ticks = 0
+        self.buckets = np.zeros(len(size_edges) + 1)
+        self.ring = FlowRingBuffer(ring_capacity, buckets=len(size_edges) + 1, initial=ring_initial)
+    
+    def ingest(self, ticks: np.ndarray):
+        buy_mask, sell_mask = aggression_masks(ticks['flags'], mt5.TICK_FLAG_BUY, mt5.TICK_FLAG_SELL)
+        volume = ticks['volume'].astype(np.int64, copy=False)
+        buy_volume = np.where(buy_mask, volume, 0)
+        sell_volume = np.where(sell_mask, volume, 0)
+        
+        self.buy += int(buy_volume.sum())
+        self.sell += int(sell_volume.sum())
+        self.total_ticks += len(ticks)
+        
+        totals, bucket, signed = size_bucket_flow(ticks, self.size_edges, mt5.TICK_FLAG_BUY, mt5.TICK_FLAG_SELL)
+        self.buckets += totals
+        
+        self.ring.append(ticks['time_msc'], buy_volume, sell_volume, bucket, signed)
+    
+    def intraday(self) -> dict:
+        return {
+            "buy": self.buy,
+            "sell": self.sell,
+            "net": self.buy - self.sell,
+            "total_ticks": self.total_ticks
+        }
+
+
 class TickFlowCalculator:
     """
     Calcula fluxo de agressão (compra vs venda) usando ticks do MT5.
     
     Substitui o "Trade Radar" do Profit Pro analisando cada negócio
     e identificando se foi agressão compradora ou vendedora.
+    
+    Mantém um cursor por símbolo: cada chamada baixa apenas os ticks novos
+    (`copy_ticks_from`), então o custo por atualização cresce com o número
+    de negócios novos e não com o tempo desde a abertura. Os horizontes
+    (1m, 5m, 60m...) saem de um único ring buffer por símbolo.
     """
     
-    def __init__(self):
-        self.cache = {}  # Cache de fluxo acumulado
-        self.last_update = {}
+    # Máximo de ticks por chamada ao terminal (repete enquanto vier cheio)
+    TICKS_BATCH = 500_000
+    
+    # Ticks retidos por símbolo para os horizontes: o ring começa pequeno e
+    # dobra conforme a sessão enche (até ~48 MB por símbolo no padrão)
+    RING_CAPACITY = BridgeConfig.FLOW_RING_CAPACITY
+    RING_INITIAL = BridgeConfig.FLOW_RING_INITIAL
+    
+    def __init__(self, size_edges: list = None, size_groups: list = None, archive: TickArchive = None, vwap: VwapEngine = None):
+        self.size_edges = size_edges or BridgeConfig.FLOW_SIZE_EDGES
+        self.size_groups = size_groups or BridgeConfig.FLOW_SIZE_GROUPS
+        self.archive = archive  # Opcional: grava os ticks novos em disco
+        self.vwap = vwap or VwapEngine()  # VWAPs alimentados pelos mesmos ticks
+        self.cache = {}  # symbol -> _SymbolFlowState (sessão corrente)
+        self.last_update = {}  # symbol -> datetime da última sincronização
+    
+    def _session_start(self, now: datetime) -> datetime:
+        # Início do dia (09:00)
+        return datetime(now.year, now.month, now.day, 9, 0, 0)
+    
+    def _sync(self, symbol: str):
+        """
+        Traz o estado do símbolo até o último tick disponível no terminal.
+        
+        Returns:
+            _SymbolFlowState atualizado, ou None antes da abertura
+        """
+        now = clock.now()
+        session_start = self._session_start(now)
+        
+        # Se ainda não abriu o mercado, não há estado
+        if now < session_start:
+            return None
+        
+        state = self.cache.get(symbol)
+        if state is None or state.session_start != session_start:
+            # Nova sessão: zera acumuladores e ring buffer
+            state = _SymbolFlowState(session_start, self.RING_CAPACITY, self.size_edges, self.RING_INITIAL)
+            self.cache[symbol] = state
+            self.vwap.reset(symbol, session_start)
+        
+        while True:
+            if state.last_time_msc == 0:
+                # Primeira carga da sessão (desde a abertura)
+                ticks = mt5.copy_ticks_from(symbol, session_start, self.TICKS_BATCH, mt5.COPY_TICKS_TRADE)
+            else:
+                # Incremental: a partir do segundo do último tick visto
+                ticks = mt5.copy_ticks_from(symbol, state.last_time_msc // 1000, self.TICKS_BATCH, mt5.COPY_TICKS_TRADE)
+            
+            if ticks is None or len(ticks) == 0:
+                break
+            
+            fresh, state.last_time_msc, state.seen_at_last = ticks_after_cursor(
+                ticks, state.last_time_msc, state.seen_at_last
+            )
+            if len(fresh) > 0:
+                state.ingest(fresh)
+                self.vwap.update_ticks(symbol, fresh)
+                if self.archive:
+                    self.archive.append(symbol, fresh)
+            
+            # Lote incompleto = alcançamos o fim do histórico disponível
+            if len(ticks) < self.TICKS_BATCH or len(fresh) == 0:
+                break
+        
+        self.last_update[symbol] = now
+        return state
     
     def calculate_aggression_flow(self, symbol: str, period_minutes: int = 60) -> dict:
         """
         Calcula o saldo de agressão (comprador - vendedor) para um símbolo.
         
+        A janela é ancorada no último negócio recebido e limitada aos ticks
+        da sessão corrente.
+        
         Args:
             symbol: Símbolo do ativo (ex: "WIN$N")
             period_minutes: Período em minutos para análise
@@ -41,50 +166,50 @@ class TickFlowCalculator:
             Dict com volume de compra, venda e saldo
         """
         try:
-            # Pega ticks desde o início do período
-            now = datetime.now()
-            from_time = now - timedelta(minutes=period_minutes)
-            
-            # Copia ticks de negócios (COPY_TICKS_TRADE)
-            ticks = mt5.copy_ticks_range(symbol, from_time, now, mt5.COPY_TICKS_TRADE)
-            
-            if ticks is None or len(ticks) == 0:
+            state = self._sync(symbol)
+            if state is None or state.total_ticks == 0:
                 logger.warning(f"⚠️ Sem ticks para {symbol}")
-                return {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+                return dict(EMPTY_FLOW)
             
-            df = pd.DataFrame(ticks)
+            flow = state.ring.flow_since(state.last_time_msc - period_minutes * 60_000)
             
-            # Análise de flags de agressão
-            # TICK_FLAG_BUY (0x2) = Comprador agrediu (bateu na oferta de venda)
-            # TICK_FLAG_SELL (0x4) = Vendedor agrediu (bateu na oferta de compra)
+            logger.debug(f"📊 {symbol} Flow: Buy={flow['buy']}, Sell={flow['sell']}, Net={flow['net']}")
             
-            buy_volume = 0
-            sell_volume = 0
+            return flow
             
-            for _, tick in df.iterrows():
-                volume = tick['volume']
-                flags = tick['flags']
-                
-                # Verifica flags bitwise
-                if flags & mt5.TICK_FLAG_BUY:
-                    buy_volume += volume
-                elif flags & mt5.TICK_FLAG_SELL:
-                    sell_volume += volume
-            
-            net_flow = buy_volume - sell_volume
+        except Exception as e:
+            logger.error(f"❌ Erro calculando fluxo para {symbol}: {e}")
+            return dict(EMPTY_FLOW)
+    
+    def calculate_flow_horizons(self, symbol: str, horizons=(1, 5, 15, 60)) -> dict:
+        """
+        Calcula o fluxo de vários horizontes com uma única sincronização.
+        
+        Cada horizonte custa uma busca binária no ring buffer do símbolo.
+        
+        Args:
+            symbol: Símbolo do ativo (ex: "WIN$N")
+            horizons: Horizontes em minutos (ex: [1, 5, 15, 60])
             
-            logger.debug(f"📊 {symbol} Flow: Buy={buy_volume}, Sell={sell_volume}, Net={net_flow}")
+        Returns:
+            Dict {"1m": {...}, "5m": {...}, ..., "session": {...}}
+        """
+        result = {f"{h}m": dict(EMPTY_FLOW) for h in horizons}
+        result["session"] = dict(EMPTY_FLOW)
+        
+        try:
+            state = self._sync(symbol)
+            if state is None or state.total_ticks == 0:
+                return result
             
-            return {
-                "buy": int(buy_volume),
-                "sell": int(sell_volume),
-                "net": int(net_flow),
-                "total_ticks": len(df)
-            }
+            for h in horizons:
+                result[f"{h}m"] = state.ring.flow_since(state.last_time_msc - h * 60_000)
+            result["session"] = state.intraday()
+            return result
             
         except Exception as e:
-            logger.error(f"❌ Erro calculando fluxo para {symbol}: {e}")
-            return {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+            logger.error(f"❌ Erro calculando horizontes de fluxo para {symbol}: {e}")
+            return result
     
     def calculate_intraday_flow(self, symbol: str) -> dict:
         """
@@ -97,35 +222,64 @@ class TickFlowCalculator:
             Dict com fluxo do dia
         """
         try:
-            # Início do dia (09:00)
-            now = datetime.now()
-            today_start = datetime(now.year, now.month, now.day, 9, 0, 0)
+            state = self._sync(symbol)
             
             # Se ainda não abriu o mercado, retorna zero
-            if now < today_start:
-                return {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+            if state is None:
+                return dict(EMPTY_FLOW)
             
-            # Copia ticks desde a abertura
-            ticks = mt5.copy_ticks_range(symbol, today_start, now, mt5.COPY_TICKS_TRADE)
+            return state.intraday()
             
-            if ticks is None or len(ticks) == 0:
-                return {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+        except Exception as e:
+            logger.error(f"❌ Erro calculando fluxo intraday para {symbol}: {e}")
+            return dict(EMPTY_FLOW)
+    
+    def calculate_player_flow(self, symbol: str, period_minutes: int = 60) -> dict:
+        """
+        Saldo financeiro (volume × preço) por faixa de tamanho de ordem.
+        
+        Args:
+            symbol: Símbolo do ativo (ex: "WIN$N")
+            period_minutes: Horizonte em minutos, ou None para a sessão inteira
             
-            df = pd.DataFrame(ticks)
+        Returns:
+            Dict {grupo: saldo}, com os grupos de `size_groups`
+        """
+        empty = {group: 0 for group in self.size_groups}
+        try:
+            state = self._sync(symbol)
+            if state is None or state.total_ticks == 0:
+                return empty
             
-            buy_volume = df[df['flags'] & mt5.TICK_FLAG_BUY]['volume'].sum()
-            sell_volume = df[df['flags'] & mt5.TICK_FLAG_SELL]['volume'].sum()
+            if period_minutes is None:
+                totals = state.buckets
+            else:
+                totals = state.ring.buckets_since(state.last_time_msc - period_minutes * 60_000)
             
-            return {
-                "buy": int(buy_volume),
-                "sell": int(sell_volume),
-                "net": int(buy_volume - sell_volume),
-                "total_ticks": len(df)
-            }
+            return {group: int(round(value)) for group, value in zip(self.size_groups, totals)}
             
         except Exception as e:
-            logger.error(f"❌ Erro calculando fluxo intraday para {symbol}: {e}")
-            return {"buy": 0, "sell": 0, "net": 0, "total_ticks": 0}
+            logger.error(f"❌ Erro calculando fluxo por tamanho para {symbol}: {e}")
+            return empty
+    
+    def calculate_vwap(self, symbol: str) -> dict:
+        """
+        VWAP da sessão, das janelas móveis e das âncoras, com bandas.
+        
+        Args:
+            symbol: Símbolo do ativo (ex: "WDO$N")
+            
+        Returns:
+            Dict do VwapEngine.snapshot, ou None antes da abertura
+        """
+        try:
+            if self._sync(symbol) is None:
+                return None
+            return self.vwap.snapshot(symbol)
+            
+        except Exception as e:
+            logger.error(f"❌ Erro calculando VWAP para {symbol}: {e}")
+            return None
     
     def get_flow_classification(self, net_flow: int, avg_volume: float) -> str:
         """
@@ -153,34 +307,45 @@ class TickFlowCalculator:
             return "NEUTRO"
 
 
+# Instância compartilhada: mantém o cursor entre chamadas do helper
+_shared_calculator = None
+
+
+def get_shared_calculator() -> TickFlowCalculator:
+    """Calculadora única do processo (um cursor de ticks por símbolo)."""
+    global _shared_calculator
+    if _shared_calculator is None:
+        archive = TickArchive() if BridgeConfig.TICK_ARCHIVE_ENABLED else None
+        _shared_calculator = TickFlowCalculator(archive=archive)
+    return _shared_calculator
+
+
 # Função helper para integração com flow_monitor.py existente
-def get_mt5_flow_data(symbol: str) -> dict:
+def get_mt5_flow_data(symbol: str, period_minutes: int = 60) -> dict:
     """
     Função helper para obter dados de fluxo formatados para flow_monitor.
     
+    Classifica cada negócio pelo tamanho da ordem (BridgeConfig.FLOW_SIZE_EDGES):
+    - Ordens grandes (>=100 contratos) = Gringo
+    - Ordens médias (20-99) = Institucional
+    - Ordens pequenas (<20) = Varejo
+    
+    Os valores são saldos financeiros (volume × preço), mesma unidade que o
+    SpyFlow envia e que `_calculate_single_score` normaliza.
+    
     Args:
         symbol: Símbolo do ativo
+        period_minutes: Horizonte em minutos, ou None para a sessão inteira
         
     Returns:
         Dict compatível com flow_monitor (FOREIGN, INSTITUTIONAL, RETAIL)
     """
-    calculator = TickFlowCalculator()
-    
-    # Calcula fluxo de 1 hora
-    flow_1h = calculator.calculate_aggression_flow(symbol, period_minutes=60)
-    
-    # Simula classificação por tamanho de ordem
-    # Ordens grandes (>100 contratos) = Gringo
-    # Ordens médias (20-100) = Institucional
-    # Ordens pequenas (<20) = Varejo
-    
-    # Por enquanto, usamos o fluxo total como "FOREIGN"
-    # TODO: Implementar análise de tamanho de ordem quando disponível
+    flow = get_shared_calculator().calculate_player_flow(symbol, period_minutes)
     
     return {
-        "FOREIGN": flow_1h["net"],  # Fluxo líquido total
-        "INSTITUTIONAL": 0,  # Placeholder
-        "RETAIL": 0  # Placeholder
+        "FOREIGN": flow.get("FOREIGN", 0),
+        "INSTITUTIONAL": flow.get("INSTITUTIONAL", 0),
+        "RETAIL": flow.get("RETAIL", 0)
     }
 
 
@@ -207,6 +372,13 @@ if __name__ == "__main__":
     print(f"   Saldo: {flow_win['net']:,}")
     print(f"   Total Ticks: {flow_win['total_ticks']:,}")
     
+    horizons = calculator.calculate_flow_horizons("WIN$N", [1, 5, 15, 60])
+    for name, flow in horizons.items():
+        print(f"   {name:>7}: Saldo {flow['net']:,} ({flow['total_ticks']:,} ticks)")
+    
+    print(f"   Players (1h): {get_mt5_flow_data('WIN$N')}")
+    print(f"   VWAP: {calculator.calculate_vwap('WIN$N')}")
+    
     # Teste com WDO
     print("\n💵 WDO (Mini Dólar)")
     flow_wdo = calculator.calculate_aggression_flow("WDO$N", period_minutes=60)
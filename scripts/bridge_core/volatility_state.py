@@ -0,0 +1,122 @@
+"""
+Volatility State
+================
+ATR incremental (média simples e Wilder) para vários períodos e
+timeframes, atualizado só quando uma barra fecha.
+
+Cada barra fechada custa O(períodos): o SMA mantém os últimos N True
+Ranges numa deque com soma corrida e o Wilder aplica
+`atr = (atr × (n - 1) + tr) / n` sobre a semente (média dos N primeiros).
+O regime (ATR rápido vs lento) fica em memória para D1 e intraday (H1/M5).
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+from collections import deque
+
+from .config import BridgeConfig
+
+
+class AtrState:
+    """ATR SMA + Wilder de vários períodos sobre um fluxo de barras fechadas."""
+
+    def __init__(self, periods):
+        self.periods = list(periods)
+        self.prev_close = None
+        self.count = 0  # True Ranges vistos
+        self._window = {p: deque(maxlen=p) for p in self.periods}
+        self._window_sum = {p: 0.0 for p in self.periods}
+        self._wilder = {p: 0.0 for p in self.periods}
+
+    def update(self, high: float, low: float, close: float):
+        """Acrescenta uma barra fechada."""
+        if self.prev_close is None:
+            # Primeira barra: só referência para o próximo True Range
+            self.prev_close = close
+            return
+
+        tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+
+        for p in self.periods:
+            window = self._window[p]
+            if len(window) == p:
+                self._window_sum[p] -= window[0]
+            window.append(tr)
+            self._window_sum[p] += tr
+
+            if self.count < p:
+                self._wilder[p] += tr  # Acumulando a semente
+            elif self.count == p:
+                self._wilder[p] = (self._wilder[p] + tr) / p
+            else:
+                self._wilder[p] = (self._wilder[p] * (p - 1) + tr) / p
+
+    def sma(self, period: int):
+        return self._window_sum[period] / period if self.count >= period else None
+
+    def wilder(self, period: int):
+        return self._wilder[period] if self.count >= period else None
+
+
+class VolatilityState:
+    """
+    Regime de volatilidade de um símbolo em vários timeframes.
+
+    `sync` lê as barras fechadas do cache de histórico do MT5Client e só
+    processa as que fecharam desde a última chamada.
+    """
+
+    def __init__(self, timeframes=None, fast: int = None, slow: int = None, warmup: int = None):
+        self.timeframes = timeframes or BridgeConfig.VOLATILITY_TIMEFRAMES
+        self.fast = fast or BridgeConfig.VOLATILITY_FAST
+        self.slow = slow or BridgeConfig.VOLATILITY_SLOW
+        self.warmup = warmup or BridgeConfig.VOLATILITY_WARMUP_BARS
+        self.atr = {tf: AtrState((self.fast, self.slow)) for tf in self.timeframes}
+        self.last_bar = {tf: None for tf in self.timeframes}  # time da última barra processada
+
+    def sync(self, mt5_client, symbol: str):
+        """Processa as barras fechadas novas de cada timeframe."""
+        for tf in self.timeframes:
+            rates = mt5_client.get_history_array(symbol, tf, self.warmup, closed_only=True)
+            if len(rates) == 0:
+                continue
+
+            last = self.last_bar[tf]
+            if last is not None and int(rates['time'][-1]) <= last:
+                continue
+
+            new = rates if last is None else rates[rates['time'] > last]
+            state = self.atr[tf]
+            for high, low, close in zip(new['high'].tolist(), new['low'].tolist(), new['close'].tolist()):
+                state.update(high, low, close)
+            self.last_bar[tf] = int(rates['time'][-1])
+
+    def regime(self, tf: str) -> dict:
+        """
+        Regime de um timeframe pelo ATR Wilder rápido vs lento.
+
+        Returns:
+            Dict com status, razão e ATRs (Wilder e SMA), ou None sem histórico suficiente
+        """
+        state = self.atr.get(tf)
+        if state is None:
+            return None
+
+        fast = state.wilder(self.fast)
+        slow = state.wilder(self.slow)
+        if not fast or not slow:
+            return None
+
+        status = "EXPANDING" if fast > slow else "CONTRACTING"
+        return {
+            "status": status,
+            "ratio": round(fast / slow, 2),
+            f"atr{self.fast}": round(fast, 2),
+            f"atr{self.slow}": round(slow, 2),
+            f"atr{self.fast}_sma": round(state.sma(self.fast), 2),
+            f"atr{self.slow}_sma": round(state.sma(self.slow), 2),
+            "bar_time": self.last_bar[tf]
+        }
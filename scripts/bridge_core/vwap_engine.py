@@ -0,0 +1,213 @@
+"""
+VWAP Engine
+===========
+VWAP incremental por símbolo: sessão, janelas móveis e âncoras, com
+bandas de desvio padrão.
+
+Cada VWAP guarda só somas corridas de preço×volume, volume e
+preço²×volume, então atualizar com novos ticks (ou barras fechadas) e
+consultar custam O(1) por VWAP, sem rebaixar histórico do terminal.
+
+    desvio = sqrt(Σp²v / Σv - vwap²)
+    bandas = vwap ± k × desvio
+
+Author: AI Trader Pro
+Date: 2026-10-18
+"""
+
+import calendar
+import datetime
+import math
+from collections import deque
+
+import numpy as np
+
+from .config import BridgeConfig
+
+MS_PER_MINUTE = 60_000
+
+
+class _VwapSums:
+    """Somas corridas de um VWAP."""
+
+    __slots__ = ("pv", "v", "p2v")
+
+    def __init__(self):
+        self.pv = 0.0
+        self.v = 0.0
+        self.p2v = 0.0
+
+    def add(self, pv: float, v: float, p2v: float):
+        self.pv += pv
+        self.v += v
+        self.p2v += p2v
+
+    def snapshot(self, bands) -> dict:
+        if self.v <= 0:
+            return None
+        vwap = self.pv / self.v
+        std = math.sqrt(max(self.p2v / self.v - vwap * vwap, 0.0))
+        result = {"vwap": round(vwap, 2), "std": round(std, 2), "volume": int(self.v)}
+        for k in bands:
+            result[f"upper_{k:g}"] = round(vwap + k * std, 2)
+            result[f"lower_{k:g}"] = round(vwap - k * std, 2)
+        return result
+
+
+class _RollingVwap(_VwapSums):
+    """
+    VWAP dos últimos N minutos (granularidade de 1 minuto, ancorado no
+    último negócio): cada minuto é um balde; baldes que saem da janela são
+    subtraídos das somas.
+    """
+
+    __slots__ = ("minutes", "buckets")
+
+    def __init__(self, minutes: int):
+        super().__init__()
+        self.minutes = minutes
+        self.buckets = deque()  # [minuto, pv, v, p2v]
+
+    def add_buckets(self, minutes: np.ndarray, pv: np.ndarray, v: np.ndarray, p2v: np.ndarray):
+        for minute, b_pv, b_v, b_p2v in zip(minutes.tolist(), pv.tolist(), v.tolist(), p2v.tolist()):
+            if self.buckets and self.buckets[-1][0] == minute:
+                last = self.buckets[-1]
+                last[1] += b_pv
+                last[2] += b_v
+                last[3] += b_p2v
+            else:
+                self.buckets.append([minute, b_pv, b_v, b_p2v])
+            self.add(b_pv, b_v, b_p2v)
+
+        # Despeja minutos fora da janela
+        oldest = self.buckets[-1][0] - self.minutes + 1 if self.buckets else 0
+        while self.buckets and self.buckets[0][0] < oldest:
+            _, b_pv, b_v, b_p2v = self.buckets.popleft()
+            self.add(-b_pv, -b_v, -b_p2v)
+
+        if not self.buckets:
+            self.pv = self.v = self.p2v = 0.0
+
+
+class SymbolVwap:
+    """VWAPs de um símbolo na sessão corrente."""
+
+    def __init__(self, rolling_minutes, bands):
+        self.bands = list(bands)
+        self.session = _VwapSums()
+        self.rolling = {m: _RollingVwap(m) for m in rolling_minutes}
+        self.anchors = {}  # nome -> (anchor_msc, _VwapSums)
+        self.last_time_msc = 0
+
+    def add_anchor(self, name: str, anchor_msc: int):
+        """VWAP ancorado: soma só os negócios com time_msc >= anchor_msc (a partir de agora)."""
+        self.anchors[name] = (anchor_msc, _VwapSums())
+
+    def update(self, times_msc: np.ndarray, prices: np.ndarray, volumes: np.ndarray):
+        """
+        Acrescenta negócios (ou barras) ordenados por tempo.
+
+        Args:
+            times_msc: Tempo de cada negócio em ms (horário do servidor)
+            prices: Preço (negócio: `last`; barra: preço típico)
+            volumes: Volume negociado
+        """
+        if len(times_msc) == 0:
+            return
+
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        pv = prices * volumes
+        p2v = pv * prices
+
+        self.session.add(float(pv.sum()), float(volumes.sum()), float(p2v.sum()))
+
+        if self.rolling:
+            minutes, inverse = np.unique(times_msc // MS_PER_MINUTE, return_inverse=True)
+            b_pv = np.bincount(inverse, weights=pv, minlength=len(minutes))
+            b_v = np.bincount(inverse, weights=volumes, minlength=len(minutes))
+            b_p2v = np.bincount(inverse, weights=p2v, minlength=len(minutes))
+            for window in self.rolling.values():
+                window.add_buckets(minutes, b_pv, b_v, b_p2v)
+
+        for anchor_msc, sums in self.anchors.values():
+            start = int(np.searchsorted(times_msc, anchor_msc, side='left'))
+            if start < len(times_msc):
+                sums.add(float(pv[start:].sum()), float(volumes[start:].sum()), float(p2v[start:].sum()))
+
+        self.last_time_msc = int(times_msc[-1])
+
+    def snapshot(self) -> dict:
+        result = {"session": self.session.snapshot(self.bands)}
+        for minutes, window in self.rolling.items():
+            result[f"{minutes}m"] = window.snapshot(self.bands)
+        if self.anchors:
+            result["anchored"] = {name: sums.snapshot(self.bands) for name, (_, sums) in self.anchors.items()}
+        return result
+
+
+class VwapEngine:
+    """
+    VWAPs incrementais de vários símbolos.
+
+    Alimentado com os ticks novos do TickFlowCalculator (`update_ticks`)
+    ou com barras fechadas (`update_bars`, preço típico × `real_volume`).
+
+    Âncoras diárias (`add_daily_anchor`) são recriadas em todo `reset` com
+    o dia da sessão, antes de a sessão ser carregada desde a abertura.
+    """
+
+    def __init__(self, rolling_minutes=None, bands=None):
+        self.rolling_minutes = rolling_minutes or BridgeConfig.VWAP_ROLLING_MINUTES
+        self.bands = bands or BridgeConfig.VWAP_BANDS
+        self.symbols = {}  # symbol -> SymbolVwap
+        self.daily_anchors = {}  # nome -> datetime.time (horário do servidor)
+
+    def reset(self, symbol: str, session_start: datetime.datetime = None) -> SymbolVwap:
+        """Nova sessão: zera as somas e recria as âncoras diárias no dia da sessão."""
+        state = SymbolVwap(self.rolling_minutes, self.bands)
+        if session_start is not None:
+            for name, at in self.daily_anchors.items():
+                anchor = datetime.datetime.combine(session_start.date(), at)
+                # time_msc do MT5 é o horário do servidor contado como UTC
+                state.add_anchor(name, calendar.timegm(anchor.timetuple()) * 1000)
+        self.symbols[symbol] = state
+        return state
+
+    def _state(self, symbol: str) -> SymbolVwap:
+        return self.symbols.get(symbol) or self.reset(symbol)
+
+    def update_ticks(self, symbol: str, ticks: np.ndarray):
+        """Acrescenta ticks de negócio (array de `copy_ticks_*`)."""
+        if ticks is None or len(ticks) == 0:
+            return
+        self._state(symbol).update(ticks['time_msc'], ticks['last'], ticks['volume'])
+
+    def update_bars(self, symbol: str, rates: np.ndarray):
+        """Acrescenta barras fechadas (array de `copy_rates_*`)."""
+        if rates is None or len(rates) == 0:
+            return
+        typical = (rates['high'] + rates['low'] + rates['close']) / 3
+        self._state(symbol).update(rates['time'].astype(np.int64) * 1000, typical, rates['real_volume'])
+
+    def add_anchor(self, symbol: str, name: str, anchor_msc: int):
+        self._state(symbol).add_anchor(name, anchor_msc)
+
+    def add_daily_anchor(self, name: str, hhmm: str):
+        """
+        VWAP ancorado todo dia em "HH:MM" (ex: abertura da B3, abertura de NY).
+
+        Vale a partir da próxima sessão de cada símbolo; registre antes do
+        primeiro cálculo para já valer na sessão corrente.
+        """
+        hour, minute = map(int, hhmm.split(":"))
+        self.daily_anchors[name] = datetime.time(hour, minute)
+
+    def snapshot(self, symbol: str) -> dict:
+        """
+        Returns:
+            Dict {"session": {...}, "60m": {...}, "anchored": {...}}, com
+            None nos VWAPs ainda sem volume; None se o símbolo não tem estado
+        """
+        state = self.symbols.get(symbol)
+        return state.snapshot() if state else None
@@ -0,0 +1,109 @@
+"""
+Replay: reproduz um pregão gravado pelo bridge
+==============================================
+Grave com `BRIDGE_RECORD_DIR=<dir> python scripts/bridge.py` e reproduza
+sem MT5/Redis/rede:
+
+    python scripts/replay.py <dir> [--speed 1|10|max] [--redis] [--output payloads.jsonl]
+
+Os campos vindos do MT5 (preços, fluxo, histórico) se repetem ciclo a ciclo.
+Os dados raspados (Investing, calendário) são servidos pela última resposta
+gravada até o instante virtual, então podem aparecer até um intervalo de
+raspagem antes/depois do que aconteceu na gravação.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+# Add 'scripts' directory to path so we can import bridge_core directly
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bridge_core import clock
+from bridge_core.replay import (
+    Recording, ReplayClock, ReplayMT5, ReplaySession, ReplayFlowMonitor, MemoryPublisher
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+
+async def replay(args):
+    recording = Recording(args.directory)
+    if recording.start is None:
+        print("⚠️ Gravação vazia.")
+        return
+
+    speed = None if args.speed == "max" else float(args.speed)
+    replay_clock = ReplayClock(recording.start, speed, recording.end, recording.cycles)
+    clock.set_clock(replay_clock)
+
+    # O MetaTrader5 precisa ser trocado antes de importar o bridge_core
+    sys.modules["MetaTrader5"] = ReplayMT5(recording)
+    from bridge_core.config import BridgeConfig
+    BridgeConfig.TICK_ARCHIVE_ENABLED = False
+    from bridge_core.data_engine import DataEngine
+
+    if args.redis:
+        from bridge_core.redis_client import RedisClient
+        publisher = RedisClient()
+    else:
+        publisher = MemoryPublisher(args.output)
+
+    engine = DataEngine(
+        redis=publisher,
+        flow_monitor=ReplayFlowMonitor(recording),
+        session_factory=lambda **kwargs: ReplaySession(recording, **kwargs),
+        use_profit=False
+    )
+
+    t0 = time.perf_counter()
+    task = asyncio.create_task(engine.run())
+    finished = asyncio.create_task(replay_clock.finished.wait())
+    await asyncio.wait({task, finished}, return_when=asyncio.FIRST_COMPLETED)
+
+    engine.running = False
+    finished.cancel()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    elapsed = time.perf_counter() - t0
+
+    print("=" * 60)
+    print(f"📼 Replay de {recording.end - recording.start:.0f}s gravados em {elapsed:.1f}s")
+    print(f"🧵 MT5 executor: {engine.executor.stats()}")
+    if engine.latency.count:
+        print(f"⏱️ Tick→publish: {engine.latency.summary()}")
+    if isinstance(publisher, MemoryPublisher):
+        publisher.close()
+        print(json.dumps(publisher.stats(), indent=2))
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduz uma sessão gravada do bridge")
+    parser.add_argument("directory", help="Diretório com events.jsonl.gz (BRIDGE_RECORD_DIR)")
+    parser.add_argument("--speed", default="max", help="1, 10 ou max")
+    parser.add_argument("--redis", action="store_true", help="Publica no Redis em vez de em memória")
+    parser.add_argument("--output", help="Grava o market_data completo de cada ciclo (JSONL)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente dos jitters aleatórios")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
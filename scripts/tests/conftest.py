@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os testes importam `bridge_core` como o bridge.py faz (a partir de scripts/)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,92 @@
+"""
+As três cópias do codec (bridge, backend, ai-analyst) formam um protocolo
+de fio: cada uma precisa ler o que qualquer outra grava no Redis.
+"""
+
+import datetime
+import importlib
+import importlib.util
+import os
+import sys
+
+import pytest
+
+from bridge_core import codec as bridge_codec
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def _load_service_codec(name: str, service_dir: str, module: str):
+    """Importa o codec de outro serviço com a raiz dele no sys.path (como ele roda)."""
+    service_root = os.path.join(ROOT, service_dir)
+    shadowed = {key: sys.modules.pop(key) for key in ("config", "src") if key in sys.modules}
+    sys.path.insert(0, service_root)
+    try:
+        if service_dir == "backend":
+            return importlib.import_module(module)
+        spec = importlib.util.spec_from_file_location(name, os.path.join(service_root, module))
+        loaded = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(loaded)
+        return loaded
+    finally:
+        sys.path.remove(service_root)
+        sys.modules.pop("config", None)
+        sys.modules.update(shadowed)
+
+
+CODECS = {
+    "bridge": bridge_codec,
+    "backend": _load_service_codec("backend_codec", "backend", "src.utils.codec"),
+    "ai-analyst": _load_service_codec("ai_analyst_codec", "ai-analyst", "codec.py"),
+}
+
+PAYLOAD = {
+    "mt5": {"WIN$N": {"valor": 131_250.0, "var": -0.35, "ajuste": 0.0, "timestamp": "2026-10-18T10:31:02.512"}},
+    "calendar": [{"time": "09:30", "currency": "USD", "event": "Payroll", "actual": None, "impact": 3}],
+    "freshness": {"OURO": {"stale": True, "age_s": 412.5, "breaker": "half_open"}},
+    "quant_dashboard": {"flows": {"WIN": {"FOREIGN": -1_250_000, "RETAIL": 0}}, "source": "manual"},
+    "texto": "Índice Bovespa — variação",
+    "vazio": {},
+    "grande": 2 ** 53,
+    "ok": True,
+}
+
+
+def _formats():
+    return [fmt for fmt in bridge_codec.FORMATS if all(c.available(fmt) for c in CODECS.values())]
+
+
+def test_copies_share_the_wire_constants():
+    for name, codec in CODECS.items():
+        assert codec.MSGPACK_MARKER == b"\xc1", name
+        assert codec.FORMATS == bridge_codec.FORMATS, name
+
+
+@pytest.mark.parametrize("fmt", _formats())
+@pytest.mark.parametrize("writer", list(CODECS))
+def test_every_copy_decodes_what_the_others_encode(writer, fmt):
+    encoded = CODECS[writer].encode(PAYLOAD, fmt)
+    assert encoded[:1] == b"\xc1" if fmt == "msgpack" else encoded[:1] == b"{"
+    for reader, codec in CODECS.items():
+        assert codec.decode(encoded) == PAYLOAD, f"{writer} -> {reader}"
+
+
+@pytest.mark.parametrize("fmt", _formats())
+def test_copies_encode_the_same_bytes(fmt):
+    expected = bridge_codec.encode(PAYLOAD, fmt)
+    for name, codec in CODECS.items():
+        assert codec.encode(PAYLOAD, fmt) == expected, name
+
+
+def test_datetimes_and_legacy_text_values():
+    when = datetime.datetime(2026, 10, 18, 9, 30, 0)
+    for fmt in _formats():
+        for writer, codec in CODECS.items():
+            encoded = codec.encode({"timestamp": when}, fmt)
+            for reader, other in CODECS.items():
+                assert other.decode(encoded) == {"timestamp": when.isoformat()}, f"{writer} -> {reader} ({fmt})"
+
+    # Valores antigos gravados como texto JSON (redis-py com decode_responses)
+    for name, codec in CODECS.items():
+        assert codec.decode('{"a":1,"b":[1.5,null]}') == {"a": 1, "b": [1.5, None]}, name
+        assert codec.decode(None) is None, name
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from bridge_core.flow_kernels import FlowRingBuffer
+
+
+def brute_force(times, buy, sell, bucket, signed, retained, cutoff, buckets):
+    t, b, s, k, v = (a[-retained:] for a in (times, buy, sell, bucket, signed))
+    m = t >= cutoff
+    per_bucket = np.array([v[m & (k == i)].sum() for i in range(buckets)])
+    return int(b[m].sum()), int(s[m].sum()), int(m.sum()), per_bucket
+
+
+@pytest.mark.parametrize("capacity,initial", [(64, None), (1000, None), (1000, 16), (300, 7)])
+def test_ring_matches_brute_force_across_wraps(capacity, initial):
+    rng = np.random.default_rng(3)
+    ring = FlowRingBuffer(capacity, buckets=3, initial=initial)
+    times, buy, sell, bucket, signed = (np.zeros(0, dtype=d) for d in ("i8", "i8", "i8", "i8", "f8"))
+    t0 = 0
+    for n in rng.integers(1, 150, 40):
+        t = t0 + np.cumsum(rng.integers(0, 50, n))
+        t0 = int(t[-1])
+        v = rng.integers(1, 200, n)
+        is_buy = rng.random(n) < 0.5
+        b, s = np.where(is_buy, v, 0), np.where(is_buy, 0, v)
+        k = np.digitize(v, [20, 100])
+        sv = np.where(is_buy, v, -v) * 100.5
+        ring.append(t, b, s, k, sv)
+        times, buy, sell, bucket, signed = (np.concatenate(p) for p in
+                                            ((times, t), (buy, b), (sell, s), (bucket, k), (signed, sv)))
+
+        retained = min(len(times), capacity)
+        assert ring.size == retained
+        assert ring.capacity <= capacity
+        for cutoff in (0, t0 - 500, t0 - 50, t0 + 1):
+            flow = ring.flow_since(cutoff)
+            exp_buy, exp_sell, exp_n, exp_buckets = brute_force(times, buy, sell, bucket, signed, retained, cutoff, 3)
+            assert (flow["buy"], flow["sell"], flow["total_ticks"]) == (exp_buy, exp_sell, exp_n)
+            np.testing.assert_allclose(ring.buckets_since(cutoff), exp_buckets)
@@ -0,0 +1,39 @@
+"""
+Stale-while-revalidate: numa falha de scrape os destinos voltam a receber
+o último valor bom guardado no ScrapeCache.
+"""
+
+import asyncio
+
+from bridge_core.scrape_scheduler import ScrapeScheduler
+
+
+def test_failure_serves_last_good_value():
+    answers = [{"valor": 5.1, "var": 0.02, "var_pct": 0.4}, None]
+    published = []
+
+    async def scrape(name, url):
+        return answers.pop(0)
+
+    scheduler = ScrapeScheduler(scrape, lambda instrument, data: published.append(data))
+    instrument = scheduler.register("macro", "DXY", "https://br.investing.com/indices/usdollar", 60)
+
+    asyncio.run(scheduler._run(instrument))
+    asyncio.run(scheduler._run(instrument))
+
+    assert published == [{"valor": 5.1, "var": 0.02, "var_pct": 0.4}] * 2
+    assert scheduler.freshness()["macro"]["DXY"]["stale"] is True
+
+
+def test_failure_without_value_publishes_nothing():
+    async def scrape(name, url):
+        raise TimeoutError("timeout")
+
+    published = []
+    scheduler = ScrapeScheduler(scrape, lambda instrument, data: published.append(data))
+    instrument = scheduler.register("macro", "DXY", "https://br.investing.com/indices/usdollar", 60)
+
+    asyncio.run(scheduler._run(instrument))
+
+    assert published == []
+    assert scheduler.cache.entries[instrument.url].error == "timeout"
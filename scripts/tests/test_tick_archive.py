@@ -0,0 +1,65 @@
+import numpy as np
+
+from bridge_core.flow_kernels import ticks_after_cursor
+from bridge_core.tick_archive import TickArchive
+
+DTYPE = np.dtype([("time_msc", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"),
+                  ("volume", "<u8"), ("flags", "<u4")])
+
+SESSION_MSC = 1_760_000_000_000 - 1_760_000_000_000 % 86_400_000 + 12 * 3_600_000
+
+
+def make_ticks(n, start=SESSION_MSC, seed=0):
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n, dtype=DTYPE)
+    # Vários ticks no mesmo milissegundo e no mesmo segundo, como no MT5
+    ticks["time_msc"] = start + np.cumsum(rng.integers(0, 40, n))
+    ticks["last"] = 120_000 + np.arange(n)
+    ticks["volume"] = rng.integers(1, 50, n)
+    ticks["flags"] = 32
+    return ticks
+
+
+def sync(archive, symbol, terminal, batch):
+    """Mesmo laço de TickFlowCalculator._sync sobre um `copy_ticks_from` simulado."""
+    last, seen = 0, 0
+    while True:
+        start_msc = terminal["time_msc"][0] if last == 0 else last // 1000 * 1000
+        lo = int(np.searchsorted(terminal["time_msc"], start_msc, side="left"))
+        ticks = terminal[lo:lo + batch]
+        if len(ticks) == 0:
+            break
+        fresh, last, seen = ticks_after_cursor(ticks, last, seen)
+        if len(fresh) > 0:
+            archive.append(symbol, fresh)
+        if len(ticks) < batch or len(fresh) == 0:
+            break
+
+
+def test_restart_reload_in_several_batches_keeps_each_tick_once(tmp_path):
+    terminal = make_ticks(20_000)
+    sync(TickArchive(str(tmp_path)), "WIN$N", terminal, batch=5_000)
+
+    # Reinício: processo novo recarrega a sessão inteira em lotes menores
+    sync(TickArchive(str(tmp_path)), "WIN$N", terminal, batch=700)
+
+    day = TickArchive(str(tmp_path)).days("WIN$N")[0]
+    stored = TickArchive(str(tmp_path)).load_day("WIN$N", day)
+    assert len(stored["time_msc"]) == len(terminal)
+    np.testing.assert_array_equal(stored["time_msc"], terminal["time_msc"])
+    np.testing.assert_array_equal(stored["last"], terminal["last"])
+
+
+def test_restart_appends_only_ticks_after_the_archive(tmp_path):
+    terminal = make_ticks(12_000, seed=1)
+    sync(TickArchive(str(tmp_path)), "WDO$N", terminal[:8_000], batch=3_000)
+
+    archive = TickArchive(str(tmp_path))
+    sync(archive, "WDO$N", terminal, batch=700)
+    # Lotes seguintes já vêm só com ticks novos
+    more = make_ticks(500, start=int(terminal["time_msc"][-1]) + 1_000, seed=2)
+    archive.append("WDO$N", more)
+
+    day = archive.days("WDO$N")[0]
+    stored = archive.load_day("WDO$N", day)
+    np.testing.assert_array_equal(stored["time_msc"], np.concatenate([terminal, more])["time_msc"])